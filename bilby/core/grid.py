@@ -1,5 +1,8 @@
 from __future__ import division
 
+import multiprocessing
+import time
+
 import numpy as np
 import os
 import json
@@ -34,10 +37,73 @@ def grid_file_name(outdir, label, gzip=False):
         return os.path.join(outdir, '{}_grid.json'.format(label))
 
 
+_likelihood = None
+_parameter_names = None
+_sample_points = None
+_shape = None
+
+
+def _initialize_global_variables(
+        likelihood, parameter_names, sample_points, shape):
+    """ Store the likelihood and the grid in each worker process to avoid
+    passing them with every chunk """
+    global _likelihood, _parameter_names, _sample_points, _shape
+    _likelihood = likelihood
+    _parameter_names = parameter_names
+    _sample_points = sample_points
+    _shape = shape
+
+
+def _evaluate_chunk(bounds):
+    start, stop = bounds
+    start_time = time.time()
+    ln_likelihood = _evaluate_flat_indices(
+        _likelihood, _parameter_names, _sample_points, _shape, start, stop)
+    return ln_likelihood, time.time() - start_time
+
+
+def _evaluate_flat_indices(likelihood, parameter_names, sample_points, shape,
+                           start, stop):
+    """ Evaluate the likelihood at a contiguous range of grid points
+
+    If the likelihood has a `log_likelihood_batch` method it is called once
+    for all the points, otherwise the points are evaluated one at a time.
+
+    Parameters
+    ----------
+    likelihood: bilby.likelihood.Likelihood
+    parameter_names: list
+        The names of the grid dimensions, in order
+    sample_points: dict
+        The sample points along each dimension
+    shape: tuple
+        The shape of the mesh grid
+    start, stop: int
+        The range of flat (C-ordered) indices to evaluate
+
+    Returns
+    -------
+    array_like: The log likelihood at each of the points
+    """
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    points = {name: np.asarray(sample_points[name])[indices[ii]]
+              for ii, name in enumerate(parameter_names)}
+    if hasattr(likelihood, 'log_likelihood_batch'):
+        return likelihood.log_likelihood_batch(points)
+    ln_likelihood = np.empty(stop - start)
+    for jj in range(stop - start):
+        for name in parameter_names:
+            likelihood.parameters[name] = points[name][jj]
+        ln_likelihood[jj] = likelihood.log_likelihood()
+    return ln_likelihood
+
+
 class Grid(object):
 
     def __init__(self, likelihood=None, priors=None, grid_size=101,
-                 save=False, label='no_label', outdir='.', gzip=False):
+                 save=False, label='no_label', outdir='.', gzip=False,
+                 npool=1, chunk_size=1000, ln_likelihood_file=None,
+                 checkpoint=False, check_point_delta_t=600, resume=True):
         """
 
         Parameters
@@ -58,6 +124,26 @@ class Grid(object):
             The output directory to which the grid will be saved
         gzip: bool
             Set whether to gzip the output grid file
+        npool: int
+            The number of processes to use to evaluate the likelihood, the
+            likelihood is copied to each process once.
+        chunk_size: int
+            The number of grid points evaluated in each call to the
+            likelihood batch method (if the likelihood has a
+            `log_likelihood_batch` method) or in each task sent to the pool.
+        ln_likelihood_file: str, optional
+            If given, the log likelihood is stored in a memory-mapped `.npy`
+            file at this path rather than in memory.
+        checkpoint: bool
+            If true, the partially evaluated log likelihood and a mask of the
+            completed grid points are periodically written to the directory
+            `outdir/label_grid_checkpoint` so that an interrupted evaluation
+            can be resumed.
+        check_point_delta_t: float
+            The approximate time in seconds between checkpoints.
+        resume: bool
+            If true, and `checkpoint` is set, resume the evaluation from an
+            existing checkpoint (if available).
         """
 
         if priors is None:
@@ -66,6 +152,15 @@ class Grid(object):
         self.priors = PriorDict(priors)
         self.n_dims = len(priors)
         self.parameter_names = list(self.priors.keys())
+        self.npool = npool
+        self.chunk_size = chunk_size
+        self.ln_likelihood_file = ln_likelihood_file
+        self.checkpoint = checkpoint
+        self.check_point_delta_t = check_point_delta_t
+        self.resume = resume
+        self.checkpoint_directory = os.path.join(
+            outdir, '{}_grid_checkpoint'.format(label))
+        self.chunk_times = list()
 
         self.sample_points = dict()
         self._get_sample_points(grid_size)
@@ -302,21 +397,148 @@ class Grid(object):
         return np.exp(ln_post - np.max(ln_post))
 
     def _evaluate(self):
-        self._ln_likelihood = np.empty(self.mesh_grid[0].shape)
-        self._evaluate_recursion(0)
+        shape = self.mesh_grid[0].shape
+        n_points = int(np.prod(shape))
+        completed = np.zeros(n_points, dtype=bool)
+        ln_likelihood_file = self.ln_likelihood_file
+        if self.checkpoint:
+            check_directory_exists_and_if_not_mkdir(self.checkpoint_directory)
+            if ln_likelihood_file is None:
+                ln_likelihood_file = os.path.join(
+                    self.checkpoint_directory, 'ln_likelihood.npy')
+            if self.resume:
+                completed = self._read_checkpoint(
+                    ln_likelihood_file, shape, completed)
+        if completed.any():
+            self._ln_likelihood = np.lib.format.open_memmap(
+                ln_likelihood_file, mode='r+')
+        elif ln_likelihood_file is None:
+            self._ln_likelihood = np.empty(shape)
+        else:
+            self._ln_likelihood = np.lib.format.open_memmap(
+                ln_likelihood_file, mode='w+', dtype=float, shape=shape)
+            if self.checkpoint:
+                self._write_checkpoint(completed)
+
+        chunk_size = max(int(self.chunk_size), 1)
+        chunks = [(start, min(start + chunk_size, n_points))
+                  for start in range(0, n_points, chunk_size)]
+        chunks = [(start, stop) for start, stop in chunks
+                  if not completed[start:stop].all()]
+        self._evaluate_chunks(chunks, completed)
+        if isinstance(self._ln_likelihood, np.memmap):
+            self._ln_likelihood.flush()
+        if self.checkpoint:
+            self._write_checkpoint(completed)
         self.ln_noise_evidence = self.likelihood.noise_log_likelihood()
 
-    def _evaluate_recursion(self, dimension):
-        if dimension == self.n_dims:
-            current_point = tuple([[int(np.where(
-                self.likelihood.parameters[name] ==
-                self.sample_points[name])[0])] for name in self.parameter_names])
-            self._ln_likelihood[current_point] = self.likelihood.log_likelihood()
+    def _evaluate_chunks(self, chunks, completed):
+        """ Evaluate the likelihood for ranges of flat indices of the grid
+
+        Parameters
+        ----------
+        chunks: list
+            List of (start, stop) tuples of flat (C-ordered) indices of the
+            mesh grid.
+        completed: array_like
+            Boolean array of the flattened grid shape, updated in place as
+            the chunks are evaluated.
+        """
+        shape = self._ln_likelihood.shape
+        ln_likelihood = self._ln_likelihood.reshape(-1)
+        last_checkpoint_time = time.time()
+        if self.npool is None or self.npool <= 1 or len(chunks) <= 1:
+            _initialize_global_variables(
+                self.likelihood, self.parameter_names, self.sample_points,
+                shape)
+            pool = None
+            results = map(_evaluate_chunk, chunks)
         else:
-            name = self.parameter_names[dimension]
-            for ii in range(self._ln_likelihood.shape[dimension]):
-                self.likelihood.parameters[name] = self.sample_points[name][ii]
-                self._evaluate_recursion(dimension + 1)
+            logger.info("Evaluating {} grid points in {} chunks using {} "
+                        "processes".format(
+                            sum(stop - start for start, stop in chunks),
+                            len(chunks), self.npool))
+            pool = multiprocessing.Pool(
+                processes=self.npool, initializer=_initialize_global_variables,
+                initargs=(self.likelihood, self.parameter_names,
+                          self.sample_points, shape))
+            results = pool.imap(_evaluate_chunk, chunks)
+        try:
+            for (start, stop), (values, elapsed) in zip(chunks, results):
+                ln_likelihood[start:stop] = values
+                completed[start:stop] = True
+                self.chunk_times.append((start, stop, elapsed))
+                logger.debug("Evaluated grid points {} to {} in {:.3g}s".format(
+                    start, stop, elapsed))
+                if (self.checkpoint and time.time() - last_checkpoint_time >
+                        self.check_point_delta_t):
+                    self._write_checkpoint(completed)
+                    last_checkpoint_time = time.time()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            else:
+                _initialize_global_variables(None, None, None, None)
+
+    def _write_checkpoint(self, completed):
+        """ Write the completion mask and chunk timing to the checkpoint
+        directory
+
+        The memory-mapped log likelihood is flushed first and the mask is
+        written to a temporary file which is then moved into place, so that
+        the mask never marks points which are not on disk.
+        """
+        self._ln_likelihood.flush()
+        for name, array in [
+                ('completed', completed),
+                ('chunk_times', np.array(self.chunk_times).reshape(-1, 3))]:
+            filename = os.path.join(self.checkpoint_directory, name + '.npy')
+            np.save(filename + '.tmp.npy', array)
+            os.rename(filename + '.tmp.npy', filename)
+        np.savez(os.path.join(self.checkpoint_directory, 'sample_points.npz'),
+                 **{'{}'.format(ii): self.sample_points[name] for ii, name
+                    in enumerate(self.parameter_names)})
+        logger.info("Written grid checkpoint, {}/{} points complete".format(
+            int(completed.sum()), completed.size))
+
+    def _read_checkpoint(self, ln_likelihood_file, shape, completed):
+        """ Read the completion mask and chunk timing from the checkpoint
+        directory
+
+        Returns
+        -------
+        array_like: The completion mask, all False if the checkpoint is
+            missing or does not match this grid.
+        """
+        mask_file = os.path.join(self.checkpoint_directory, 'completed.npy')
+        points_file = os.path.join(
+            self.checkpoint_directory, 'sample_points.npz')
+        if not all(os.path.isfile(filename) for filename in
+                   [mask_file, points_file, ln_likelihood_file]):
+            logger.debug("No grid checkpoint found in {}".format(
+                self.checkpoint_directory))
+            return completed
+        saved_points = np.load(points_file)
+        if (
+                len(saved_points.files) != self.n_dims or
+                not all(np.array_equal(
+                    saved_points['{}'.format(ii)], self.sample_points[name])
+                    for ii, name in enumerate(self.parameter_names)) or
+                np.load(ln_likelihood_file, mmap_mode='r').shape != shape):
+            logger.warning("Grid checkpoint in {} does not match the grid, "
+                           "starting from scratch".format(
+                               self.checkpoint_directory))
+            return completed
+        completed = np.load(mask_file)
+        times_file = os.path.join(
+            self.checkpoint_directory, 'chunk_times.npy')
+        if os.path.isfile(times_file):
+            self.chunk_times = [tuple(row) for row in np.load(times_file)]
+        logger.info("Resuming grid evaluation from {}, {}/{} points "
+                    "complete".format(self.checkpoint_directory,
+                                      int(completed.sum()), completed.size))
+        return completed
 
     def _get_sample_points(self, grid_size):
         for ii, key in enumerate(self.parameter_names):
@@ -4,7 +4,7 @@ from scipy.special._ufuncs import xlogy, erf, log1p, stdtrit, gammaln, stdtr, \
     btdtri, betaln, btdtr, gammaincinv, gammainc
 
 from .base import Prior
-from bilby.core.utils import logger
+from bilby.core.utils import logger, get_random_generator
 
 
 class DeltaFunction(Prior):
@@ -489,6 +489,17 @@ class Gaussian(Prior):
         self.mu = mu
         self.sigma = sigma
 
+    def sample(self, size=None, rng=None):
+        """Draw a sample from the prior
+
+        Samples are drawn directly from the normal distribution, which is
+        cheaper than rescaling uniform samples through the inverse CDF.
+        See superclass for the parameters.
+        """
+        rng = get_random_generator(rng)
+        self.least_recently_sampled = rng.normal(self.mu, self.sigma, size)
+        return self.least_recently_sampled
+
     def rescale(self, val):
         """
         'Rescale' a sample from the unit line element to the appropriate Gaussian prior.
@@ -954,6 +965,18 @@ class Beta(Prior):
         self.alpha = alpha
         self.beta = beta
 
+    def sample(self, size=None, rng=None):
+        """Draw a sample from the prior
+
+        Samples are drawn directly from the Beta distribution, which is
+        cheaper than rescaling uniform samples through the inverse CDF.
+        See superclass for the parameters.
+        """
+        rng = get_random_generator(rng)
+        self.least_recently_sampled = (
+            rng.beta(self.alpha, self.beta, size) * (self.maximum - self.minimum) + self.minimum)
+        return self.least_recently_sampled
+
     def rescale(self, val):
         """
         'Rescale' a sample from the unit line element to the appropriate Beta prior.
@@ -1210,6 +1233,17 @@ class Gamma(Prior):
         self.k = k
         self.theta = theta
 
+    def sample(self, size=None, rng=None):
+        """Draw a sample from the prior
+
+        Samples are drawn directly from the Gamma distribution, which is
+        cheaper than rescaling uniform samples through the inverse CDF.
+        See superclass for the parameters.
+        """
+        rng = get_random_generator(rng)
+        self.least_recently_sampled = rng.gamma(self.k, self.theta, size)
+        return self.least_recently_sampled
+
     def rescale(self, val):
         """
         'Rescale' a sample from the unit line element to the appropriate Gamma prior.
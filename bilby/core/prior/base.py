@@ -8,7 +8,8 @@ import scipy.stats
 from scipy.integrate import cumtrapz
 from scipy.interpolate import interp1d
 
-from bilby.core.utils import infer_args_from_method, BilbyJsonEncoder, decode_bilby_json, logger
+from bilby.core.utils import infer_args_from_method, BilbyJsonEncoder, decode_bilby_json, logger, \
+    get_random_generator
 
 
 class Prior(object):
@@ -77,20 +78,24 @@ class Prior(object):
                     return False
         return True
 
-    def sample(self, size=None):
+    def sample(self, size=None, rng=None):
         """Draw a sample from the prior
 
         Parameters
         ----------
         size: int or tuple of ints, optional
             See numpy.random.uniform docs
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
         float: A random number between 0 and 1, rescaled to match the distribution of this Prior
 
         """
-        self.least_recently_sampled = self.rescale(np.random.uniform(0, 1, size))
+        rng = get_random_generator(rng)
+        self.least_recently_sampled = self.rescale(rng.uniform(0, 1, size))
         return self.least_recently_sampled
 
     def rescale(self, val):
@@ -322,7 +327,7 @@ class Prior(object):
 
     @classmethod
     def _from_repr(cls, string):
-        subclass_args = infer_args_from_method(cls.__init__)
+        subclass_args = _infer_init_args(cls)
 
         string = string.replace(' ', '')
         kwargs = cls._split_repr(string)
@@ -345,19 +350,8 @@ class Prior(object):
 
     @classmethod
     def _split_repr(cls, string):
-        subclass_args = infer_args_from_method(cls.__init__)
-        args = string.split(',')
-        remove = list()
-        for ii, key in enumerate(args):
-            if '(' in key:
-                jj = ii
-                while ')' not in args[jj]:
-                    jj += 1
-                    args[ii] = ','.join([args[ii], args[jj]]).strip()
-                    remove.append(jj)
-        remove.reverse()
-        for ii in remove:
-            del args[ii]
+        subclass_args = _infer_init_args(cls)
+        args = _split_arguments(string)
         kwargs = dict()
         for ii, arg in enumerate(args):
             if '=' not in arg:
@@ -436,6 +430,42 @@ class Prior(object):
         return val
 
 
+# The arguments of the __init__ method of each prior class, inspecting the
+# signature dominates the cost of parsing a prior repr.
+_INIT_ARGS_CACHE = dict()
+
+
+def _infer_init_args(cls):
+    """ Get the arguments of cls.__init__, caching the result for each class """
+    if cls not in _INIT_ARGS_CACHE:
+        _INIT_ARGS_CACHE[cls] = infer_args_from_method(cls.__init__)
+    return list(_INIT_ARGS_CACHE[cls])
+
+
+def _split_arguments(string):
+    """ Split a string of arguments on the commas which are not nested in
+    brackets or quotes, e.g., "a=1,b=f(2,3)" -> ["a=1", "b=f(2,3)"] """
+    args = list()
+    depth = 0
+    quote = None
+    start = 0
+    for ii, character in enumerate(string):
+        if quote is not None:
+            if character == quote:
+                quote = None
+        elif character in "'\"":
+            quote = character
+        elif character in "([{":
+            depth += 1
+        elif character in ")]}":
+            depth -= 1
+        elif character == ',' and depth == 0:
+            args.append(string[start:ii].strip())
+            start = ii + 1
+    args.append(string[start:].strip())
+    return [arg for arg in args if arg != '']
+
+
 class Constraint(Prior):
 
     def __init__(self, minimum, maximum, name=None, latex_label=None,
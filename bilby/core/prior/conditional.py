@@ -1,11 +1,9 @@
-import numpy as np
-
 from .base import Prior, PriorException
 from bilby.core.prior.interpolated import Interped
 from bilby.core.prior.analytical import DeltaFunction, PowerLaw, Uniform, LogUniform, \
     SymmetricLogUniform, Cosine, Sine, Gaussian, TruncatedGaussian, HalfGaussian, \
     LogNormal, Exponential, StudentT, Beta, Logistic, Cauchy, Gamma, ChiSquared, FermiDirac
-from bilby.core.utils import infer_args_from_method, infer_parameters_from_function
+from bilby.core.utils import infer_args_from_method, infer_parameters_from_function, get_random_generator
 
 
 def conditional_prior_factory(prior_class):
@@ -57,13 +55,15 @@ def conditional_prior_factory(prior_class):
             self.__class__.__name__ = 'Conditional{}'.format(prior_class.__name__)
             self.__class__.__qualname__ = 'Conditional{}'.format(prior_class.__qualname__)
 
-        def sample(self, size=None, **required_variables):
+        def sample(self, size=None, rng=None, **required_variables):
             """Draw a sample from the prior
 
             Parameters
             ----------
             size: int or tuple of ints, optional
                 See superclass
+            rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+                See superclass
             required_variables:
                 Any required variables that this prior depends on
 
@@ -72,7 +72,8 @@ def conditional_prior_factory(prior_class):
             float: See superclass
 
             """
-            self.least_recently_sampled = self.rescale(np.random.uniform(0, 1, size), **required_variables)
+            rng = get_random_generator(rng)
+            self.least_recently_sampled = self.rescale(rng.uniform(0, 1, size), **required_variables)
             return self.least_recently_sampled
 
         def rescale(self, val, **required_variables):
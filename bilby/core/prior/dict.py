@@ -1,3 +1,5 @@
+from collections import OrderedDict, deque
+import copy
 from importlib import import_module
 from io import open as ioopen
 import json
@@ -6,13 +8,26 @@ import os
 
 from future.utils import iteritems
 from matplotlib.cbook import flatten
+from scipy.special import erfinv, erf
 
 # keep 'import *' to make eval() statement further down work consistently
 from bilby.core.prior.analytical import *  # noqa
-from bilby.core.prior.analytical import DeltaFunction
+from bilby.core.prior.analytical import (
+    DeltaFunction, PowerLaw, LogUniform, Uniform, Cosine, Sine, Gaussian,
+    Normal, TruncatedGaussian, TruncatedNormal, HalfGaussian, HalfNormal)
 from bilby.core.prior.base import Prior, Constraint
 from bilby.core.prior.joint import JointPrior
-from bilby.core.utils import logger, check_directory_exists_and_if_not_mkdir, BilbyJsonEncoder, decode_bilby_json
+from bilby.core.utils import logger, check_directory_exists_and_if_not_mkdir, BilbyJsonEncoder, decode_bilby_json, \
+    get_random_generator
+
+
+# The maximum number of samples drawn in a single pass of
+# PriorDict.sample_subset_constrained, unless more samples are requested
+_MAX_CONSTRAINED_DRAWS = 2 ** 20
+
+# Parsed prior files, keyed by absolute path. Each entry holds the
+# modification time and size of the file when it was parsed.
+_PRIOR_FILE_CACHE = dict()
 
 
 class PriorDict(dict):
@@ -137,10 +152,41 @@ class PriorDict(dict):
             floats, e.g.,                 foo = 1
             bilby.gw.prior as, e.g.,      foo = bilby.gw.prior.AlignedSpin()
             other external modules, e.g., foo = my.module.CustomPrior(...)
+
+        Parsed files are cached by path and modification time, reading the
+        same file again returns copies of the cached priors.
         """
 
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if _PRIOR_FILE_CACHE.get(filename, (None,))[0] != file_key:
+            _PRIOR_FILE_CACHE[filename] = (file_key, self._parse_prior_file(filename))
+        prior, attributes = copy.deepcopy(_PRIOR_FILE_CACHE[filename][1])
+        for key, value in attributes.items():
+            setattr(self, key, value)
+        self.update(prior)
+
+    @staticmethod
+    def _parse_prior_file(filename):
+        """ Parse a prior file into a dictionary of priors
+
+        Parameters
+        ----------
+        filename: str
+            Name of the file to be read in
+
+        Returns
+        -------
+        prior: dict
+            The priors in the file
+        attributes: dict
+            Functions in the file which are set as attributes of the prior
+            dictionary, e.g., the conversion_function
+        """
         comments = ['#', '\n']
         prior = dict()
+        attributes = dict()
         mvgdict = dict(inf=np.inf)  # evaluate inf as np.inf
         with ioopen(filename, 'r', encoding='unicode_escape') as f:
             for line in f:
@@ -166,7 +212,7 @@ class PriorDict(dict):
                     module = __name__.replace('.' + os.path.basename(__file__).replace('.py', ''), '')
                 cls = getattr(import_module(module), cls, cls)
                 if key.lower() in ["conversion_function", "condition_func"]:
-                    setattr(self, key, cls)
+                    attributes[key] = cls
                 elif (cls.__name__ in ['MultivariateGaussianDist',
                                        'MultivariateNormalDist']):
                     if key not in mvgdict:
@@ -182,7 +228,7 @@ class PriorDict(dict):
                             "Unable to parse dictionary file {}, bad line: {} "
                             "= {}. Error message {}".format(
                                 filename, key, val, e))
-        self.update(prior)
+        return prior, attributes
 
     @classmethod
     def _get_from_json_dict(cls, prior_dict):
@@ -292,21 +338,24 @@ class PriorDict(dict):
         for key in self:
             self.test_redundancy(key)
 
-    def sample(self, size=None):
+    def sample(self, size=None, rng=None):
         """Draw samples from the prior set
 
         Parameters
         ----------
         size: int or tuple of ints, optional
             See numpy.random.uniform docs
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
         dict: Dictionary of the samples
         """
-        return self.sample_subset_constrained(keys=list(self.keys()), size=size)
+        return self.sample_subset_constrained(keys=list(self.keys()), size=size, rng=rng)
 
-    def sample_subset(self, keys=iter([]), size=None):
+    def sample_subset(self, keys=iter([]), size=None, rng=None):
         """Draw samples from the prior set for parameters which are not a DeltaFunction
 
         Parameters
@@ -315,48 +364,115 @@ class PriorDict(dict):
             List of prior keys to draw samples from
         size: int or tuple of ints, optional
             See numpy.random.uniform docs
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
         dict: Dictionary of the drawn samples
         """
         self.convert_floats_to_delta_functions()
+        sample_kwargs = _random_generator_kwargs(rng)
         samples = dict()
         for key in keys:
             if isinstance(self[key], Constraint):
                 continue
             elif isinstance(self[key], Prior):
-                samples[key] = self[key].sample(size=size)
+                samples[key] = self[key].sample(size=size, **sample_kwargs)
             else:
                 logger.debug('{} not a known prior.'.format(key))
         return samples
 
-    def sample_subset_constrained(self, keys=iter([]), size=None):
+    def sample_subset_constrained(self, keys=iter([]), size=None, rng=None):
+        """Draw samples from the prior set which satisfy the constraints
+
+        For more than one sample, the number of draws in each pass is
+        chosen from the running estimate of the fraction of draws which
+        satisfy the constraints and the accepted samples are written into
+        preallocated arrays. The statistics of the draws are stored in
+        `constraint_sampling_statistics`.
+
+        Parameters
+        ----------
+        keys: list
+            List of prior keys to draw samples from
+        size: int or tuple of ints, optional
+            See numpy.random.uniform docs
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
+
+        Returns
+        -------
+        dict: Dictionary of the drawn samples
+        """
+        if rng is not None:
+            # share one stream between all of the passes
+            rng = get_random_generator(rng)
         if size is None or size == 1:
             while True:
-                sample = self.sample_subset(keys=keys, size=size)
+                sample = self.sample_subset(keys=keys, size=size, rng=rng)
                 if self.evaluate_constraints(sample):
                     return sample
+        elif not any(isinstance(self[key], Constraint) for key in self):
+            return self.sample_subset(keys=keys, size=size, rng=rng)
         else:
-            needed = np.prod(size)
-            constraint_keys = list()
-            for ii, key in enumerate(keys[-1::-1]):
-                if isinstance(self[key], Constraint):
-                    constraint_keys.append(-ii - 1)
-            for ii in constraint_keys[-1::-1]:
-                del keys[ii]
-            all_samples = {key: np.array([]) for key in keys}
-            _first_key = list(all_samples.keys())[0]
-            while len(all_samples[_first_key]) < needed:
-                samples = self.sample_subset(keys=keys, size=needed)
-                keep = np.array(self.evaluate_constraints(samples), dtype=bool)
-                for key in samples:
-                    all_samples[key] = np.hstack(
-                        [all_samples[key], samples[key][keep].flatten()])
-            all_samples = {key: np.reshape(all_samples[key][:needed], size)
-                           for key in all_samples
-                           if not isinstance(self[key], Constraint)}
-            return all_samples
+            needed = int(np.prod(size))
+            keys = [key for key in keys if not isinstance(self[key], Constraint)]
+            statistics = self.constraint_sampling_statistics
+            acceptance = statistics['acceptance_fraction']
+            max_draw = max(2 * needed, _MAX_CONSTRAINED_DRAWS)
+            n_draw = 0
+            n_draws = 0
+            n_accepted = 0
+            n_passes = 0
+            all_samples = {key: np.empty(needed) for key in keys}
+            filled = 0
+            while filled < needed:
+                remaining = needed - filled
+                if n_accepted == 0 and n_draws > 0:
+                    # no estimate of the acceptance fraction yet
+                    n_draw = 10 * n_draw
+                else:
+                    # draw enough to finish in this pass with high probability
+                    n_draw = int(np.ceil(
+                        (remaining + 3 * remaining ** 0.5) / acceptance))
+                n_draw = max(min(n_draw, max_draw), remaining)
+                samples = self.sample_subset(keys=keys, size=n_draw, rng=rng)
+                keep = np.ones(n_draw, dtype=bool) & np.array(
+                    self.evaluate_constraints(samples), dtype=bool).flatten()
+                n_draws += n_draw
+                n_accepted += int(np.sum(keep))
+                n_passes += 1
+                if n_accepted > 0:
+                    acceptance = n_accepted / n_draws
+                n_keep = min(int(np.sum(keep)), remaining)
+                for key in all_samples:
+                    all_samples[key][filled:filled + n_keep] = \
+                        np.asarray(samples[key]).flatten()[keep][:n_keep]
+                filled += n_keep
+            self.constraint_sampling_statistics = dict(
+                n_draws=n_draws, n_accepted=n_accepted, n_passes=n_passes,
+                acceptance_fraction=acceptance)
+            return {key: np.reshape(all_samples[key], size) for key in all_samples}
+
+    @property
+    def constraint_sampling_statistics(self):
+        """ Statistics of the last call to `sample_subset_constrained` with
+        more than one sample
+
+        The acceptance fraction is used as the initial estimate for the next
+        call.
+        """
+        if getattr(self, '_constraint_sampling_statistics', None) is None:
+            self._constraint_sampling_statistics = dict(
+                n_draws=0, n_accepted=0, n_passes=0, acceptance_fraction=1.)
+        return self._constraint_sampling_statistics
+
+    @constraint_sampling_statistics.setter
+    def constraint_sampling_statistics(self, constraint_sampling_statistics):
+        self._constraint_sampling_statistics = constraint_sampling_statistics
 
     def prob(self, sample, **kwargs):
         """
@@ -423,6 +539,40 @@ class PriorDict(dict):
                 constrained_ln_prob[keep] = ln_prob[keep]
                 return constrained_ln_prob
 
+    def ln_prob_array(self, array, keys=None):
+        """Log probability of many samples stored as the columns of an array
+
+        Constraints are only evaluated for the samples which have a non-zero
+        probability, and are skipped if there are no constraints.
+
+        Parameters
+        ----------
+        array: array_like
+            Either a structured array, whose field names are the prior keys,
+            or a two-dimensional (N, ndim) array
+        keys: list, optional
+            The prior keys of the columns of `array`, required if `array` is
+            not a structured array
+
+        Returns
+        -------
+        array_like: The joint log probability of each of the N samples
+        """
+        sample = _array_to_columns(array, keys)
+        ln_prob = np.zeros(len(next(iter(sample.values()))))
+        for key in sample:
+            ln_prob += self[key].ln_prob(sample[key])
+
+        if not any(isinstance(self[key], Constraint) for key in self):
+            return ln_prob
+        keep = ln_prob > -np.inf
+        if np.any(keep):
+            constrained = self.evaluate_constraints(
+                {key: sample[key][keep] for key in sample})
+            keep[keep] = np.array(constrained, dtype=bool)
+        ln_prob[~keep] = -np.inf
+        return ln_prob
+
     def rescale(self, keys, theta):
         """Rescale samples from unit cube to prior
 
@@ -439,6 +589,27 @@ class PriorDict(dict):
         """
         return list(flatten([self[key].rescale(sample) for key, sample in zip(keys, theta)]))
 
+    def compile_rescale(self, keys):
+        """Build a vectorized transform from the unit cube to the prior
+
+        The returned object is equivalent to `self.rescale(keys, theta)` but
+        rescales priors of the same class with single array operations and
+        accepts arrays of many points at once. It is a snapshot of the
+        current priors, changes to the priors after this is called are not
+        reflected in the transform.
+
+        Parameters
+        ----------
+        keys: list
+            List of prior keys to be rescaled, in the order of the columns
+            of the unit cube array
+
+        Returns
+        -------
+        PriorTransform: The compiled transform
+        """
+        return PriorTransform(self, keys)
+
     def test_redundancy(self, key, disable_logging=False):
         """Empty redundancy test, should be overwritten in subclasses"""
         return False
@@ -471,6 +642,209 @@ class PriorDict(dict):
         return self.__class__(dictionary=dict(self))
 
 
+def _random_generator_kwargs(rng):
+    """ Keyword arguments passing a shared random generator to Prior.sample
+
+    Nothing is passed by default so that priors which override sample
+    without an rng argument keep working.
+    """
+    if rng is None:
+        return dict()
+    return dict(rng=get_random_generator(rng))
+
+
+def _array_to_columns(array, keys=None):
+    """ Convert a structured or (N, ndim) array to a dictionary of columns """
+    array = np.asarray(array)
+    if array.dtype.names is not None:
+        return OrderedDict((key, np.atleast_1d(array[key]))
+                           for key in array.dtype.names)
+    if keys is None:
+        raise ValueError("Keys must be given for an unstructured array")
+    array = np.atleast_2d(array)
+    if array.shape[1] != len(keys):
+        raise ValueError("Array with {} columns given for {} keys".format(
+            array.shape[1], len(keys)))
+    return OrderedDict((key, array[:, ii]) for ii, key in enumerate(keys))
+
+
+def _rescale_delta_function(val, peak):
+    return peak * val ** 0
+
+
+def _rescale_uniform(val, minimum, maximum):
+    return minimum + val * (maximum - minimum)
+
+
+def _rescale_log_uniform(val, minimum, maximum):
+    return minimum * np.exp(val * np.log(maximum / minimum))
+
+
+def _rescale_power_law(val, alpha, minimum, maximum):
+    return (minimum ** (1 + alpha) + val *
+            (maximum ** (1 + alpha) - minimum ** (1 + alpha))) ** (1. / (1 + alpha))
+
+
+def _rescale_cosine(val, minimum, maximum):
+    norm = 1 / (np.sin(maximum) - np.sin(minimum))
+    return np.arcsin(val / norm + np.sin(minimum))
+
+
+def _rescale_sine(val, minimum, maximum):
+    norm = 1 / (np.cos(minimum) - np.cos(maximum))
+    return np.arccos(np.cos(minimum) - val / norm)
+
+
+def _rescale_gaussian(val, mu, sigma):
+    return mu + erfinv(2 * val - 1) * 2 ** 0.5 * sigma
+
+
+def _rescale_truncated_gaussian(val, mu, sigma, minimum, maximum, normalisation):
+    return erfinv(2 * val * normalisation + erf(
+        (minimum - mu) / 2 ** 0.5 / sigma)) * 2 ** 0.5 * sigma + mu
+
+
+def _power_law_rescale_group(prior):
+    if prior.alpha == -1:
+        return _rescale_log_uniform, (prior.minimum, prior.maximum)
+    else:
+        return _rescale_power_law, (prior.alpha, prior.minimum, prior.maximum)
+
+
+def _truncated_gaussian_rescale_group(prior):
+    return _rescale_truncated_gaussian, (
+        prior.mu, prior.sigma, prior.minimum, prior.maximum,
+        prior.normalisation)
+
+
+# Functions returning the vectorized rescale function and its parameters
+# for each prior class which can be rescaled in a group. Only exact class
+# matches are used as subclasses may override rescale.
+_VECTORIZED_RESCALE_GROUPS = {
+    DeltaFunction: lambda prior: (_rescale_delta_function, (prior.peak,)),
+    Uniform: lambda prior: (_rescale_uniform, (prior.minimum, prior.maximum)),
+    PowerLaw: _power_law_rescale_group,
+    LogUniform: _power_law_rescale_group,
+    Cosine: lambda prior: (_rescale_cosine, (prior.minimum, prior.maximum)),
+    Sine: lambda prior: (_rescale_sine, (prior.minimum, prior.maximum)),
+    Gaussian: lambda prior: (_rescale_gaussian, (prior.mu, prior.sigma)),
+    Normal: lambda prior: (_rescale_gaussian, (prior.mu, prior.sigma)),
+    TruncatedGaussian: _truncated_gaussian_rescale_group,
+    TruncatedNormal: _truncated_gaussian_rescale_group,
+    HalfGaussian: _truncated_gaussian_rescale_group,
+    HalfNormal: _truncated_gaussian_rescale_group,
+}
+
+
+class PriorTransform(object):
+
+    def __init__(self, priors, keys):
+        """ A compiled transform from the unit cube to a set of priors
+
+        Priors with an analytic rescale are grouped by rescale function and
+        each group is rescaled with a single array operation. The parameters
+        of each joint distribution are rescaled together with a single call
+        to the distribution. All other
+        priors are rescaled one at a time, in an evaluation order resolved
+        once from the conditional dependencies.
+
+        Parameters
+        ----------
+        priors: PriorDict
+            The priors to rescale to
+        keys: list
+            List of prior keys, in the order of the columns of the unit cube
+        """
+        self.keys = list(keys)
+        self.ndim = len(self.keys)
+        self.priors = priors
+        self._use_prior_dict = False
+
+        groups = dict()
+        joint_distributions = dict()
+        self._plan = list()
+        evaluation_order = [key for key in getattr(priors, 'sorted_keys', self.keys)
+                            if key in self.keys]
+        for key in evaluation_order:
+            prior = priors[key]
+            index = self.keys.index(key)
+            if isinstance(prior, JointPrior):
+                joint_distributions[id(prior.dist)] = prior.dist
+            elif type(prior) in _VECTORIZED_RESCALE_GROUPS:
+                function, parameters = _VECTORIZED_RESCALE_GROUPS[type(prior)](prior)
+                group = groups.setdefault(function, ([], []))
+                group[0].append(index)
+                group[1].append(parameters)
+            else:
+                required_variables = getattr(prior, 'required_variables', [])
+                for name in required_variables:
+                    if name not in self.keys:
+                        raise IllegalConditionsException(
+                            "Unable to rescale {}, required variable {} is "
+                            "not rescaled".format(key, name))
+                self._plan.append((key, index, [
+                    (name, self.keys.index(name)) for name in required_variables]))
+        self._groups = [
+            (function, np.array(indexes),
+             tuple(np.array(values, dtype=float) for values in zip(*parameters)))
+            for function, (indexes, parameters) in groups.items()]
+
+        # Joint distributions are rescaled as a block without using the
+        # stateful JointPrior.rescale, this requires all of their parameters.
+        self._joint_groups = list()
+        for dist in joint_distributions.values():
+            if not set(dist.names).issubset(self.keys):
+                self._use_prior_dict = True
+                break
+            self._joint_groups.append(
+                (dist, np.array([self.keys.index(name) for name in dist.names])))
+
+    def __call__(self, theta):
+        """Rescale samples from the unit cube to the prior
+
+        Parameters
+        ----------
+        theta: array_like
+            Values on the unit cube, either a single point of shape (ndim,)
+            or an array of points of shape (N, ndim)
+
+        Returns
+        -------
+        array_like: The rescaled samples, with the same shape as theta
+        """
+        theta = np.asarray(theta, dtype=float)
+        if self._use_prior_dict:
+            if theta.ndim == 1:
+                return np.array(self.priors.rescale(self.keys, theta))
+            return np.array([self.priors.rescale(self.keys, point) for point in theta])
+        Prior.test_valid_for_rescaling(theta)
+        points = np.atleast_2d(theta)
+        rescaled = np.empty(points.shape)
+        for function, indexes, parameters in self._groups:
+            rescaled[:, indexes] = function(points[:, indexes], *parameters)
+        for dist, indexes in self._joint_groups:
+            rescaled[:, indexes] = np.reshape(
+                dist.rescale(points[:, indexes]), (len(points), len(indexes)))
+        for key, index, required_variables in self._plan:
+            prior = self.priors[key]
+            if theta.ndim == 1:
+                rescaled[0, index] = prior.rescale(points[0, index], **{
+                    name: rescaled[0, jj] for name, jj in required_variables})
+                continue
+            try:
+                rescaled[:, index] = prior.rescale(points[:, index], **{
+                    name: rescaled[:, jj] for name, jj in required_variables})
+            except ValueError:
+                # Some prior classes can not handle an array of conditional
+                # parameters, if so rescale each point individually.
+                for ii in range(len(points)):
+                    rescaled[ii, index] = prior.rescale(points[ii, index], **{
+                        name: rescaled[ii, jj] for name, jj in required_variables})
+        if theta.ndim == 1:
+            return rescaled[0]
+        return rescaled
+
+
 class PriorSet(PriorDict):
 
     def __init__(self, dictionary=None, filename=None):
@@ -497,6 +871,11 @@ class ConditionalPriorDict(PriorDict):
         """
         self._conditional_keys = []
         self._unconditional_keys = []
+        self._sorted_keys = []
+        self._required_variables = dict()
+        self._sorted_keys_without_fixed_parameters = []
+        self._conditions_resolved = False
+        self._dependency_graph_is_current = False
         self._rescale_keys = []
         self._rescale_indexes = []
         self._least_recently_rescaled_keys = []
@@ -504,62 +883,109 @@ class ConditionalPriorDict(PriorDict):
             dictionary=dictionary, filename=filename,
             conversion_function=conversion_function
         )
-        self._resolved = False
         self._resolve_conditions()
 
     def _resolve_conditions(self):
+        """
+        Mark the dependency graph of the priors as out of date.
+
+        The graph is rebuilt the next time it is needed, so repeatedly
+        mutating the dictionary only resolves the conditions once.
+        """
+        self._dependency_graph_is_current = False
+        self._least_recently_rescaled_keys = []
+
+    def _update_dependency_graph(self):
         """
         Resolves how priors depend on each other and automatically
         sorts them into the right order.
+
         1. All unconditional priors are put in front in arbitrary order
-        2. We loop through all the unsorted conditional priors to find
-        which one can go next
-        3. We repeat step 2 len(self) number of times to make sure that
-        all conditional priors will be sorted in order
-        4. We set the `self._resolved` flag to True if all conditional
+        2. The conditional priors are topologically sorted, a prior is
+        placed once all of its required variables have been placed. Ties
+        are broken by the order of the keys in the dictionary.
+        3. We set the `self._resolved` flag to True if all conditional
         priors were added in the right order
+
+        The result is cached until the dictionary changes.
         """
+        if self._dependency_graph_is_current:
+            return
         self._unconditional_keys = [key for key in self.keys() if not hasattr(self[key], 'condition_func')]
         conditional_keys_unsorted = [key for key in self.keys() if hasattr(self[key], 'condition_func')]
-        self._conditional_keys = []
-        for _ in range(len(self)):
-            for key in conditional_keys_unsorted[:]:
-                if self._check_conditions_resolved(key, self.sorted_keys):
-                    self._conditional_keys.append(key)
-                    conditional_keys_unsorted.remove(key)
-
-        self._resolved = True
-        if len(conditional_keys_unsorted) != 0:
-            self._resolved = False
-
-    def _check_conditions_resolved(self, key, sampled_keys):
-        """ Checks if all required variables have already been sampled so we can sample this key """
-        conditions_resolved = True
-        for k in self[key].required_variables:
-            if k not in sampled_keys:
-                conditions_resolved = False
-        return conditions_resolved
-
-    def sample_subset(self, keys=iter([]), size=None):
-        self.convert_floats_to_delta_functions()
-        subset_dict = ConditionalPriorDict({key: self[key] for key in keys})
-        if not subset_dict._resolved:
+        self._required_variables = {
+            key: list(getattr(self[key], 'required_variables', [])) for key in self.keys()}
+
+        index = {key: ii for ii, key in enumerate(conditional_keys_unsorted)}
+        dependents = {key: [] for key in conditional_keys_unsorted}
+        n_unresolved = dict()
+        ready = deque()
+        for key in conditional_keys_unsorted:
+            parents = set(self._required_variables[key])
+            conditional_parents = [parent for parent in parents if parent in index]
+            for parent in conditional_parents:
+                dependents[parent].append(key)
+            # variables which are not in the dictionary can never be resolved
+            n_unresolved[key] = len(conditional_parents) + len(parents.difference(self.keys()))
+            if n_unresolved[key] == 0:
+                ready.append(key)
+
+        # Priors are ordered as if they were placed by sweeping repeatedly
+        # through the keys, sweep[key] is the sweep in which key is placed
+        sweep = dict()
+        while len(ready) > 0:
+            key = ready.popleft()
+            sweep[key] = max([1] + [
+                sweep[parent] + (index[parent] > index[key])
+                for parent in self._required_variables[key] if parent in index])
+            for child in dependents[key]:
+                n_unresolved[child] -= 1
+                if n_unresolved[child] == 0:
+                    ready.append(child)
+
+        self._conditional_keys = sorted(sweep, key=lambda key: (sweep[key], index[key]))
+        self._conditions_resolved = len(self._conditional_keys) == len(conditional_keys_unsorted)
+        self._sorted_keys = self._unconditional_keys + self._conditional_keys
+        self._sorted_keys_without_fixed_parameters = [
+            key for key in self._sorted_keys if not isinstance(self[key], (DeltaFunction, Constraint))]
+        self._dependency_graph_is_current = True
+
+    def _sorted_subset(self, keys):
+        """ Get the keys of a subset of the priors in the order they should be sampled
+
+        Raises
+        ------
+        IllegalConditionsException: If the subset contains unresolvable conditions.
+        """
+        self._update_dependency_graph()
+        keys = set(keys)
+        for key in keys.difference(self.keys()):
+            raise KeyError(key)
+        resolved = keys.issubset(self._sorted_keys) and all(
+            keys.issuperset(self._required_variables[key]) for key in keys)
+        if not resolved:
             raise IllegalConditionsException("The current set of priors contains unresolvable conditions.")
+        return [key for key in self._sorted_keys if key in keys]
+
+    def sample_subset(self, keys=iter([]), size=None, rng=None):
+        self.convert_floats_to_delta_functions()
+        sample_kwargs = _random_generator_kwargs(rng)
         samples = dict()
-        for key in subset_dict.sorted_keys:
+        for key in self._sorted_subset(keys):
             if isinstance(self[key], Constraint):
                 continue
             elif isinstance(self[key], Prior):
                 try:
-                    samples[key] = subset_dict[key].sample(size=size, **subset_dict.get_required_variables(key))
+                    samples[key] = self[key].sample(
+                        size=size, **sample_kwargs, **self.get_required_variables(key))
                 except ValueError:
                     # Some prior classes can not handle an array of conditional parameters (e.g. alpha for PowerLaw)
                     # If that is the case, we sample each sample individually.
-                    required_variables = subset_dict.get_required_variables(key)
+                    required_variables = self.get_required_variables(key)
                     samples[key] = np.zeros(size)
                     for i in range(size):
                         rvars = {key: value[i] for key, value in required_variables.items()}
-                        samples[key][i] = subset_dict[key].sample(**rvars)
+                        samples[key][i] = self[key].sample(**sample_kwargs, **rvars)
             else:
                 logger.debug('{} not a known prior.'.format(key))
         return samples
@@ -576,7 +1002,8 @@ class ConditionalPriorDict(PriorDict):
         ----------
         dict: key/value pairs of the required variables
         """
-        return {k: self[k].least_recently_sampled for k in getattr(self[key], 'required_variables', [])}
+        self._update_dependency_graph()
+        return {k: self[k].least_recently_sampled for k in self._required_variables[key]}
 
     def prob(self, sample, **kwargs):
         """
@@ -620,6 +1047,13 @@ class ConditionalPriorDict(PriorDict):
         res = [self[key].ln_prob(sample[key], **self.get_required_variables(key)) for key in sample]
         return np.sum(res, axis=axis)
 
+    def ln_prob_array(self, array, keys=None):
+        """Log probability of many samples stored as the columns of an array
+
+        See `PriorDict.ln_prob_array`.
+        """
+        return self.ln_prob(_array_to_columns(array, keys), axis=0)
+
     def rescale(self, keys, theta):
         """Rescale samples from unit cube to prior
 
@@ -638,10 +1072,19 @@ class ConditionalPriorDict(PriorDict):
         self._update_rescale_keys(keys)
         result = dict()
         for key, index in zip(self.sorted_keys_without_fixed_parameters, self._rescale_indexes):
-            required_variables = {k: result[k] for k in getattr(self[key], 'required_variables', [])}
+            required_variables = {k: result[k] for k in self._required_variables[key]}
             result[key] = self[key].rescale(theta[index], **required_variables)
         return [result[key] for key in keys]
 
+    def compile_rescale(self, keys):
+        """Build a vectorized transform from the unit cube to the prior
+
+        See `PriorDict.compile_rescale`, the conditional dependencies are
+        resolved once when the transform is built.
+        """
+        self._check_resolved()
+        return super(ConditionalPriorDict, self).compile_rescale(keys)
+
     def _update_rescale_keys(self, keys):
         if not keys == self._least_recently_rescaled_keys:
             self._rescale_indexes = [keys.index(element) for element in self.sorted_keys_without_fixed_parameters]
@@ -651,21 +1094,30 @@ class ConditionalPriorDict(PriorDict):
         if not self._resolved:
             raise IllegalConditionsException("The current set of priors contains unresolveable conditions.")
 
+    @property
+    def _resolved(self):
+        self._update_dependency_graph()
+        return self._conditions_resolved
+
     @property
     def conditional_keys(self):
+        self._update_dependency_graph()
         return self._conditional_keys
 
     @property
     def unconditional_keys(self):
+        self._update_dependency_graph()
         return self._unconditional_keys
 
     @property
     def sorted_keys(self):
-        return self.unconditional_keys + self.conditional_keys
+        self._update_dependency_graph()
+        return list(self._sorted_keys)
 
     @property
     def sorted_keys_without_fixed_parameters(self):
-        return [key for key in self.sorted_keys if not isinstance(self[key], (DeltaFunction, Constraint))]
+        self._update_dependency_graph()
+        return self._sorted_keys_without_fixed_parameters
 
     def __setitem__(self, key, value):
         super(ConditionalPriorDict, self).__setitem__(key, value)
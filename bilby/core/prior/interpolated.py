@@ -1,6 +1,4 @@
 import numpy as np
-from scipy.integrate import cumtrapz
-from scipy.interpolate import interp1d
 
 from .base import Prior
 from bilby.core.utils import logger
@@ -33,29 +31,57 @@ class Interped(Prior):
 
         Attributes
         ----------
-        probability_density: scipy.interpolate.interp1d
+        probability_density: PiecewiseLinear
             Interpolated prior probability distribution
-        cumulative_distribution: scipy.interpolate.interp1d
+        cumulative_distribution: PiecewiseLinear
             Interpolated cumulative prior probability distribution
-        inverse_cumulative_distribution: scipy.interpolate.interp1d
+        inverse_cumulative_distribution: PiecewiseLinear
             Inverted cumulative prior probability distribution
         YY: array_like
             Cumulative prior probability distribution
 
+        Notes
+        -----
+        The interpolants are rebuilt lazily, the first time they are needed
+        after the `minimum`, `maximum` or `yy` change.
+
         """
-        self.xx = xx
+        xx = np.asarray(xx, dtype=float)
+        yy = np.asarray(yy, dtype=float)
+        order = np.argsort(xx, kind='mergesort')
+        self._xx_all = xx[order]
+        self._yy_all = yy[order]
+        self._xx = xx
         self._yy = yy
-        self.YY = None
-        self.probability_density = None
-        self.cumulative_distribution = None
-        self.inverse_cumulative_distribution = None
-        self.__all_interpolated = interp1d(x=xx, y=yy, bounds_error=False, fill_value=0)
-        minimum = float(np.nanmax(np.array((min(xx), minimum))))
-        maximum = float(np.nanmin(np.array((max(xx), maximum))))
+        self._YY = None
+        self._needs_update = True
+        minimum = float(np.nanmax(np.array((self._xx_all[0], minimum))))
+        maximum = float(np.nanmin(np.array((self._xx_all[-1], maximum))))
         super(Interped, self).__init__(name=name, latex_label=latex_label, unit=unit,
                                        minimum=minimum, maximum=maximum, boundary=boundary)
         self._update_instance()
 
+    @classmethod
+    def from_arrays(cls, xx, yys, **kwargs):
+        """Create many interpolated priors which share the same xx values
+
+        The interpolants of each prior are only built when it is first used.
+
+        Parameters
+        ----------
+        xx: array_like
+            x values for the to be interpolated prior functions
+        yys: array_like
+            Two-dimensional array, each row are the p(xx) values of one prior
+        kwargs:
+            Passed to the constructor of each prior
+
+        Returns
+        -------
+        list: The interpolated priors
+        """
+        return [cls(xx=xx, yy=yy, **kwargs) for yy in np.atleast_2d(yys)]
+
     def __eq__(self, other):
         if self.__class__ != other.__class__:
             return False
@@ -74,10 +100,12 @@ class Interped(Prior):
         -------
          Union[float, array_like]: Prior probability of val
         """
-        return self.probability_density(val)
+        self._initialize_attributes()
+        return np.asarray(np.interp(val, self._xx, self._yy, left=0, right=0))
 
     def cdf(self, val):
-        return self.cumulative_distribution(val)
+        self._initialize_attributes()
+        return np.asarray(np.interp(val, self._xx, self._YY, left=0, right=1))
 
     def rescale(self, val):
         """
@@ -86,8 +114,9 @@ class Interped(Prior):
         This maps to the inverse CDF. This is done using interpolation.
         """
         self.test_valid_for_rescaling(val)
-        rescaled = self.inverse_cumulative_distribution(val)
-        if rescaled.shape == ():
+        self._initialize_attributes()
+        rescaled = np.interp(val, self._YY, self._xx)
+        if np.shape(rescaled) == ():
             rescaled = float(rescaled)
         return rescaled
 
@@ -107,8 +136,7 @@ class Interped(Prior):
     @minimum.setter
     def minimum(self, minimum):
         self._minimum = minimum
-        if '_maximum' in self.__dict__ and self._maximum < np.inf:
-            self._update_instance()
+        self._update_instance()
 
     @property
     def maximum(self):
@@ -126,8 +154,19 @@ class Interped(Prior):
     @maximum.setter
     def maximum(self, maximum):
         self._maximum = maximum
-        if '_minimum' in self.__dict__ and self._minimum < np.inf:
-            self._update_instance()
+        self._update_instance()
+
+    @property
+    def xx(self):
+        """Return the x values of the interpolated prior function.
+
+        Returns
+        -------
+        array_like: x values, evenly spaced between minimum and maximum
+
+        """
+        self._initialize_attributes()
+        return self._xx
 
     @property
     def yy(self):
@@ -140,29 +179,82 @@ class Interped(Prior):
         array_like: p(xx) values
 
         """
+        self._initialize_attributes()
         return self._yy
 
     @yy.setter
     def yy(self, yy):
-        self._yy = yy
-        self.__all_interpolated = interp1d(x=self.xx, y=self._yy, bounds_error=False, fill_value=0)
+        self._initialize_attributes()
+        self._xx_all = self._xx
+        self._yy_all = np.asarray(yy, dtype=float)
         self._update_instance()
 
-    def _update_instance(self):
-        self.xx = np.linspace(self.minimum, self.maximum, len(self.xx))
-        self._yy = self.__all_interpolated(self.xx)
+    @property
+    def YY(self):
+        self._initialize_attributes()
+        return self._YY
+
+    @property
+    def probability_density(self):
+        self._initialize_attributes()
+        return PiecewiseLinear(self._xx, self._yy, left=0, right=0)
+
+    @property
+    def cumulative_distribution(self):
+        self._initialize_attributes()
+        return PiecewiseLinear(self._xx, self._YY, left=0, right=1)
+
+    @property
+    def inverse_cumulative_distribution(self):
         self._initialize_attributes()
+        return PiecewiseLinear(self._YY, self._xx)
+
+    def _update_instance(self):
+        self._needs_update = True
 
     def _initialize_attributes(self):
-        if np.trapz(self._yy, self.xx) != 1:
+        if not self._needs_update:
+            return
+        self._xx = np.linspace(self.minimum, self.maximum, len(self._xx))
+        self._yy = np.interp(self._xx, self._xx_all, self._yy_all, left=0, right=0)
+        self._YY = np.zeros(len(self._xx))
+        np.cumsum(np.diff(self._xx) * (self._yy[1:] + self._yy[:-1]) / 2, out=self._YY[1:])
+        norm = self._YY[-1]
+        if norm != 1:
             logger.debug('Supplied PDF for {} is not normalised, normalising.'.format(self.name))
-        self._yy /= np.trapz(self._yy, self.xx)
-        self.YY = cumtrapz(self._yy, self.xx, initial=0)
+        self._yy /= norm
+        self._YY /= norm
         # Need last element of cumulative distribution to be exactly one.
-        self.YY[-1] = 1
-        self.probability_density = interp1d(x=self.xx, y=self._yy, bounds_error=False, fill_value=0)
-        self.cumulative_distribution = interp1d(x=self.xx, y=self.YY, bounds_error=False, fill_value=(0, 1))
-        self.inverse_cumulative_distribution = interp1d(x=self.YY, y=self.xx, bounds_error=True)
+        self._YY[-1] = 1
+        self._needs_update = False
+
+
+class PiecewiseLinear(object):
+
+    def __init__(self, xx, yy, left=None, right=None):
+        """A piecewise linear function, evaluated with `numpy.interp`
+
+        Parameters
+        ----------
+        xx: array_like
+            The increasing x values of the nodes
+        yy: array_like
+            The function values at the nodes
+        left, right: float, optional
+            The values below and above the range of xx, if not given the
+            function raises a ValueError outside the range.
+        """
+        self.xx = xx
+        self.yy = yy
+        self.left = left
+        self.right = right
+
+    def __call__(self, val):
+        if self.left is None or self.right is None:
+            valarray = np.atleast_1d(val)
+            if np.any((valarray < self.xx[0]) | (valarray > self.xx[-1])):
+                raise ValueError("A value is outside the interpolation range.")
+        return np.asarray(np.interp(val, self.xx, self.yy, left=self.left, right=self.right))
 
 
 class FromFile(Interped):
@@ -3,7 +3,7 @@ import scipy.stats
 from scipy.special import erfinv
 
 from .base import Prior, PriorException
-from bilby.core.utils import logger, infer_args_from_method
+from bilby.core.utils import logger, infer_args_from_method, get_random_generator
 
 
 class BaseJointPriorDist(object):
@@ -273,6 +273,10 @@ class BaseJointPriorDist(object):
         bounds are applied in the rescale function. (child classes need to
         overwrite accompanying method _rescale().
 
+        Unlike `JointPrior.rescale` this does not store any state on the
+        distribution, so it can be used to rescale many points at once and
+        from multiple threads.
+
         Parameters
         ----------
         value: array
@@ -374,6 +378,7 @@ class MultivariateGaussianDist(BaseJointPriorDist):
         self.eigvalues = []
         self.eigvectors = []
         self.sqeigvalues = []  # square root of the eigenvalues
+        self.rescale_matrices = []  # maps unit normal samples to each mode
         self.mvn = []  # list of multivariate normal distributions
 
         self._current_sample = {}  # initialise empty sample
@@ -530,6 +535,11 @@ class MultivariateGaussianDist(BaseJointPriorDist):
                              "definite")
         self.sqeigvalues.append(np.sqrt(self.eigvalues[-1]))
 
+        # precompute the rotation and scaling from unit normal samples
+        self.rescale_matrices.append(
+            (self.eigvectors[-1] * self.sqeigvalues[-1]).T *
+            np.asarray(self.sigmas[-1]))
+
         # set the weights
         if weight is None:
             self.weights.append(1.)
@@ -556,46 +566,45 @@ class MultivariateGaussianDist(BaseJointPriorDist):
             if self.nmodes == 1:
                 mode = 0
             else:
-                mode = np.argwhere(self.cumweights - np.random.rand() > 0)[0][0]
+                # draw a mode for each sample
+                rng = get_random_generator(kwargs.get('rng', None))
+                mode = np.searchsorted(
+                    self.cumweights, rng.uniform(0, 1, len(samp)), side='right')
 
         samp = erfinv(2. * samp - 1) * 2. ** 0.5
 
         # rotate and scale to the multivariate normal shape
-        samp = self.mus[mode] + self.sigmas[mode] * np.einsum('ij,kj->ik',
-                                                              samp * self.sqeigvalues[mode],
-                                                              self.eigvectors[mode])
-        return samp
+        if np.ndim(mode) == 0:
+            return self.mus[mode] + np.dot(samp, self.rescale_matrices[mode])
+        rescaled = np.empty(samp.shape)
+        for ii in np.unique(mode):
+            in_mode = mode == ii
+            rescaled[in_mode] = self.mus[ii] + np.dot(
+                samp[in_mode], self.rescale_matrices[ii])
+        return rescaled
 
     def _sample(self, size, **kwargs):
         try:
             mode = kwargs['mode']
         except KeyError:
             mode = None
+        rng = get_random_generator(kwargs.get('rng', None))
 
-        if mode is None:
-            if self.nmodes == 1:
-                mode = 0
-            else:
-                mode = np.argwhere(self.cumweights - np.random.rand() > 0)[0][0]
+        if mode is None and self.nmodes == 1:
+            mode = 0
+        lower = np.array([self.bounds[name][0] for name in self.names])
+        upper = np.array([self.bounds[name][1] for name in self.names])
         samps = np.zeros((size, len(self)))
-        for i in range(size):
-            inbound = False
-            while not inbound:
-                # sample the multivariate Gaussian keys
-                vals = np.random.uniform(0, 1, len(self))
-
-                samp = np.atleast_1d(self.rescale(vals, mode=mode))
-                samps[i, :] = samp
-
-                # check sample is in bounds (otherwise perform another draw)
-                outbound = False
-                for name, val in zip(self.names, samp):
-                    if val < self.bounds[name][0] or val > self.bounds[name][1]:
-                        outbound = True
-                        break
-
-                if not outbound:
-                    inbound = True
+        filled = 0
+        while filled < size:
+            # sample the multivariate Gaussian keys and keep the samples
+            # which are in bounds (otherwise perform another draw)
+            vals = rng.uniform(0, 1, (size - filled, len(self)))
+            samp = self._rescale(vals, mode=mode, rng=rng)
+            inbound = np.all((samp >= lower) & (samp <= upper), axis=1)
+            n_inbound = np.sum(inbound)
+            samps[filled:filled + n_inbound] = samp[inbound]
+            filled += n_inbound
 
         return samps
 
@@ -725,7 +734,8 @@ class JointPrior(Prior):
         size: int, float (defaults to 1)
             number of samples to draw
         kwargs: dict
-            kwargs passed to the dist.sample method
+            kwargs passed to the dist.sample method, e.g., the mode or the
+            source of random numbers, rng
         Returns
         -------
         float:
@@ -170,10 +170,14 @@ def run_sampler(likelihood, priors=None, label='label', outdir='outdir',
         return sampler.cached_result
 
     start_time = datetime.datetime.now()
-    if command_line_args.bilby_test_mode:
-        result = sampler._run_test()
-    else:
-        result = sampler.run_sampler()
+    sampler.compile_prior_transform()
+    try:
+        if command_line_args.bilby_test_mode:
+            result = sampler._run_test()
+        else:
+            result = sampler.run_sampler()
+    finally:
+        sampler.release_prior_transform()
     end_time = datetime.datetime.now()
 
     # Some samplers calculate the sampling time internally
@@ -112,6 +112,7 @@ class Sampler(object):
         self._search_parameter_keys = list()
         self._fixed_parameter_keys = list()
         self._constraint_parameter_keys = list()
+        self._prior_transform = None
         self._initialise_parameters()
 
         if not soft_init:
@@ -346,9 +347,28 @@ class Sampler(object):
                 "use_ratio not spec. but gives valid answer, setting True")
             self.use_ratio = True
 
+    def compile_prior_transform(self):
+        """ Compile the prior transform used during the run
+
+        This is called by `bilby.run_sampler` before sampling starts. Changes
+        to the priors after this are not seen by `prior_transform` until
+        `release_prior_transform` is called.
+        """
+        self._prior_transform = self.priors.compile_rescale(
+            self._search_parameter_keys)
+
+    def release_prior_transform(self):
+        """ Stop using the prior transform compiled by
+        `compile_prior_transform` """
+        self._prior_transform = None
+
     def prior_transform(self, theta):
         """ Prior transform method that is passed into the external sampler.
 
+        During a run the priors are frozen, the transform compiled at the
+        start of the run by `compile_prior_transform` is used, otherwise the
+        transform is compiled from the current priors for each call.
+
         Parameters
         ----------
         theta: list
@@ -356,9 +376,11 @@ class Sampler(object):
 
         Returns
         -------
-        list: Properly rescaled sampled values
+        array_like: Properly rescaled sampled values
         """
-        return self.priors.rescale(self._search_parameter_keys, theta)
+        if self._prior_transform is None:
+            return self.priors.compile_rescale(self._search_parameter_keys)(theta)
+        return self._prior_transform(theta)
 
     def log_prior(self, theta):
         """
@@ -377,6 +399,22 @@ class Sampler(object):
             key: t for key, t in zip(self._search_parameter_keys, theta)}
         return self.priors.ln_prob(params)
 
+    def log_prior_array(self, theta):
+        """
+
+        Parameters
+        ----------
+        theta: array_like
+            Array of shape (N, ndim) of sampled values
+
+        Returns
+        -------
+        array_like: Joint ln prior probability of each of the N samples
+
+        """
+        return self.priors.ln_prob_array(
+            theta, keys=self._search_parameter_keys)
+
     def log_likelihood(self, theta):
         """
 
@@ -404,6 +442,49 @@ class Sampler(object):
         else:
             return self.likelihood.log_likelihood()
 
+    def log_likelihood_array(self, theta):
+        """
+        If the likelihood has a `log_likelihood_batch` method (or
+        `log_likelihood_ratio_batch` if `use_ratio` is set) it is called once
+        for all the samples, otherwise the samples are evaluated one at a
+        time.
+
+        Parameters
+        ----------
+        theta: array_like
+            Array of shape (N, ndim) of values for the likelihood parameters
+
+        Returns
+        -------
+        array_like: Log-likelihood or log-likelihood-ratio of each of the N
+            samples
+
+        """
+        theta = np.atleast_2d(theta)
+        if not self.has_batch_likelihood:
+            return np.array([Sampler.log_likelihood(self, point)
+                             for point in theta])
+        if self.likelihood_benchmark:
+            try:
+                self.likelihood_count.increment(len(theta))
+            except AttributeError:
+                pass
+        return np.asarray(getattr(self.likelihood, self._batch_likelihood_method)(
+            theta, keys=self._search_parameter_keys), dtype=float)
+
+    @property
+    def _batch_likelihood_method(self):
+        if self.use_ratio:
+            return 'log_likelihood_ratio_batch'
+        else:
+            return 'log_likelihood_batch'
+
+    @property
+    def has_batch_likelihood(self):
+        """ Whether the likelihood can evaluate many samples in one call,
+        see `log_likelihood_array` """
+        return hasattr(self.likelihood, self._batch_likelihood_method)
+
     def get_random_draw_from_prior(self):
         """ Get a random draw from the prior distribution
 
@@ -606,6 +687,30 @@ class NestedSampler(Sampler):
         else:
             return np.nan_to_num(-np.inf)
 
+    def log_likelihood_array(self, theta):
+        """
+        Evaluate the prior constraints for all the samples and the likelihood
+        only for the samples which satisfy them, see `log_likelihood`.
+
+        Parameters
+        ----------
+        theta: array_like
+            Array of shape (N, ndim) of parameter values
+
+        Returns
+        -------
+        array_like: log_likelihood of each of the N samples
+        """
+        theta = np.atleast_2d(theta)
+        allowed = self.priors.evaluate_constraints({
+            key: theta[:, ii] for ii, key in
+            enumerate(self.search_parameter_keys)})
+        allowed = np.broadcast_to(np.asarray(allowed, dtype=bool), len(theta))
+        log_l = np.full(len(theta), np.nan_to_num(-np.inf))
+        if np.any(allowed):
+            log_l[allowed] = Sampler.log_likelihood_array(self, theta[allowed])
+        return log_l
+
 
 class MCMCSampler(Sampler):
     nwalkers_equiv_kwargs = ['nwalker', 'nwalkers', 'draws', 'Niter']
@@ -183,6 +183,11 @@ class DynamicDynesty(Dynesty):
         self._remove_checkpoint()
         return self.sampler.results
 
+    def _remove_checkpoint(self):
+        """Remove checkpointed state"""
+        if os.path.isfile(self.resume_file):
+            os.remove(self.resume_file)
+
     def write_current_state(self):
         """
         """
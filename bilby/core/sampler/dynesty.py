@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 
 import datetime
+import multiprocessing
 import os
 import sys
 import pickle
+import shutil
 import signal
 
 import tqdm
@@ -20,6 +22,73 @@ import warnings
 import math
 
 
+_likelihood = None
+_priors = None
+_search_parameter_keys = None
+_use_ratio = False
+_prior_transform = None
+
+
+def _initialize_global_variables(likelihood, priors, search_parameter_keys,
+                                 use_ratio, seeds=None):
+    """ Store the likelihood and priors in each worker process to avoid
+    passing them with every task
+
+    The signal handlers installed by the parent are reset so that only the
+    parent process writes checkpoints, and the numpy random state is reseeded
+    so that forked workers do not propose identical random walks.
+
+    Parameters
+    ----------
+    likelihood: bilby.core.likelihood.Likelihood
+    priors: bilby.core.prior.PriorDict
+    search_parameter_keys: list
+    use_ratio: bool
+    seeds: multiprocessing.Queue, optional
+        A queue of `numpy.random.SeedSequence` drawn by the parent process,
+        each worker takes one to seed the numpy random state. If not given,
+        the workers are seeded from the operating system.
+    """
+    global _likelihood, _priors, _search_parameter_keys, _use_ratio
+    global _prior_transform
+    _likelihood = likelihood
+    _priors = priors
+    _search_parameter_keys = search_parameter_keys
+    _use_ratio = use_ratio
+    _prior_transform = None
+    if multiprocessing.current_process().name != 'MainProcess':
+        for signum in [signal.SIGTERM, signal.SIGINT, signal.SIGALRM]:
+            signal.signal(signum, signal.SIG_DFL)
+        if seeds is None:
+            np.random.seed()
+        else:
+            np.random.seed(seeds.get().generate_state(4))
+
+
+def _prior_transform_wrapper(theta):
+    """ Prior transform using the worker global priors """
+    global _prior_transform
+    if _prior_transform is None:
+        _prior_transform = _priors.compile_rescale(_search_parameter_keys)
+    return _prior_transform(theta)
+
+
+def _log_likelihood_wrapper(theta):
+    """ Log likelihood using the worker global likelihood and priors
+
+    This mirrors `NestedSampler.log_likelihood`, points outside the prior
+    constraints are assigned a large negative log likelihood.
+    """
+    params = {key: t for key, t in zip(_search_parameter_keys, theta)}
+    if not _priors.evaluate_constraints(params):
+        return np.nan_to_num(-np.inf)
+    _likelihood.parameters.update(params)
+    if _use_ratio:
+        return _likelihood.log_likelihood_ratio()
+    else:
+        return _likelihood.log_likelihood()
+
+
 class Dynesty(NestedSampler):
     """
     bilby wrapper of `dynesty.NestedSampler`
@@ -79,6 +148,17 @@ class Dynesty(NestedSampler):
         check_point_delta_t).
     resume: bool
         If true, resume run from checkpoint (if available)
+    npool: int, (1)
+        The number of processes to use. If greater than one, a
+        `multiprocessing.Pool` is created whose workers hold the likelihood
+        and priors as global variables, so that each task only carries the
+        live-point state. This is ignored if a `pool` is passed.
+    rwalk_chains: int, (1)
+        The number of rwalk chains to evolve together when using the
+        bilby-implemented rwalk and a single process. The chains are advanced
+        in lock-step by `sample_rwalk_bilby_batch`, the prior transform and
+        the likelihood (if it has a `log_likelihood_batch` method) are
+        evaluated for all the chains at once.
     """
     default_kwargs = dict(bound='multi', sample='rwalk',
                           verbose=True, periodic=None, reflective=None,
@@ -94,7 +174,7 @@ class Dynesty(NestedSampler):
                           dlogz=0.1, maxiter=None, maxcall=None,
                           logl_max=np.inf, add_live=True, print_progress=True,
                           save_bounds=False, n_effective=None,
-                          maxmcmc=5000, nact=5)
+                          maxmcmc=5000, nact=5, npool=1, rwalk_chains=1)
 
     def __init__(self, likelihood, priors, outdir='outdir', label='label',
                  use_ratio=False, plot=False, skip_import_verification=False,
@@ -122,7 +202,11 @@ class Dynesty(NestedSampler):
 
         logger.info("Checkpoint every n_check_point = {}".format(self.n_check_point))
 
-        self.resume_file = '{}/{}_resume.pickle'.format(self.outdir, self.label)
+        self.checkpoint_directory = '{}/{}_resume'.format(self.outdir, self.label)
+        self.resume_file = os.path.join(
+            self.checkpoint_directory, 'live_state.pickle')
+        self._checkpoint_segments = 0
+        self._checkpoint_dead_points = 0
         self.sampling_time = datetime.timedelta()
 
         signal.signal(signal.SIGTERM, self.write_current_state_and_exit)
@@ -133,6 +217,7 @@ class Dynesty(NestedSampler):
         """ For pickle: remove external_sampler, which can be an unpicklable "module" """
         state = self.__dict__.copy()
         del state['external_sampler']
+        state.pop('pool', None)
         return state
 
     @property
@@ -146,7 +231,8 @@ class Dynesty(NestedSampler):
     def sampler_init_kwargs(self):
         return {key: value
                 for key, value in self.kwargs.items()
-                if key not in self.sampler_function_kwargs}
+                if key not in self.sampler_function_kwargs and
+                key not in ['npool', 'rwalk_chains']}
 
     def _translate_kwargs(self, kwargs):
         if 'nlive' not in kwargs:
@@ -233,7 +319,8 @@ class Dynesty(NestedSampler):
                 self.get_initial_points_from_prior(
                     self.kwargs['nlive']))
 
-        if self.kwargs.get("sample", "rwalk") == "rwalk":
+        bilby_rwalk = self.kwargs.get("sample", "rwalk") == "rwalk"
+        if bilby_rwalk:
             logger.info(
                 "Using the bilby-implemented rwalk sample method with ACT estimated walks")
             dynesty.dynesty._SAMPLING["rwalk"] = sample_rwalk_bilby
@@ -251,15 +338,39 @@ class Dynesty(NestedSampler):
             logger.info(
                 "Using the dynesty-implemented rstagger sample method")
 
-        self.sampler = dynesty.NestedSampler(
-            loglikelihood=self.log_likelihood,
-            prior_transform=self.prior_transform,
-            ndim=self.ndim, **self.sampler_init_kwargs)
-
-        if self.check_point:
-            out = self._run_external_sampler_with_checkpointing()
-        else:
-            out = self._run_external_sampler_without_checkpointing()
+        self._setup_pool()
+        try:
+            if self.pool is not None:
+                sampler_init_kwargs = self.sampler_init_kwargs.copy()
+                sampler_init_kwargs['pool'] = self.pool
+                if sampler_init_kwargs['queue_size'] is None:
+                    sampler_init_kwargs['queue_size'] = self.kwargs['npool']
+                self.sampler = dynesty.NestedSampler(
+                    loglikelihood=_log_likelihood_wrapper,
+                    prior_transform=_prior_transform_wrapper,
+                    ndim=self.ndim, **sampler_init_kwargs)
+            else:
+                sampler_init_kwargs = self.sampler_init_kwargs.copy()
+                nchains = self.kwargs.get('rwalk_chains', 1)
+                if (bilby_rwalk and nchains is not None and nchains > 1 and
+                        sampler_init_kwargs['pool'] is None):
+                    logger.info("Evolving {} rwalk chains together".format(
+                        nchains))
+                    sampler_init_kwargs['pool'] = _RWalkBatchMap(
+                        size=nchains, prior_transform=self.prior_transform,
+                        loglikelihood=self.log_likelihood_array)
+                    sampler_init_kwargs['queue_size'] = nchains
+                self.sampler = dynesty.NestedSampler(
+                    loglikelihood=self.log_likelihood,
+                    prior_transform=self.prior_transform,
+                    ndim=self.ndim, **sampler_init_kwargs)
+
+            if self.check_point:
+                out = self._run_external_sampler_with_checkpointing()
+            else:
+                out = self._run_external_sampler_without_checkpointing()
+        finally:
+            self._close_pool()
 
         # Flushes the output to force a line break
         if self.kwargs["verbose"]:
@@ -292,6 +403,46 @@ class Dynesty(NestedSampler):
 
         return self.result
 
+    def _setup_pool(self):
+        """ Create a pool of `npool` processes if one was not passed
+
+        The likelihood and priors are sent to each worker once by the pool
+        initializer rather than with every task. The likelihood and prior
+        transform passed to dynesty are then module-level functions, which
+        are pickled by reference.
+
+        The seeds of the workers are spawned from the numpy random state of
+        the parent process, so seeding the parent seeds the workers.
+        """
+        self.pool = None
+        npool = self.kwargs.get('npool', 1)
+        if self.kwargs['pool'] is not None or npool is None or npool <= 1:
+            return
+        logger.info("Setting up multiprocessing pool with {} processes"
+                    .format(npool))
+        seeds = multiprocessing.Queue()
+        for seed in np.random.SeedSequence(
+                np.random.randint(2 ** 32, dtype=np.uint64)).spawn(npool):
+            seeds.put(seed)
+        self.pool = multiprocessing.Pool(
+            processes=npool, initializer=_initialize_global_variables,
+            initargs=(self.likelihood, self.priors,
+                      self._search_parameter_keys, self.use_ratio, seeds))
+        # Dynesty also calls the functions in the parent process
+        _initialize_global_variables(
+            self.likelihood, self.priors, self._search_parameter_keys,
+            self.use_ratio)
+
+    def _close_pool(self):
+        """ Close the pool created by `_setup_pool` and reset the globals """
+        if getattr(self, 'pool', None) is not None:
+            logger.info("Starting to close worker pool")
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            logger.info("Finished closing worker pool")
+            _initialize_global_variables(None, None, None, False)
+
     def _run_nested_wrapper(self, kwargs):
         """ Wrapper function to run_nested
 
@@ -345,70 +496,57 @@ class Dynesty(NestedSampler):
 
     def _remove_checkpoint(self):
         """Remove checkpointed state"""
-        if os.path.isfile(self.resume_file):
-            os.remove(self.resume_file)
+        if os.path.isdir(self.checkpoint_directory):
+            shutil.rmtree(self.checkpoint_directory)
 
     def read_saved_state(self, continuing=False):
         """
-        Read a saved state of the sampler to disk.
+        Read a saved state of the sampler from disk.
 
-        The required information to reconstruct the state of the run is read
-        from a pickle file.
-        This currently adds the whole chain to the sampler.
-        We then remove the old checkpoint and write all unnecessary items back
-        to disk.
-        FIXME: Load only the necessary quantities, rather than read/write?
+        The dead points are read from the segments in the checkpoint
+        directory and the live points and counters from the live-state file,
+        see `write_current_state`.
 
         Parameters
         ----------
-        sampler: `dynesty.NestedSampler`
-            NestedSampler instance to reconstruct from the saved state.
         continuing: bool
-            Whether the run is continuing or terminating, if True, the loaded
-            state is mostly written back to disk.
+            Whether the run is continuing or terminating, if True, subsequent
+            checkpoints only append the dead points found after this state.
         """
-
-        if os.path.isfile(self.resume_file):
-            logger.info("Reading resume file {}".format(self.resume_file))
-            try:
-                with open(self.resume_file, 'rb') as file:
-                    saved = pickle.load(file)
-                logger.info(
-                    "Succesfuly read resume file {}".format(self.resume_file))
-            except EOFError as e:
-                logger.warning("Resume file reading failed with error {}".format(e))
-                return False
-
-            self.sampler.saved_u = list(saved['unit_cube_samples'])
-            self.sampler.saved_v = list(saved['physical_samples'])
-            self.sampler.saved_logl = list(saved['sample_likelihoods'])
-            self.sampler.saved_logvol = list(saved['sample_log_volume'])
-            self.sampler.saved_logwt = list(saved['sample_log_weights'])
-            self.sampler.saved_logz = list(saved['cumulative_log_evidence'])
-            self.sampler.saved_logzvar = list(saved['cumulative_log_evidence_error'])
-            self.sampler.saved_id = list(saved['id'])
-            self.sampler.saved_it = list(saved['it'])
-            self.sampler.saved_nc = list(saved['nc'])
-            self.sampler.saved_boundidx = list(saved['boundidx'])
-            self.sampler.saved_bounditer = list(saved['bounditer'])
-            self.sampler.saved_scale = list(saved['scale'])
-            self.sampler.saved_h = list(saved['cumulative_information'])
-            self.sampler.ncall = saved['ncall']
-            self.sampler.live_logl = list(saved['live_logl'])
-            self.sampler.it = saved['iteration'] + 1
-            self.sampler.live_u = saved['live_u']
-            self.sampler.live_v = saved['live_v']
-            self.sampler.nlive = saved['nlive']
-            self.sampler.live_bound = saved['live_bound']
-            self.sampler.live_it = saved['live_it']
-            self.sampler.added_live = saved['added_live']
-            self.sampling_time += datetime.timedelta(seconds=saved['sampling_time'])
-            return True
-
-        else:
+        legacy_resume_file = '{}/{}_resume.pickle'.format(self.outdir, self.label)
+        if os.path.isfile(legacy_resume_file):
+            logger.warning(
+                "Ignoring resume file {} written by an older version, "
+                "checkpoints are now read from {}".format(
+                    legacy_resume_file, self.checkpoint_directory))
+        try:
+            saved = read_dynesty_checkpoint(self.checkpoint_directory)
+        except (EOFError, IOError, KeyError, ValueError,
+                pickle.UnpicklingError) as e:
+            logger.warning("Resume file reading failed with error {}".format(e))
+            return False
+        if saved is None:
             logger.debug(
                 "No resume file {}".format(self.resume_file))
             return False
+        logger.info(
+            "Succesfuly read resume file {}".format(self.resume_file))
+
+        for key, attribute in _CHECKPOINT_DEAD_POINT_KEYS:
+            setattr(self.sampler, attribute, list(saved[key]))
+        self.sampler.ncall = saved['ncall']
+        self.sampler.live_logl = list(saved['live_logl'])
+        self.sampler.it = saved['iteration'] + 1
+        self.sampler.live_u = saved['live_u']
+        self.sampler.live_v = saved['live_v']
+        self.sampler.nlive = saved['nlive']
+        self.sampler.live_bound = saved['live_bound']
+        self.sampler.live_it = saved['live_it']
+        self.sampler.added_live = saved['added_live']
+        self.sampling_time += datetime.timedelta(seconds=saved['sampling_time'])
+        self._checkpoint_segments = saved['n_segments']
+        self._checkpoint_dead_points = saved['n_dead']
+        return True
 
     def write_current_state_and_exit(self, signum=None, frame=None):
         logger.warning("Run terminated with signal {}".format(signum))
@@ -419,19 +557,22 @@ class Dynesty(NestedSampler):
         """
         Write the current state of the sampler to disk.
 
-        The required information to reconstruct the state of the run are written
-        to an hdf5 file.
-        All but the most recent removed live point in the chain are removed from
-        the sampler to reduce memory usage.
-        This means it is necessary to not append the first live point to the
-        file if updating a previous checkpoint.
+        The dead points found since the previous checkpoint are appended to
+        the checkpoint directory as a new segment, so the time and space
+        taken by each checkpoint does not grow over the run. The live points
+        and counters, which are small, are then rewritten. Both are written
+        to a temporary file which is then moved into place, and the live
+        state records the number of valid dead points, so an interrupted
+        write leaves the previous checkpoint readable.
+
+        The posterior is not resampled here, see `read_dynesty_checkpoint`.
 
         Parameters
         ----------
-        sampler: `dynesty.NestedSampler`
-            NestedSampler to write to disk.
+        plot: bool
+            If true, and `check_point_plot` is set, also write a trace plot
         """
-        check_directory_exists_and_if_not_mkdir(self.outdir)
+        check_directory_exists_and_if_not_mkdir(self.checkpoint_directory)
         print("")
         logger.info("Writing checkpoint file {}".format(self.resume_file))
 
@@ -440,45 +581,35 @@ class Dynesty(NestedSampler):
             self.sampling_time += end_time - self.start_time
             self.start_time = end_time
 
-        current_state = dict(
-            unit_cube_samples=self.sampler.saved_u,
-            physical_samples=self.sampler.saved_v,
-            sample_likelihoods=self.sampler.saved_logl,
-            sample_log_volume=self.sampler.saved_logvol,
-            sample_log_weights=self.sampler.saved_logwt,
-            cumulative_log_evidence=self.sampler.saved_logz,
-            cumulative_log_evidence_error=self.sampler.saved_logzvar,
-            cumulative_information=self.sampler.saved_h,
-            id=self.sampler.saved_id,
-            it=self.sampler.saved_it,
-            nc=self.sampler.saved_nc,
-            boundidx=self.sampler.saved_boundidx,
-            bounditer=self.sampler.saved_bounditer,
-            scale=self.sampler.saved_scale,
-            sampling_time=self.sampling_time.total_seconds()
-        )
-
-        current_state.update(
+        # Live points added to the end of the run are not dead points
+        n_dead = len(self.sampler.saved_logl)
+        if self.sampler.added_live:
+            n_dead -= self.sampler.nlive
+        if n_dead > self._checkpoint_dead_points:
+            segment = {
+                key: np.array(getattr(self.sampler, attribute)[
+                    self._checkpoint_dead_points:n_dead])
+                for key, attribute in _CHECKPOINT_DEAD_POINT_KEYS}
+            filename = _checkpoint_segment_filename(
+                self.checkpoint_directory, self._checkpoint_segments)
+            np.savez(filename + '.tmp.npz', **segment)
+            os.rename(filename + '.tmp.npz', filename)
+            self._checkpoint_segments += 1
+            self._checkpoint_dead_points = n_dead
+
+        live_state = dict(
             ncall=self.sampler.ncall, live_logl=self.sampler.live_logl,
             iteration=self.sampler.it - 1, live_u=self.sampler.live_u,
             live_v=self.sampler.live_v, nlive=self.sampler.nlive,
             live_bound=self.sampler.live_bound, live_it=self.sampler.live_it,
-            added_live=self.sampler.added_live
-        )
-
-        try:
-            weights = np.exp(current_state['sample_log_weights'] -
-                             current_state['cumulative_log_evidence'][-1])
-            from dynesty.utils import resample_equal
-
-            current_state['posterior'] = resample_equal(
-                np.array(current_state['physical_samples']), weights)
-            current_state['search_parameter_keys'] = self.search_parameter_keys
-        except ValueError:
-            logger.debug("Unable to create posterior")
-
-        with open(self.resume_file, 'wb') as file:
-            pickle.dump(current_state, file)
+            added_live=False,
+            sampling_time=self.sampling_time.total_seconds(),
+            n_segments=self._checkpoint_segments,
+            n_dead=self._checkpoint_dead_points,
+            search_parameter_keys=self.search_parameter_keys)
+        with open(self.resume_file + '.tmp', 'wb') as file:
+            pickle.dump(live_state, file)
+        os.rename(self.resume_file + '.tmp', self.resume_file)
 
         if plot and self.check_point_plot:
             import dynesty.plotting as dyplot
@@ -535,10 +666,79 @@ class Dynesty(NestedSampler):
 
         Returns
         -------
-        list: Properly rescaled sampled values
+        array_like: Properly rescaled sampled values
 
         """
-        return self.priors.rescale(self._search_parameter_keys, theta)
+        return super(Dynesty, self).prior_transform(theta)
+
+
+# The saved dead point arrays in the checkpoint and the corresponding
+# attributes of the dynesty sampler
+_CHECKPOINT_DEAD_POINT_KEYS = [
+    ('unit_cube_samples', 'saved_u'),
+    ('physical_samples', 'saved_v'),
+    ('sample_likelihoods', 'saved_logl'),
+    ('sample_log_volume', 'saved_logvol'),
+    ('sample_log_weights', 'saved_logwt'),
+    ('cumulative_log_evidence', 'saved_logz'),
+    ('cumulative_log_evidence_error', 'saved_logzvar'),
+    ('cumulative_information', 'saved_h'),
+    ('id', 'saved_id'),
+    ('it', 'saved_it'),
+    ('nc', 'saved_nc'),
+    ('boundidx', 'saved_boundidx'),
+    ('bounditer', 'saved_bounditer'),
+    ('scale', 'saved_scale'),
+]
+
+
+def _checkpoint_segment_filename(directory, index):
+    return os.path.join(directory, 'dead_points_{:06d}.npz'.format(index))
+
+
+def read_dynesty_checkpoint(directory, posterior=False):
+    """ Read a checkpoint written by `Dynesty.write_current_state`
+
+    Parameters
+    ----------
+    directory: str
+        The checkpoint directory, `{outdir}/{label}_resume`
+    posterior: bool
+        If true, also resample the dead points to equally weighted posterior
+        samples, stored as `posterior`
+
+    Returns
+    -------
+    dict: The live state and the concatenated dead points, None if there is
+        no checkpoint in the directory
+    """
+    live_state_file = os.path.join(directory, 'live_state.pickle')
+    if not os.path.isfile(live_state_file):
+        return None
+    with open(live_state_file, 'rb') as file:
+        saved = pickle.load(file)
+    segments = list()
+    for index in range(saved['n_segments']):
+        with np.load(_checkpoint_segment_filename(directory, index)) as data:
+            segments.append({key: data[key] for key, _ in
+                             _CHECKPOINT_DEAD_POINT_KEYS})
+    for key, _ in _CHECKPOINT_DEAD_POINT_KEYS:
+        if len(segments) > 0:
+            saved[key] = np.concatenate(
+                [segment[key] for segment in segments])[:saved['n_dead']]
+        else:
+            saved[key] = np.array([])
+
+    if posterior:
+        from dynesty.utils import resample_equal
+        try:
+            weights = np.exp(saved['sample_log_weights'] -
+                             saved['cumulative_log_evidence'][-1])
+            saved['posterior'] = resample_equal(
+                saved['physical_samples'], weights)
+        except (IndexError, ValueError):
+            logger.debug("Unable to create posterior")
+    return saved
 
 
 def sample_rwalk_bilby(args):
@@ -694,6 +894,250 @@ def sample_rwalk_bilby(args):
     return u, v, logl, ncall, blob
 
 
+def sample_rwalk_bilby_batch(args_list, prior_transform=None,
+                             loglikelihood=None):
+    """ Batched version of `sample_rwalk_bilby`
+
+    Each element of `args_list` is the argument tuple of a single
+    `sample_rwalk_bilby` task. The chains are advanced in lock-step as arrays
+    so that each step needs one prior transform and one likelihood call for
+    all the chains. The chain history is stored as indices into a
+    preallocated array of the accepted points, rejected proposals do not
+    copy the previous point.
+
+    Parameters
+    ----------
+    args_list: list
+        The argument tuples for each chain, see `sample_rwalk_bilby`. The
+        log likelihood threshold must be the same for all the chains.
+    prior_transform: callable, optional
+        Function mapping an (K, ndim) array from the unit cube to the prior,
+        if not given the prior transform of each task is applied one point
+        at a time.
+    loglikelihood: callable, optional
+        Function returning the log likelihood of each row of an (K, ndim)
+        array, if not given the log likelihood of each task is evaluated one
+        point at a time.
+
+    Returns
+    -------
+    list: The (u, v, logl, ncall, blob) tuple for each chain
+    """
+    (u_start, loglstar, axes, scale,
+     task_prior_transform, task_loglikelihood, kwargs) = zip(*args_list)
+    loglstar = loglstar[0]
+    kwargs = kwargs[0]
+    if prior_transform is None:
+        def prior_transform(points):
+            return np.array([task_prior_transform[0](point) for point in points])
+    if loglikelihood is None:
+        def loglikelihood(points):
+            return np.array([task_loglikelihood[0](point) for point in points])
+    rstate = np.random
+
+    # Bounds
+    nonbounded = kwargs.get('nonbounded', None)
+    periodic = kwargs.get('periodic', None)
+    reflective = kwargs.get('reflective', None)
+
+    # Setup.
+    u = np.array(u_start, dtype=float)
+    nchains, n = u.shape
+    axes = np.array(axes)
+    scale = np.array(scale, dtype=float)
+    walks = kwargs.get('walks', 25)  # minimum number of steps
+    maxmcmc = kwargs.get('maxmcmc', 2000)  # Maximum number of steps
+    nact = kwargs.get('nact', 5)  # Number of ACT
+    chains = np.arange(nchains)
+
+    # The accepted points of each chain, at most one per step up to maxmcmc
+    # plus the starting point
+    v = prior_transform(u)
+    logl = loglikelihood(v)
+    accepted_u = np.empty((nchains, maxmcmc + 2, n))
+    accepted_v = np.empty((nchains, maxmcmc + 2, v.shape[1]))
+    accepted_logl = np.empty((nchains, maxmcmc + 2))
+    accepted_u[:, 0] = u
+    accepted_v[:, 0] = v
+    accepted_logl[:, 0] = logl
+
+    # The chain history as indices into the accepted points
+    history = np.zeros((nchains, max(nact * walks, 2)), dtype=int)
+    length = np.ones(nchains, dtype=int)
+
+    accept = np.zeros(nchains, dtype=int)
+    reject = np.zeros(nchains, dtype=int)
+    nfail = np.zeros(nchains, dtype=int)
+    act = np.full(nchains, np.inf)
+    active = np.ones(nchains, dtype=bool)
+    max_walk_warning = np.ones(nchains, dtype=bool)
+
+    def extend_chains(indexes):
+        if len(indexes) > 0 and np.max(length[indexes]) >= history.shape[1]:
+            return np.concatenate([history, np.zeros_like(history)], axis=1)
+        return history
+
+    while np.any(active):
+        current = chains[active]
+
+        if np.any(scale[current] == 0.):
+            stuck = current[scale[current] == 0.][0]
+            raise RuntimeError("The random walk sampling is stuck! "
+                               "Some useful output quantities:\n"
+                               "u: {0}\n"
+                               "loglstar: {1}\n"
+                               "axes: {2}\n"
+                               "scale: {3}."
+                               .format(u[stuck], loglstar, axes[stuck],
+                                       scale[stuck]))
+
+        # Propose a direction on the unit n-sphere.
+        drhat = rstate.randn(len(current), n)
+        drhat /= linalg.norm(drhat, axis=1)[:, np.newaxis]
+
+        # Scale based on dimensionality.
+        dr = drhat * rstate.rand(len(current), n)
+
+        # Transform to proposal distribution.
+        du = np.einsum('kij,kj->ki', axes[current], dr)
+        u_prop = u[current] + scale[current, np.newaxis] * du
+
+        # Wrap periodic parameters
+        if periodic is not None:
+            u_prop[:, periodic] = np.mod(u_prop[:, periodic], 1)
+        # Reflect
+        if reflective is not None:
+            u_prop[:, reflective] = reflect(u_prop[:, reflective])
+
+        # Check unit cube constraints.
+        inside = _unitcheck_array(u_prop, nonbounded)
+        failed = current[~inside]
+        nfail[failed] += 1
+        # Only start appending to the chain once a single jump is made
+        history = extend_chains(failed)
+        repeat = failed[accept[failed] > 0]
+        history[repeat, length[repeat]] = history[repeat, length[repeat] - 1]
+        length[repeat] += 1
+
+        current = current[inside]
+        u_prop = u_prop[inside]
+
+        # Check if we're stuck generating bad numbers.
+        inefficient = current[nfail[current] > 100 * walks]
+        if len(inefficient) > 0:
+            warnings.warn("Random number generation appears to be "
+                          "extremely inefficient. Adjusting the "
+                          "scale-factor accordingly.")
+            nfail[inefficient] = 0
+            scale[inefficient] *= math.exp(-1. / n)
+
+        if len(current) > 0:
+            # Check proposed points.
+            v_prop = prior_transform(u_prop)
+            logl_prop = loglikelihood(v_prop)
+            success = logl_prop >= loglstar
+
+            history = extend_chains(current)
+            moved = current[success]
+            accept[moved] += 1
+            u[moved] = u_prop[success]
+            accepted_u[moved, accept[moved]] = u_prop[success]
+            accepted_v[moved, accept[moved]] = v_prop[success]
+            accepted_logl[moved, accept[moved]] = logl_prop[success]
+            history[moved, length[moved]] = accept[moved]
+            length[moved] += 1
+
+            stayed = current[~success]
+            reject[stayed] += 1
+            # Only start appending to the chain once a single jump is made
+            repeat = stayed[accept[stayed] > 0]
+            history[repeat, length[repeat]] = history[repeat, length[repeat] - 1]
+            length[repeat] += 1
+
+            # If we've taken the minimum number of steps, calculate the ACT
+            for ii in current[accept[current] + reject[current] > walks]:
+                act[ii] = estimate_nmcmc(
+                    accept_ratio=accept[ii] / (accept[ii] + reject[ii] + nfail[ii]),
+                    maxmcmc=maxmcmc)
+
+            # If we've taken too many likelihood evaluations then break
+            exhausted = current[(accept[current] + reject[current] > maxmcmc) &
+                                (accept[current] > 0)]
+            for ii in exhausted[max_walk_warning[exhausted]]:
+                warnings.warn(
+                    "Hit maximum number of walks {} with accept={}, reject={}, "
+                    "and nfail={} try increasing maxmcmc"
+                    .format(maxmcmc, accept[ii], reject[ii], nfail[ii]))
+            max_walk_warning[exhausted] = False
+            active[exhausted] = False
+
+            # Check if we're stuck generating bad points.
+            inefficient = current[active[current] &
+                                  (accept[current] + reject[current] > 50 * walks)]
+            if len(inefficient) > 0:
+                scale[inefficient] *= math.exp(-1. / n)
+                warnings.warn("Random walk proposals appear to be "
+                              "extremely inefficient. Adjusting the "
+                              "scale-factor accordingly.")
+
+        active &= length < nact * act
+
+    results = list()
+    for ii in chains:
+        # If the act is finite, pick randomly from within the chain
+        if np.isfinite(act[ii]) and act[ii] < length[ii]:
+            idx = np.random.randint(int(act[ii]), length[ii])
+        elif length[ii] == 1:
+            logger.warning("Returning the only point in the chain")
+            idx = 0
+        else:
+            idx = np.random.randint(int(length[ii] / 2), length[ii])
+            logger.warning("Returning random point in second half of the chain")
+        point = history[ii, idx]
+        blob = {'accept': accept[ii], 'reject': reject[ii], 'fail': nfail[ii],
+                'scale': scale[ii]}
+        results.append((accepted_u[ii, point], accepted_v[ii, point],
+                        accepted_logl[ii, point], accept[ii] + reject[ii], blob))
+    return results
+
+
+def _unitcheck_array(u, nonbounded=None):
+    """ Vectorized `dynesty.utils.unitcheck` for an (N, ndim) array """
+    if nonbounded is None:
+        return np.all((u > 0.) & (u < 1.), axis=1)
+    else:
+        return (np.all((u[:, nonbounded] > 0.) & (u[:, nonbounded] < 1.), axis=1) &
+                np.all((u[:, ~nonbounded] > -0.5) & (u[:, ~nonbounded] < 1.5), axis=1))
+
+
+class _RWalkBatchMap(object):
+
+    def __init__(self, size, prior_transform, loglikelihood):
+        """ A serial stand-in for a pool which evaluates the queued
+        `sample_rwalk_bilby` tasks with `sample_rwalk_bilby_batch`
+
+        Parameters
+        ----------
+        size: int
+            The number of chains to evolve together
+        prior_transform: callable
+            Function mapping an (N, ndim) array from the unit cube to the prior
+        loglikelihood: callable
+            Function returning the log likelihood of each row of an (N, ndim)
+            array
+        """
+        self.size = size
+        self.prior_transform = prior_transform
+        self.loglikelihood = loglikelihood
+
+    def map(self, function, iterable):
+        if function is sample_rwalk_bilby:
+            return sample_rwalk_bilby_batch(
+                list(iterable), prior_transform=self.prior_transform,
+                loglikelihood=self.loglikelihood)
+        return list(map(function, iterable))
+
+
 def estimate_nmcmc(accept_ratio, maxmcmc, safety=5, tau=None):
     """ Estimate autocorrelation length of chain using acceptance fraction
 
@@ -3,7 +3,7 @@ from __future__ import absolute_import, print_function
 from collections import namedtuple
 import os
 import signal
-from shutil import copyfile
+import struct
 import sys
 
 import numpy as np
@@ -16,6 +16,188 @@ from ..utils import (
 from .base_sampler import MCMCSampler, SamplerError
 
 
+class ChainFile(object):
+
+    def __init__(self, filename, parameter_names, flush_interval=1):
+        """ An append-only binary file of the walker positions
+
+        The file is a `.npy` file of a structured array with fields `walker`,
+        the parameter names, `log_l` and `log_p`. The header is padded to a
+        fixed length so that it can be rewritten in place with the number of
+        rows, new rows are written after the existing rows. Rows beyond
+        the number in the header, e.g., from an interrupted write, are
+        ignored and overwritten.
+
+        Parameters
+        ----------
+        filename: str
+            The file to write to
+        parameter_names: list
+            The names of the parameters of each row
+        flush_interval: int
+            The number of iterations to hold in memory before writing to disk
+        """
+        self.filename = filename
+        self.parameter_names = list(parameter_names)
+        self.flush_interval = flush_interval
+        self.dtype = np.dtype(
+            [('walker', '<i8')] +
+            [(name, '<f8') for name in self.parameter_names + ['log_l', 'log_p']])
+        self._buffer = list()
+        self._nrows = None
+        self._header_length = None
+        self._header_length = len(self._header(np.iinfo(np.int64).max))
+
+    def _header(self, nrows):
+        header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({:d},), }}".format(
+            np.lib.format.dtype_to_descr(self.dtype), nrows)
+        preamble_length = len(np.lib.format.magic(1, 0)) + 2
+        if self._header_length is None:
+            total_length = 64 * int(np.ceil(
+                (preamble_length + len(header) + 1) / 64.))
+        else:
+            total_length = self._header_length
+        header = header.ljust(total_length - preamble_length - 1) + '\n'
+        return (np.lib.format.magic(1, 0) +
+                struct.pack('<H', len(header)) + header.encode('latin1'))
+
+    def _read_nrows(self):
+        """ The number of rows in the file, None if it does not match """
+        if not os.path.isfile(self.filename):
+            return None
+        try:
+            with open(self.filename, 'rb') as ff:
+                if np.lib.format.read_magic(ff) != (1, 0):
+                    return None
+                shape, _, dtype = np.lib.format.read_array_header_1_0(ff)
+                header_length = ff.tell()
+        except ValueError:
+            return None
+        if dtype != self.dtype or header_length != self._header_length:
+            return None
+        return shape[0]
+
+    def initialize(self):
+        """ Create an empty file, overwriting an existing file """
+        with open(self.filename, 'wb') as ff:
+            ff.write(self._header(0))
+        self._buffer = list()
+        self._nrows = 0
+
+    def open(self, nwalkers):
+        """ Continue an existing file, or create a new one if there is no
+        file matching the parameters
+
+        Any incomplete iteration at the end of the file is discarded.
+
+        Parameters
+        ----------
+        nwalkers: int
+            The number of rows written per iteration
+        """
+        nrows = self._read_nrows()
+        if nrows is None:
+            logger.info("No chain file matching the parameters found, "
+                        "creating {}".format(self.filename))
+            self.initialize()
+        else:
+            self._buffer = list()
+            self._nrows = nrows - nrows % nwalkers
+            self._write_header()
+
+    @property
+    def nrows(self):
+        """ The number of rows, including rows not yet written to disk """
+        if self._nrows is None:
+            self._nrows = self._read_nrows() or 0
+        return self._nrows + sum(len(rows) for rows in self._buffer)
+
+    def append(self, points):
+        """ Add one iteration of walker positions
+
+        Parameters
+        ----------
+        points: array_like
+            Array of shape (nwalkers, ndim + 2) of the parameters, log
+            likelihood and log prior of each walker
+        """
+        points = np.asarray(points, dtype=float)
+        rows = np.empty(len(points), dtype=self.dtype)
+        rows['walker'] = np.arange(len(points))
+        for ii, name in enumerate(self.dtype.names[1:]):
+            rows[name] = points[:, ii]
+        self._buffer.append(rows)
+        if len(self._buffer) >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """ Write the buffered rows and the new number of rows to disk """
+        if len(self._buffer) == 0:
+            return
+        if self._nrows is None:
+            self._nrows = self._read_nrows() or 0
+        rows = np.concatenate(self._buffer)
+        with open(self.filename, 'r+b') as ff:
+            ff.seek(self._header_length + self._nrows * self.dtype.itemsize)
+            ff.write(rows.tobytes())
+            ff.flush()
+            self._nrows += len(rows)
+            ff.seek(0)
+            ff.write(self._header(self._nrows))
+        self._buffer = list()
+
+    def _write_header(self):
+        with open(self.filename, 'r+b') as ff:
+            ff.write(self._header(self._nrows))
+
+    def read(self):
+        """ Read the chain
+
+        Returns
+        -------
+        array_like: A read-only memory-mapped structured array of the rows
+        """
+        self.flush()
+        if self.nrows == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.load(self.filename, mmap_mode='r')
+
+
+class EnsembleMap(object):
+
+    def __init__(self, sampler):
+        """ A serial stand-in for a pool which evaluates the likelihood and
+        prior of all the walkers passed to `map` at once
+
+        This is used by samplers which call `pool.map` with a function
+        returning the log likelihood and log prior of a single walker, e.g.,
+        the likelihood/prior evaluator of `ptemcee`.
+
+        Parameters
+        ----------
+        sampler: bilby.core.sampler.Sampler
+            The sampler providing `log_prior_array` and `log_likelihood_array`
+        """
+        self.sampler = sampler
+
+    def map(self, function, iterable):
+        """ Evaluate the walkers, the function is not called
+
+        Returns
+        -------
+        list: (log likelihood, log prior) for each walker, the log likelihood
+            is zero for walkers outside the prior support
+        """
+        points = np.array(list(iterable))
+        log_priors = self.sampler.log_prior_array(points)
+        inside = ~np.isinf(log_priors)
+        log_likelihoods = np.zeros(len(points))
+        if np.any(inside):
+            log_likelihoods[inside] = self.sampler.log_likelihood_array(
+                points[inside])
+        return list(zip(log_likelihoods, log_priors))
+
+
 class Emcee(MCMCSampler):
     """bilby wrapper emcee (https://github.com/dfm/emcee)
 
@@ -42,6 +224,17 @@ class Emcee(MCMCSampler):
         The number of autocorrelation times to discard as burn-in
     a: float (2)
         The proposal scale factor
+    vectorize: bool (None)
+        If true (emcee > 2.2.1 only), the log posterior is evaluated for the
+        whole ensemble of walkers at once, the prior is evaluated with
+        `PriorDict.ln_prob_array` and the likelihood only for walkers inside
+        the prior support, with a single call to the likelihood if it has a
+        `log_likelihood_batch` method. If None, the ensemble is vectorized if
+        the likelihood has such a method and no `pool` is given, as emcee
+        does not use the pool for a vectorized ensemble.
+    chain_flush_interval: int (1)
+        The number of iterations to hold in memory before appending them to
+        the binary chain file, see `ChainFile`
 
 
     """
@@ -50,12 +243,12 @@ class Emcee(MCMCSampler):
         nwalkers=500, a=2, args=[], kwargs={}, postargs=None, pool=None,
         live_dangerously=False, runtime_sortingfn=None, lnprob0=None,
         rstate0=None, blobs0=None, iterations=100, thin=1, storechain=True,
-        mh_proposal=None)
+        mh_proposal=None, vectorize=None)
 
     def __init__(self, likelihood, priors, outdir='outdir', label='label',
                  use_ratio=False, plot=False, skip_import_verification=False,
                  pos0=None, nburn=None, burn_in_fraction=0.25, resume=True,
-                 burn_in_act=3, **kwargs):
+                 burn_in_act=3, chain_flush_interval=1, **kwargs):
         import emcee
         self.emcee = emcee
 
@@ -73,6 +266,8 @@ class Emcee(MCMCSampler):
         self.nburn = nburn
         self.burn_in_fraction = burn_in_fraction
         self.burn_in_act = burn_in_act
+        self.chain_flush_interval = chain_flush_interval
+        self._chain_file = None
 
         signal.signal(signal.SIGTERM, self.checkpoint_and_exit)
         signal.signal(signal.SIGINT, self.checkpoint_and_exit)
@@ -136,7 +331,15 @@ class Emcee(MCMCSampler):
                        for key, value in self.kwargs.items()
                        if key not in self.sampler_function_kwargs}
 
-        init_kwargs['lnpostfn'] = self.lnpostfn
+        if init_kwargs.get('vectorize', None) is None:
+            # emcee does not use the pool when vectorizing
+            init_kwargs['vectorize'] = (
+                self.prerelease and self.has_batch_likelihood and
+                init_kwargs.get('pool', None) is None)
+        if init_kwargs['vectorize']:
+            init_kwargs['lnpostfn'] = self.lnpostfn_ensemble
+        else:
+            init_kwargs['lnpostfn'] = self.lnpostfn
         init_kwargs['dim'] = self.ndim
 
         # updated init keywords for emcee > v2.2.1
@@ -152,6 +355,12 @@ class Emcee(MCMCSampler):
             for key in oldfunckeys:
                 if key in init_kwargs:
                     del init_kwargs[key]
+        elif 'vectorize' in init_kwargs:
+            if init_kwargs.pop('vectorize'):
+                logger.warning("The 'vectorize' option requires emcee > "
+                               "v2.2.1, this run will evaluate the walkers "
+                               "one at a time.")
+                init_kwargs['lnpostfn'] = self.lnpostfn
 
         return init_kwargs
 
@@ -163,6 +372,34 @@ class Emcee(MCMCSampler):
             log_likelihood = self.log_likelihood(theta)
             return log_likelihood + log_prior, [log_likelihood, log_prior]
 
+    def lnpostfn_ensemble(self, theta):
+        """ Log posterior for an ensemble of walkers
+
+        Parameters
+        ----------
+        theta: array_like
+            Array of shape (nwalkers, ndim) of the walker positions
+
+        Returns
+        -------
+        list: (log posterior, [log likelihood, log prior]) for each walker,
+            see `lnpostfn`
+        """
+        theta = np.atleast_2d(theta)
+        log_priors = self.log_prior_array(theta)
+        inside = ~np.isinf(log_priors)
+        log_likelihoods = np.full(len(theta), np.nan)
+        if np.any(inside):
+            log_likelihoods[inside] = self.log_likelihood_array(theta[inside])
+        results = list()
+        for log_likelihood, log_prior in zip(log_likelihoods, log_priors):
+            if np.isinf(log_prior):
+                results.append((-np.inf, [np.nan, np.nan]))
+            else:
+                results.append(
+                    (log_likelihood + log_prior, [log_likelihood, log_prior]))
+        return results
+
     @property
     def nburn(self):
         if type(self.__nburn) in [float, int]:
@@ -193,10 +430,19 @@ class Emcee(MCMCSampler):
     def nsteps(self, nsteps):
         self.kwargs['iterations'] = nsteps
 
+    @property
+    def chain_file(self):
+        """ The `ChainFile` the walker positions are written to """
+        if self._chain_file is None:
+            self._chain_file = ChainFile(
+                self.checkpoint_info.chain_file, self.search_parameter_keys,
+                flush_interval=self.chain_flush_interval)
+        return self._chain_file
+
     @property
     def stored_chain(self):
         """ Read the stored zero-temperature chain data in from disk """
-        return np.genfromtxt(self.checkpoint_info.chain_file, names=True)
+        return self.chain_file.read()
 
     @property
     def stored_samples(self):
@@ -214,9 +460,7 @@ class Emcee(MCMCSampler):
         return self.stored_chain['log_p']
 
     def _init_chain_file(self):
-        with open(self.checkpoint_info.chain_file, "w+") as ff:
-            ff.write('walker\t{}\tlog_l\tlog_p\n'.format(
-                '\t'.join(self.search_parameter_keys)))
+        self.chain_file.initialize()
 
     @property
     def checkpoint_info(self):
@@ -225,10 +469,8 @@ class Emcee(MCMCSampler):
         Returns
         -------
         checkpoint_info: named_tuple
-            An object with attributes `sampler_file`, `chain_file`, and
-            `chain_template`. The first two give paths to where the sampler and
-            chain data is stored, the last a formatted-str-template with which
-            to write the chain data to disk
+            An object with attributes `sampler_file` and `chain_file`, the
+            paths to where the sampler and chain data is stored
 
         """
         out_dir = os.path.join(
@@ -236,17 +478,14 @@ class Emcee(MCMCSampler):
                                         self.label))
         check_directory_exists_and_if_not_mkdir(out_dir)
 
-        chain_file = os.path.join(out_dir, 'chain.dat')
+        chain_file = os.path.join(out_dir, 'chain.npy')
         sampler_file = os.path.join(out_dir, 'sampler.pickle')
-        chain_template =\
-            '{:d}' + '\t{:.9e}' * (len(self.search_parameter_keys) + 2) + '\n'
 
         CheckpointInfo = namedtuple(
-            'CheckpointInfo', ['sampler_file', 'chain_file', 'chain_template'])
+            'CheckpointInfo', ['sampler_file', 'chain_file'])
 
         checkpoint_info = CheckpointInfo(
-            sampler_file=sampler_file, chain_file=chain_file,
-            chain_template=chain_template)
+            sampler_file=sampler_file, chain_file=chain_file)
 
         return checkpoint_info
 
@@ -257,6 +496,7 @@ class Emcee(MCMCSampler):
 
     def checkpoint(self):
         """ Writes a pickle file of the sampler to disk using dill """
+        self.chain_file.flush()
         logger.info("Checkpointing sampler to file {}"
                     .format(self.checkpoint_info.sampler_file))
         with open(self.checkpoint_info.sampler_file, 'wb') as f:
@@ -290,6 +530,7 @@ class Emcee(MCMCSampler):
                         .format(self.checkpoint_info.sampler_file))
             with open(self.checkpoint_info.sampler_file, 'rb') as f:
                 self._sampler = pickle.load(f)
+            self.chain_file.open(self.nwalkers)
             self._set_pos0_for_resume()
         else:
             self._initialise_sampler()
@@ -297,18 +538,11 @@ class Emcee(MCMCSampler):
         return self._sampler
 
     def write_chains_to_file(self, sample):
-        chain_file = self.checkpoint_info.chain_file
-        temp_chain_file = chain_file + '.temp'
-        if os.path.isfile(chain_file):
-            copyfile(chain_file, temp_chain_file)
         if self.prerelease:
             points = np.hstack([sample.coords, sample.blobs])
         else:
             points = np.hstack([sample[0], np.array(sample[3])])
-        with open(temp_chain_file, "a") as ff:
-            for ii, point in enumerate(points):
-                ff.write(self.checkpoint_info.chain_template.format(ii, *point))
-        os.rename(temp_chain_file, chain_file)
+        self.chain_file.append(points)
 
     @property
     def _previous_iterations(self):
@@ -1,7 +1,5 @@
 from __future__ import absolute_import, division, print_function
 
-import os
-from shutil import copyfile
 import signal
 import sys
 
@@ -9,6 +7,7 @@ import numpy as np
 
 from ..utils import logger, get_progress_bar
 from . import Emcee
+from .emcee import EnsembleMap
 from .base_sampler import SamplerError
 
 
@@ -60,9 +59,13 @@ class Ptemcee(Emcee):
 
     @property
     def sampler_init_kwargs(self):
-        return {key: value
-                for key, value in self.kwargs.items()
-                if key not in self.sampler_function_kwargs}
+        init_kwargs = {key: value
+                       for key, value in self.kwargs.items()
+                       if key not in self.sampler_function_kwargs}
+        if (init_kwargs['pool'] is None and init_kwargs['threads'] == 1 and
+                self.has_batch_likelihood):
+            init_kwargs['pool'] = EnsembleMap(self)
+        return init_kwargs
 
     @property
     def ntemps(self):
@@ -85,24 +88,14 @@ class Ptemcee(Emcee):
             self.sampler.tswap_acceptance_fraction))
 
     def write_chains_to_file(self, pos, loglike, logpost):
-        chain_file = self.checkpoint_info.chain_file
-        temp_chain_file = chain_file + '.temp'
-        if os.path.isfile(chain_file):
-            try:
-                copyfile(chain_file, temp_chain_file)
-            except OSError:
-                logger.warning("Failed to write temporary chain file {}".format(temp_chain_file))
-
-        with open(temp_chain_file, "a") as ff:
-            loglike = np.squeeze(loglike[0, :])
-            logprior = np.squeeze(logpost[0, :]) - loglike
-            for ii, (point, logl, logp) in enumerate(zip(pos[0, :, :], loglike, logprior)):
-                line = np.concatenate((point, [logl, logp]))
-                ff.write(self.checkpoint_info.chain_template.format(ii, *line))
-        os.rename(temp_chain_file, chain_file)
+        loglike = np.squeeze(loglike[0, :])
+        logprior = np.squeeze(logpost[0, :]) - loglike
+        self.chain_file.append(
+            np.column_stack([pos[0, :, :], loglike, logprior]))
 
     def write_current_state_and_exit(self, signum=None, frame=None):
         logger.warning("Run terminated with signal {}".format(signum))
+        self.chain_file.flush()
         sys.exit(130)
 
     @property
@@ -157,8 +150,10 @@ class Ptemcee(Emcee):
         self.result.walkers = self.sampler.chain[0, :, :, :]
 
         n_samples = self.nwalkers * self.nburn
-        self.result.log_likelihood_evaluations = self.stored_loglike[n_samples:]
-        self.result.log_prior_evaluations = self.stored_logprior[n_samples:]
+        self.result.log_likelihood_evaluations = np.array(
+            self.stored_loglike[n_samples:])
+        self.result.log_prior_evaluations = np.array(
+            self.stored_logprior[n_samples:])
         self.result.betas = self.sampler.betas
         self.result.log_evidence, self.result.log_evidence_err =\
             self.sampler.log_evidence_estimate(
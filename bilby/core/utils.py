@@ -24,6 +24,7 @@ logger = logging.getLogger('bilby')
 speed_of_light = 299792458.0  # m/s
 parsec = 3.085677581491367e+16  # m
 solar_mass = 1.9884099021470415e+30  # Kg
+gravitational_constant = 6.6743e-11  # m^3 kg^-1 s^-2
 radius_of_earth = 6378136.6  # m
 
 _TOL = 14
@@ -330,6 +331,31 @@ def gps_time_to_gmst(gps_time):
     return gmst
 
 
+def get_random_generator(rng=None):
+    """ Get a source of random numbers
+
+    Parameters
+    ----------
+    rng: None, int, numpy.random.SeedSequence, numpy.random.Generator,
+         numpy.random.RandomState
+        If None, the global numpy random state is used. Generators and
+        RandomStates are returned unchanged, anything else is used to seed
+        a new numpy.random.Generator. Independent streams for parallel
+        workers can be created with `numpy.random.SeedSequence(seed).spawn(n)`.
+
+    Returns
+    -------
+    rng: numpy.random.Generator, numpy.random.RandomState, module
+        An object providing the numpy random sampling methods, e.g., uniform
+    """
+    if rng is None or rng is np.random:
+        return np.random
+    elif isinstance(rng, (np.random.Generator, np.random.RandomState)):
+        return rng
+    else:
+        return np.random.default_rng(rng)
+
+
 def create_white_noise(sampling_frequency, duration):
     """ Create white_noise which is then coloured by a given PSD
 
@@ -912,9 +938,9 @@ class Counter(object):
         self.val = multiprocessing.RawValue('i', initval)
         self.lock = multiprocessing.Lock()
 
-    def increment(self):
+    def increment(self, n=1):
         with self.lock:
-            self.val.value += 1
+            self.val.value += n
 
     @property
     def value(self):
@@ -1,4 +1,5 @@
 from __future__ import division
+import multiprocessing
 import sys
 
 from tqdm import tqdm
@@ -6,17 +7,11 @@ import numpy as np
 from pandas import DataFrame
 
 from ..core.likelihood import MarginalizedLikelihoodReconstructionError
-from ..core.utils import logger, solar_mass
+from ..core.utils import (logger, solar_mass, gravitational_constant,
+                          speed_of_light)
 from ..core.prior import DeltaFunction
 from .utils import lalsim_SimInspiralTransformPrecessingNewInitialConditions
-from .cosmology import get_cosmology
-
-try:
-    from astropy import units
-    from astropy.cosmology import z_at_value
-except ImportError:
-    logger.debug("You do not have astropy installed currently. You will"
-                 " not be able to use some of the prebuilt functions.")
+from .cosmology import get_cosmology, distance_to_redshift
 
 
 def redshift_to_luminosity_distance(redshift, cosmology=None):
@@ -29,16 +24,14 @@ def redshift_to_comoving_distance(redshift, cosmology=None):
     return cosmology.comoving_distance(redshift).value
 
 
-@np.vectorize
 def luminosity_distance_to_redshift(distance, cosmology=None):
-    cosmology = get_cosmology(cosmology)
-    return z_at_value(cosmology.luminosity_distance, distance * units.Mpc)
+    return distance_to_redshift(
+        distance, distance_type='luminosity_distance', cosmology=cosmology)
 
 
-@np.vectorize
 def comoving_distance_to_redshift(distance, cosmology=None):
-    cosmology = get_cosmology(cosmology)
-    return z_at_value(cosmology.comoving_distance, distance * units.Mpc)
+    return distance_to_redshift(
+        distance, distance_type='comoving_distance', cosmology=cosmology)
 
 
 def comoving_distance_to_luminosity_distance(distance, cosmology=None):
@@ -56,7 +49,8 @@ def luminosity_distance_to_comoving_distance(distance, cosmology=None):
 def bilby_to_lalsimulation_spins(
         theta_jn, phi_jl, tilt_1, tilt_2, phi_12, a_1, a_2, mass_1, mass_2,
         reference_frequency, phase):
-    if tilt_1 in [0, np.pi] and tilt_2 in [0, np.pi]:
+    if (np.all((tilt_1 == 0) | (tilt_1 == np.pi)) and
+            np.all((tilt_2 == 0) | (tilt_2 == np.pi))):
         spin_1x = 0
         spin_1y = 0
         spin_1z = a_1 * np.cos(tilt_1)
@@ -64,6 +58,14 @@ def bilby_to_lalsimulation_spins(
         spin_2y = 0
         spin_2z = a_2 * np.cos(tilt_2)
         iota = theta_jn
+    elif all(np.ndim(arg) == 0 for arg in [
+            theta_jn, phi_jl, tilt_1, tilt_2, phi_12, a_1, a_2, mass_1,
+            mass_2, reference_frequency, phase]):
+        # a single call to lalsimulation is faster than the array version
+        iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z = \
+            lalsim_SimInspiralTransformPrecessingNewInitialConditions(
+                theta_jn, phi_jl, tilt_1, tilt_2, phi_12, a_1, a_2, mass_1,
+                mass_2, reference_frequency, phase)
     else:
         iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z = \
             transform_precessing_spins(
@@ -72,55 +74,129 @@ def bilby_to_lalsimulation_spins(
     return iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z
 
 
-@np.vectorize
 def transform_precessing_spins(theta_jn, phi_jl, tilt_1, tilt_2, phi_12, a_1,
                                a_2, mass_1, mass_2, reference_frequency, phase):
     """
-    Vectorized version of
+    Array implementation of
     lalsimulation.SimInspiralTransformPrecessingNewInitialConditions
 
-    All parameters are defined at the reference frequency
+    All parameters are defined at the reference frequency. The inputs can be
+    floats or arrays which broadcast against each other.
 
     Parameters
     ----------
-    theta_jn: float
+    theta_jn: float, array_like
         Inclination angle
-    phi_jl: float
+    phi_jl: float, array_like
         Spin phase angle
-    tilt_1: float
+    tilt_1: float, array_like
         Primary object tilt
-    tilt_2: float
+    tilt_2: float, array_like
         Secondary object tilt
-    phi_12: float
+    phi_12: float, array_like
         Relative spin azimuthal angle
-    a_1: float
+    a_1: float, array_like
         Primary dimensionless spin magnitude
-    a_2: float
+    a_2: float, array_like
         Secondary dimensionless spin magnitude
-    mass_1: float
+    mass_1: float, array_like
         Primary mass _in SI units_
-    mass_2: float
+    mass_2: float, array_like
         Secondary mass _in SI units_
-    reference_frequency: float
-    phase: float
+    reference_frequency: float, array_like
+    phase: float, array_like
         Orbital phase
 
     Returns
     -------
-    iota: float
+    iota: float, array_like
         Transformed inclination
-    spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z: float
+    spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z: float, array_like
         Cartesian spin components
     """
-
-    iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z = (
-        lalsim_SimInspiralTransformPrecessingNewInitialConditions(
-            theta_jn, phi_jl, tilt_1, tilt_2, phi_12, a_1, a_2, mass_1, mass_2,
-            reference_frequency, phase))
+    # Unit spin vectors in the frame where the orbital angular momentum, L,
+    # is along z, and the binary separation at phase=0 is along x.
+    s1hatx = np.sin(tilt_1) * np.cos(phase)
+    s1haty = np.sin(tilt_1) * np.sin(phase)
+    s1hatz = np.cos(tilt_1)
+    s2hatx = np.sin(tilt_2) * np.cos(phi_12 + phase)
+    s2haty = np.sin(tilt_2) * np.sin(phi_12 + phase)
+    s2hatz = np.cos(tilt_2)
+
+    # Magnitude of L at 2PN order relative to the spins, the masses only
+    # enter as ratios so they are left in SI units.
+    total_mass = mass_1 + mass_2
+    eta = mass_1 * mass_2 / total_mass ** 2
+    v0 = np.cbrt(np.pi * reference_frequency * total_mass *
+                 gravitational_constant / speed_of_light ** 3)
+    l_mag = total_mass ** 2 * eta / v0 * (1 + v0 ** 2 * (1.5 + eta / 6))
+
+    j_x = mass_1 ** 2 * a_1 * s1hatx + mass_2 ** 2 * a_2 * s2hatx
+    j_y = mass_1 ** 2 * a_1 * s1haty + mass_2 ** 2 * a_2 * s2haty
+    j_z = l_mag + mass_1 ** 2 * a_1 * s1hatz + mass_2 ** 2 * a_2 * s2hatz
+    j_norm = np.sqrt(j_x ** 2 + j_y ** 2 + j_z ** 2)
+    theta_0 = np.arccos(j_z / j_norm)
+    phi_0 = np.arctan2(j_y / j_norm, j_x / j_norm)
+
+    # Rotate the total angular momentum, J, onto the z axis
+    s1hatx, s1haty = _rotate_z(-phi_0, s1hatx, s1haty)
+    s2hatx, s2haty = _rotate_z(-phi_0, s2hatx, s2haty)
+    lnhx, lnhz = _rotate_y(-theta_0, 0, 1)
+    lnhy = 0
+    s1hatx, s1hatz = _rotate_y(-theta_0, s1hatx, s1hatz)
+    s2hatx, s2hatz = _rotate_y(-theta_0, s2hatx, s2hatz)
+
+    # Rotate L to the requested azimuth about J, it currently has azimuth pi
+    lnhx, lnhy = _rotate_z(phi_jl - np.pi, lnhx, lnhy)
+    s1hatx, s1haty = _rotate_z(phi_jl - np.pi, s1hatx, s1haty)
+    s2hatx, s2haty = _rotate_z(phi_jl - np.pi, s2hatx, s2haty)
+
+    # The line of sight, N, is in the y-z plane at an angle theta_jn to J
+    n_x = 0
+    n_y = np.sin(theta_jn)
+    n_z = np.cos(theta_jn)
+    iota = np.arccos(n_x * lnhx + n_y * lnhy + n_z * lnhz)
+
+    # Rotate L back onto the z axis
+    theta_lj = np.arccos(lnhz)
+    phi_l = np.arctan2(lnhy, lnhx)
+    s1hatx, s1haty = _rotate_z(-phi_l, s1hatx, s1haty)
+    s2hatx, s2haty = _rotate_z(-phi_l, s2hatx, s2haty)
+    n_x, n_y = _rotate_z(-phi_l, n_x, n_y)
+    s1hatx, s1hatz = _rotate_y(-theta_lj, s1hatx, s1hatz)
+    s2hatx, s2hatz = _rotate_y(-theta_lj, s2hatx, s2hatz)
+    n_x, n_z = _rotate_y(-theta_lj, n_x, n_z)
+
+    # Rotate about L to put N in the y-z plane with positive y component,
+    # the spins are given relative to the binary separation at phase
+    phi_n = np.arctan2(n_y, n_x)
+    s1hatx, s1haty = _rotate_z(np.pi / 2 - phi_n - phase, s1hatx, s1haty)
+    s2hatx, s2haty = _rotate_z(np.pi / 2 - phi_n - phase, s2hatx, s2haty)
+
+    spin_1x = s1hatx * a_1
+    spin_1y = s1haty * a_1
+    spin_1z = s1hatz * a_1
+    spin_2x = s2hatx * a_2
+    spin_2y = s2haty * a_2
+    spin_2z = s2hatz * a_2
 
     return iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z
 
 
+def _rotate_z(angle, x, y):
+    """ Rotate the x and y components of a vector by angle about the z axis """
+    cos_angle = np.cos(angle)
+    sin_angle = np.sin(angle)
+    return x * cos_angle - y * sin_angle, x * sin_angle + y * cos_angle
+
+
+def _rotate_y(angle, x, z):
+    """ Rotate the x and z components of a vector by angle about the y axis """
+    cos_angle = np.cos(angle)
+    sin_angle = np.sin(angle)
+    return x * cos_angle + z * sin_angle, - x * sin_angle + z * cos_angle
+
+
 def convert_to_lal_binary_black_hole_parameters(parameters):
     """
     Convert parameters we have into parameters we need.
@@ -683,7 +759,7 @@ def lambda_tilde_to_lambda_1_lambda_2(
 
 
 def _generate_all_cbc_parameters(sample, defaults, base_conversion,
-                                 likelihood=None, priors=None):
+                                 likelihood=None, priors=None, npool=1):
     """Generate all cbc parameters, helper function for BBH/BNS"""
     output_sample = sample.copy()
     waveform_defaults = defaults
@@ -706,7 +782,7 @@ def _generate_all_cbc_parameters(sample, defaults, base_conversion,
         ):
             try:
                 generate_posterior_samples_from_marginalized_likelihood(
-                    samples=output_sample, likelihood=likelihood)
+                    samples=output_sample, likelihood=likelihood, npool=npool)
             except MarginalizedLikelihoodReconstructionError as e:
                 logger.warning(
                     "Marginalised parameter reconstruction failed with message "
@@ -729,11 +805,11 @@ def _generate_all_cbc_parameters(sample, defaults, base_conversion,
                 "Generation of {} parameters failed with message {}".format(
                     key, e))
     if likelihood is not None:
-        compute_snrs(output_sample, likelihood)
+        compute_snrs(output_sample, likelihood, npool=npool)
     return output_sample
 
 
-def generate_all_bbh_parameters(sample, likelihood=None, priors=None):
+def generate_all_bbh_parameters(sample, likelihood=None, priors=None, npool=1):
     """
     From either a single sample or a set of samples fill in all missing
     BBH parameters, in place.
@@ -748,6 +824,9 @@ def generate_all_bbh_parameters(sample, likelihood=None, priors=None):
         likelihood.interferometers.
     priors: dict, optional
         Dictionary of prior objects, used to fill in non-sampled parameters.
+    npool: int, optional
+        Number of processes to use when reconstructing marginalized
+        parameters and computing SNRs for posterior samples.
     """
     waveform_defaults = {
         'reference_frequency': 50.0, 'waveform_approximant': 'IMRPhenomPv2',
@@ -755,11 +834,11 @@ def generate_all_bbh_parameters(sample, likelihood=None, priors=None):
     output_sample = _generate_all_cbc_parameters(
         sample, defaults=waveform_defaults,
         base_conversion=convert_to_lal_binary_black_hole_parameters,
-        likelihood=likelihood, priors=priors)
+        likelihood=likelihood, priors=priors, npool=npool)
     return output_sample
 
 
-def generate_all_bns_parameters(sample, likelihood=None, priors=None):
+def generate_all_bns_parameters(sample, likelihood=None, priors=None, npool=1):
     """
     From either a single sample or a set of samples fill in all missing
     BNS parameters, in place.
@@ -777,6 +856,9 @@ def generate_all_bns_parameters(sample, likelihood=None, priors=None):
         likelihood.interferometers.
     priors: dict, optional
         Dictionary of prior objects, used to fill in non-sampled parameters.
+    npool: int, optional
+        Number of processes to use when reconstructing marginalized
+        parameters and computing SNRs for posterior samples.
     """
     waveform_defaults = {
         'reference_frequency': 50.0, 'waveform_approximant': 'TaylorF2',
@@ -784,7 +866,7 @@ def generate_all_bns_parameters(sample, likelihood=None, priors=None):
     output_sample = _generate_all_cbc_parameters(
         sample, defaults=waveform_defaults,
         base_conversion=convert_to_lal_binary_neutron_star_parameters,
-        likelihood=likelihood, priors=priors)
+        likelihood=likelihood, priors=priors, npool=npool)
     try:
         output_sample = generate_tidal_parameters(output_sample)
     except KeyError as e:
@@ -1017,7 +1099,7 @@ def generate_source_frame_parameters(sample):
     return output_sample
 
 
-def compute_snrs(sample, likelihood):
+def compute_snrs(sample, likelihood, npool=1):
     """
     Compute the optimal and matched filter snrs of all posterior samples
     and print it out.
@@ -1028,6 +1110,9 @@ def compute_snrs(sample, likelihood):
 
     likelihood: bilby.gw.likelihood.GravitationalWaveTransient
         Likelihood function to be applied on the posterior
+    npool: int, optional
+        Number of processes to split the samples over, see
+        `_evaluate_in_chunks`.
 
     """
     if likelihood is not None:
@@ -1045,35 +1130,39 @@ def compute_snrs(sample, likelihood):
             logger.info(
                 'Computing SNRs for every sample.')
 
-            matched_filter_snrs = {
-                ifo.name: [] for ifo in likelihood.interferometers}
-            optimal_snrs = {ifo.name: [] for ifo in likelihood.interferometers}
-
-            for ii in tqdm(range(len(sample)), file=sys.stdout):
-                signal_polarizations =\
-                    likelihood.waveform_generator.frequency_domain_strain(
-                        dict(sample.iloc[ii]))
-                likelihood.parameters.update(sample.iloc[ii])
-                for ifo in likelihood.interferometers:
-                    per_detector_snr = likelihood.calculate_snrs(
-                        signal_polarizations, ifo)
-                    matched_filter_snrs[ifo.name].append(
-                        per_detector_snr.complex_matched_filter_snr)
-                    optimal_snrs[ifo.name].append(
-                        per_detector_snr.optimal_snr_squared.real ** 0.5)
-
-            for ifo in likelihood.interferometers:
-                sample['{}_matched_filter_snr'.format(ifo.name)] =\
-                    matched_filter_snrs[ifo.name]
-                sample['{}_optimal_snr'.format(ifo.name)] =\
-                    optimal_snrs[ifo.name]
+            snrs = _evaluate_in_chunks(
+                _compute_snrs_for_samples, sample, likelihood, npool)
+            for key in snrs:
+                sample[key] = snrs[key]
 
     else:
         logger.debug('Not computing SNRs.')
 
 
+def _compute_snrs_for_samples(samples, likelihood):
+    """ Compute the per-detector SNRs for each row of a DataFrame """
+    snrs = dict()
+    for ifo in likelihood.interferometers:
+        snrs['{}_matched_filter_snr'.format(ifo.name)] = list()
+        snrs['{}_optimal_snr'.format(ifo.name)] = list()
+
+    for ii in range(len(samples)):
+        signal_polarizations =\
+            likelihood.waveform_generator.frequency_domain_strain(
+                dict(samples.iloc[ii]))
+        likelihood.parameters.update(samples.iloc[ii])
+        for ifo in likelihood.interferometers:
+            per_detector_snr = likelihood.calculate_snrs(
+                signal_polarizations, ifo)
+            snrs['{}_matched_filter_snr'.format(ifo.name)].append(
+                per_detector_snr.complex_matched_filter_snr)
+            snrs['{}_optimal_snr'.format(ifo.name)].append(
+                per_detector_snr.optimal_snr_squared.real ** 0.5)
+    return snrs
+
+
 def generate_posterior_samples_from_marginalized_likelihood(
-        samples, likelihood):
+        samples, likelihood, npool=1):
     """
     Reconstruct the distance posterior from a run which used a likelihood which
     explicitly marginalised over time/distance/phase.
@@ -1086,6 +1175,9 @@ def generate_posterior_samples_from_marginalized_likelihood(
         Posterior from run with a marginalised likelihood.
     likelihood: bilby.gw.likelihood.GravitationalWaveTransient
         Likelihood used during sampling.
+    npool: int, optional
+        Number of processes to split the samples over, see
+        `_evaluate_in_chunks`.
 
     Return
     ------
@@ -1101,17 +1193,103 @@ def generate_posterior_samples_from_marginalized_likelihood(
     if isinstance(samples, dict):
         pass
     elif isinstance(samples, DataFrame):
-        new_time_samples = list()
-        new_distance_samples = list()
-        new_phase_samples = list()
-        for ii in tqdm(range(len(samples)), file=sys.stdout):
-            sample = dict(samples.iloc[ii]).copy()
-            likelihood.parameters.update(sample)
-            new_sample = likelihood.generate_posterior_sample_from_marginalized_likelihood()
-            new_time_samples.append(new_sample['geocent_time'])
-            new_distance_samples.append(new_sample['luminosity_distance'])
-            new_phase_samples.append(new_sample['phase'])
-        samples['geocent_time'] = new_time_samples
-        samples['luminosity_distance'] = new_distance_samples
-        samples['phase'] = new_phase_samples
+        new_samples = _evaluate_in_chunks(
+            _reconstruct_marginalized_parameters, samples, likelihood, npool,
+            random=True)
+        for key in new_samples:
+            samples[key] = new_samples[key]
     return samples
+
+
+def _reconstruct_marginalized_parameters(samples, likelihood, rng=None):
+    """ Draw the marginalized parameters for each row of a DataFrame using
+    `generate_posterior_sample_from_marginalized_likelihood_batch` """
+    new_samples = likelihood.generate_posterior_sample_from_marginalized_likelihood_batch(
+        samples, rng=rng)
+    return {key: list(new_samples[key])
+            for key in ['geocent_time', 'luminosity_distance', 'phase']}
+
+
+_CHUNK_SIZE = 100
+
+_likelihood = None
+
+
+def _initialize_global_likelihood(likelihood):
+    """ Store the likelihood in each worker process to avoid passing it with
+    every chunk """
+    global _likelihood
+    _likelihood = likelihood
+
+
+def _evaluate_chunk(args):
+    function, samples, seed_sequence = args
+    if seed_sequence is None:
+        return function(samples, _likelihood)
+    return function(samples, _likelihood,
+                    rng=np.random.default_rng(seed_sequence))
+
+
+def _evaluate_in_chunks(function, samples, likelihood, npool=1, random=False):
+    """ Apply a per-sample function to a DataFrame using a pool of processes
+
+    The samples are split into chunks of fixed size. If `random`, each chunk
+    is evaluated with its own random number generator, spawned from a single
+    seed drawn from the global numpy random state, so the result does not
+    depend on the number of processes and the global state is not reseeded.
+
+    Parameters
+    ----------
+    function: callable
+        Function taking a DataFrame of samples and a likelihood and returning
+        a dictionary of lists with one entry per sample. If `random`, it also
+        takes a `numpy.random.Generator` as the keyword argument `rng`.
+    samples: DataFrame
+        The samples to evaluate
+    likelihood: bilby.gw.likelihood.GravitationalWaveTransient
+        The likelihood, this is copied to each process once.
+    npool: int, optional
+        The number of processes, if one the samples are evaluated in serial.
+    random: bool, optional
+        Whether `function` draws random numbers.
+
+    Returns
+    -------
+    dict: The concatenated output of `function`
+    """
+    n_chunks = int(np.ceil(len(samples) / _CHUNK_SIZE))
+    if random:
+        seeds = np.random.SeedSequence(
+            np.random.randint(2 ** 31 - 1)).spawn(n_chunks)
+    else:
+        seeds = [None] * n_chunks
+    chunks = [
+        (function, samples.iloc[ii * _CHUNK_SIZE:(ii + 1) * _CHUNK_SIZE], seed)
+        for ii, seed in enumerate(seeds)]
+    if npool is None or npool <= 1 or n_chunks <= 1:
+        _initialize_global_likelihood(likelihood)
+        try:
+            results = list(tqdm(
+                map(_evaluate_chunk, chunks), total=n_chunks,
+                file=sys.stdout))
+        finally:
+            _initialize_global_likelihood(None)
+    else:
+        logger.info("Evaluating {} samples in {} chunks using {} "
+                    "processes".format(len(samples), n_chunks, npool))
+        pool = multiprocessing.Pool(
+            processes=npool, initializer=_initialize_global_likelihood,
+            initargs=(likelihood,))
+        try:
+            results = list(tqdm(
+                pool.imap(_evaluate_chunk, chunks), total=n_chunks,
+                file=sys.stdout))
+        finally:
+            pool.close()
+            pool.join()
+
+    output = dict()
+    for result in results:
+        for key in result:
+            output.setdefault(key, list()).extend(result[key])
+    return output
@@ -1,7 +1,10 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+
 from ..core.utils import logger
 
 try:
-    from astropy import cosmology as cosmo
+    from astropy import cosmology as cosmo, units
     DEFAULT_COSMOLOGY = cosmo.Planck15
     COSMOLOGY = [DEFAULT_COSMOLOGY, DEFAULT_COSMOLOGY.name]
 except ImportError:
@@ -60,3 +63,132 @@ def set_cosmology(cosmology=None):
         COSMOLOGY[1] = cosmology.name
     else:
         COSMOLOGY[1] = repr(cosmology)
+
+
+_DISTANCE_TO_REDSHIFT_TABLES = dict()
+_MAXIMUM_TABLE_REDSHIFT = 1e5
+_MAXIMUM_TABLE_POINTS = 2 ** 16
+
+
+def get_distance_to_redshift_interpolant(
+        distance_type='luminosity_distance', cosmology=None, accuracy=1e-8,
+        maximum_distance=None):
+    """
+    Get an interpolant mapping a distance to redshift for a cosmology.
+
+    The distance is tabulated on a grid uniform in log(1 + z) and a cubic
+    spline of redshift as a function of distance is fit to the table. The
+    number of grid points is doubled until the fractional error in redshift
+    at the midpoints of the grid is below the requested accuracy. Tables are
+    cached per cosmology and only rebuilt if a more accurate table or a wider
+    range of distances is requested.
+
+    Parameters
+    ----------
+    distance_type: str
+        The distance to interpolate, either 'luminosity_distance' or
+        'comoving_distance'.
+    cosmology: astropy.cosmology.FLRW, str, optional
+        The cosmology to use, by default the current cosmology
+        (see `get_cosmology`).
+    accuracy: float
+        Requested maximum fractional error in the redshift.
+    maximum_distance: float, optional
+        Maximum distance (in Mpc) the table needs to cover.
+
+    Returns
+    -------
+    interpolant: scipy.interpolate.CubicSpline
+        Redshift as a function of distance in Mpc.
+    table_maximum: float
+        The maximum distance (in Mpc) covered by the interpolant.
+    """
+    if distance_type not in ['luminosity_distance', 'comoving_distance']:
+        raise ValueError(
+            "Distance type {} not recognised. Must be one of "
+            "luminosity_distance, comoving_distance".format(distance_type))
+    cosmology = get_cosmology(cosmology)
+    key = (repr(cosmology), distance_type)
+    maximum_redshift = 10.
+    if key in _DISTANCE_TO_REDSHIFT_TABLES:
+        table = _DISTANCE_TO_REDSHIFT_TABLES[key]
+        if table['accuracy'] <= accuracy and (
+                maximum_distance is None or
+                maximum_distance <= table['maximum_distance'] or
+                table['maximum_redshift'] >= _MAXIMUM_TABLE_REDSHIFT):
+            return table['interpolant'], table['maximum_distance']
+        maximum_redshift = table['maximum_redshift']
+    distance_function = getattr(cosmology, distance_type)
+    if maximum_distance is not None:
+        while (maximum_redshift < _MAXIMUM_TABLE_REDSHIFT and
+               distance_function(maximum_redshift).to(units.Mpc).value <
+               maximum_distance):
+            maximum_redshift *= 10
+        maximum_redshift = min(maximum_redshift, _MAXIMUM_TABLE_REDSHIFT)
+
+    n_points = 1000
+    while True:
+        log_one_plus_z = np.linspace(0, np.log1p(maximum_redshift), n_points)
+        redshifts = np.expm1(log_one_plus_z)
+        distances = distance_function(redshifts).to(units.Mpc).value
+        interpolant = CubicSpline(distances, redshifts)
+        test_redshifts = np.expm1(
+            (log_one_plus_z[1:] + log_one_plus_z[:-1]) / 2)
+        test_distances = distance_function(test_redshifts).to(units.Mpc).value
+        error = np.max(
+            abs(interpolant(test_distances) - test_redshifts) / test_redshifts)
+        if error <= accuracy or n_points >= _MAXIMUM_TABLE_POINTS:
+            break
+        n_points *= 2
+    if error > accuracy:
+        logger.warning(
+            "Distance to redshift interpolant only reached a fractional "
+            "accuracy of {:.1e}, {:.1e} requested.".format(error, accuracy))
+    _DISTANCE_TO_REDSHIFT_TABLES[key] = dict(
+        interpolant=interpolant, accuracy=max(error, accuracy),
+        maximum_distance=distances[-1], maximum_redshift=maximum_redshift)
+    return interpolant, distances[-1]
+
+
+def distance_to_redshift(distance, distance_type='luminosity_distance',
+                         cosmology=None, accuracy=1e-8):
+    """
+    Convert distances to redshifts using a cached interpolation table.
+
+    Distances which are not covered by the table are converted with
+    `astropy.cosmology.z_at_value`.
+
+    Parameters
+    ----------
+    distance: float, array_like
+        The distances in Mpc.
+    distance_type: str
+        The type of distance, either 'luminosity_distance' or
+        'comoving_distance'.
+    cosmology: astropy.cosmology.FLRW, str, optional
+        The cosmology to use, by default the current cosmology
+        (see `get_cosmology`).
+    accuracy: float
+        Requested maximum fractional error in the redshift.
+
+    Returns
+    -------
+    redshift: float, array_like
+        The redshifts corresponding to the input distances.
+    """
+    cosmology = get_cosmology(cosmology)
+    distance = np.asarray(distance, dtype=float)
+    finite = np.isfinite(distance)
+    maximum_distance = np.max(distance[finite], initial=0)
+    interpolant, table_maximum = get_distance_to_redshift_interpolant(
+        distance_type=distance_type, cosmology=cosmology, accuracy=accuracy,
+        maximum_distance=maximum_distance)
+    redshift = interpolant(distance)
+    redshift[distance == 0] = 0
+    outside = finite & ((distance < 0) | (distance > table_maximum))
+    if np.any(outside):
+        distance_function = getattr(cosmology, distance_type)
+        redshift[outside] = [
+            float(cosmo.z_at_value(distance_function, value * units.Mpc))
+            for value in distance[outside]]
+    return redshift[()]
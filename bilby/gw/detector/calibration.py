@@ -105,7 +105,9 @@ class CubicSpline(Recalibrate):
             Prefix for calibration parameter names
         params : dict
             Dictionary of sampling parameters which includes
-            calibration parameters.
+            calibration parameters. If the calibration parameters are
+            arrays of length n_samples the returned factor has shape
+            (n_samples, n_frequencies).
 
         Returns
         -------
@@ -117,13 +119,13 @@ class CubicSpline(Recalibrate):
                                 for ii in range(self.n_points)]
         delta_amplitude = interp1d(
             self.log_spline_points, amplitude_parameters, kind='cubic',
-            bounds_error=False, fill_value=0)(np.log10(frequency_array))
+            bounds_error=False, fill_value=0, axis=0)(np.log10(frequency_array)).T
 
         phase_parameters = [
             self.params['phase_{}'.format(ii)] for ii in range(self.n_points)]
         delta_phase = interp1d(
             self.log_spline_points, phase_parameters, kind='cubic',
-            bounds_error=False, fill_value=0)(np.log10(frequency_array))
+            bounds_error=False, fill_value=0, axis=0)(np.log10(frequency_array)).T
 
         calibration_factor = (1 + delta_amplitude) * (2 + 1j * delta_phase) / (2 - 1j * delta_phase)
 
@@ -280,7 +280,38 @@ class Interferometer(object):
         polarization_tensor = gwutils.get_polarization_tensor(ra, dec, time, psi, mode)
         return np.einsum('ij,ij->', self.geometry.detector_tensor, polarization_tensor)
 
-    def get_detector_response(self, waveform_polarizations, parameters):
+    def antenna_response_multiple_modes(self, ra, dec, time, psi, modes):
+        """
+        Calculate the antenna response function for several polarisation modes
+
+        The polarisation tensors are computed together and reused between
+        interferometers, see `bilby.gw.utils.get_polarization_tensor_multiple_modes`.
+
+        Parameters
+        -------
+        ra: float
+            right ascension in radians
+        dec: float
+            declination in radians
+        time: float
+            geocentric GPS time
+        psi: float
+            binary polarisation angle counter-clockwise about the direction of propagation
+        modes: list
+            polarisation modes (e.g. ['plus', 'cross'])
+
+        Returns
+        -------
+        dict: The antenna response for each of the specified modes
+
+        """
+        polarization_tensors = gwutils.get_polarization_tensor_multiple_modes(
+            ra, dec, time, psi, modes)
+        return {mode: np.einsum('ij,ij->', self.geometry.detector_tensor, polarization_tensor)
+                for mode, polarization_tensor in zip(modes, polarization_tensors)}
+
+    def get_detector_response(self, waveform_polarizations, parameters,
+                              frequencies=None):
         """ Get the detector response for a particular waveform
 
         Parameters
@@ -289,6 +320,11 @@ class Interferometer(object):
             polarizations of the waveform
         parameters: dict
             parameters describing position and time of arrival of the signal
+        frequencies: array_like, optional
+            The frequencies at which the polarizations are evaluated, if not
+            given the polarizations are assumed to be evaluated on the
+            frequency array of the interferometer and the frequency mask is
+            applied.
 
         Returns
         -------
@@ -305,7 +341,12 @@ class Interferometer(object):
             signal[mode] = waveform_polarizations[mode] * det_response
         signal_ifo = sum(signal.values())
 
-        signal_ifo *= self.strain_data.frequency_mask
+        if frequencies is None:
+            mask = self.strain_data.frequency_mask
+            signal_ifo *= mask
+            frequencies = self.strain_data.frequency_array[mask]
+        else:
+            mask = np.ones(len(frequencies), dtype=bool)
 
         time_shift = self.time_delay_from_geocenter(
             parameters['ra'], parameters['dec'], parameters['geocent_time'])
@@ -315,12 +356,83 @@ class Interferometer(object):
         dt_geocent = parameters['geocent_time'] - self.strain_data.start_time
         dt = dt_geocent + time_shift
 
-        signal_ifo[self.strain_data.frequency_mask] = signal_ifo[self.strain_data.frequency_mask] * np.exp(
-            -1j * 2 * np.pi * dt * self.strain_data.frequency_array[self.strain_data.frequency_mask])
+        signal_ifo[mask] = signal_ifo[mask] * np.exp(
+            -1j * 2 * np.pi * dt * frequencies)
+
+        signal_ifo[mask] *= self.calibration_model.get_calibration_factor(
+            frequencies, prefix='recalib_{}_'.format(self.name), **parameters)
+
+        return signal_ifo
+
+    def antenna_response_array(self, ra, dec, time, psi, mode):
+        """
+        Calculate the antenna response function for arrays of sky locations
+
+        Parameters
+        -------
+        ra: array_like
+            right ascensions in radians
+        dec: array_like
+            declinations in radians
+        time: array_like
+            geocentric GPS times
+        psi: array_like
+            binary polarisation angles counter-clockwise about the direction of propagation
+        mode: str
+            polarisation mode (e.g. 'plus', 'cross')
+
+        Returns
+        -------
+        array_like: The antenna response for each of the sky locations
+
+        """
+        polarization_tensor = gwutils.get_polarization_tensor_array(ra, dec, time, psi, mode)
+        return np.einsum('ij,nij->n', self.geometry.detector_tensor, polarization_tensor)
+
+    def get_detector_response_array(self, waveform_polarizations, parameters):
+        """ Get the detector response for a stack of waveforms
+
+        This is the vectorized equivalent of `get_detector_response`.
+
+        Parameters
+        -------
+        waveform_polarizations: dict
+            polarizations of the waveforms, each an array with shape
+            (n_samples, n_frequencies)
+        parameters: dict
+            parameters describing position and time of arrival of the signals,
+            each an array with length n_samples
+
+        Returns
+        -------
+        array_like: An (n_samples, n_frequencies) array of the signals observed in the interferometer
+        """
+        mask = self.strain_data.frequency_mask
+        frequencies = self.strain_data.frequency_array[mask]
+
+        signal_ifo = 0
+        for mode in waveform_polarizations.keys():
+            det_response = self.antenna_response_array(
+                parameters['ra'],
+                parameters['dec'],
+                parameters['geocent_time'],
+                parameters['psi'], mode)
+            signal_ifo = signal_ifo + waveform_polarizations[mode] * det_response[:, np.newaxis]
+
+        signal_ifo = signal_ifo * mask
+
+        time_shift = gwutils.time_delay_geocentric_array(
+            self.geometry.vertex, np.array([0, 0, 0]), parameters['ra'],
+            parameters['dec'], parameters['geocent_time'])
+
+        # Subtract the start time before adding the time shift, see get_detector_response
+        dt_geocent = np.asarray(parameters['geocent_time']) - self.strain_data.start_time
+        dt = dt_geocent + time_shift
+
+        signal_ifo[:, mask] *= np.exp(-1j * 2 * np.pi * dt[:, np.newaxis] * frequencies)
 
-        signal_ifo[self.strain_data.frequency_mask] *= self.calibration_model.get_calibration_factor(
-            self.strain_data.frequency_array[self.strain_data.frequency_mask],
-            prefix='recalib_{}_'.format(self.name), **parameters)
+        signal_ifo[:, mask] *= self.calibration_model.get_calibration_factor(
+            frequencies, prefix='recalib_{}_'.format(self.name), **parameters)
 
         return signal_ifo
 
@@ -1,11 +1,13 @@
 from __future__ import division
 
-import gc
 import os
 import json
 import copy
+import hashlib
+import shutil
 
 import numpy as np
+import pandas as pd
 import scipy.integrate as integrate
 from scipy.interpolate import interp1d
 
@@ -19,15 +21,23 @@ from ..core.likelihood import Likelihood, MarginalizedLikelihoodReconstructionEr
 from ..core.utils import BilbyJsonEncoder, decode_bilby_json
 from ..core.utils import (
     logger, UnsortedInterp2d, create_frequency_series, create_time_series,
-    speed_of_light, radius_of_earth)
+    speed_of_light, radius_of_earth, get_random_generator)
 from ..core.prior import Interped, Prior, Uniform
 from .detector import InterferometerList
 from .prior import BBHPriorDict, CBCPriorDict
-from .source import lal_binary_black_hole
-from .utils import noise_weighted_inner_product, build_roq_weights, blockwise_dot_product
+from .source import (
+    lal_binary_black_hole, lal_binary_black_hole_relative_binning,
+    lal_binary_neutron_star_relative_binning)
+from .utils import (
+    noise_weighted_inner_product, build_roq_weights,
+    build_roq_time_shifted_weights)
 from .waveform_generator import WaveformGenerator
 from collections import namedtuple
 
+# Upper limit on the size in bytes of each array allocated while
+# reconstructing the time posterior for a block of samples
+_TIME_RECONSTRUCTION_MEMORY = 2 ** 27
+
 
 class GravitationalWaveTransient(Likelihood):
     """ A gravitational-wave transient likelihood object
@@ -291,13 +301,269 @@ class GravitationalWaveTransient(Likelihood):
 
         return float(log_l.real)
 
-    def generate_posterior_sample_from_marginalized_likelihood(self):
+    def calculate_snrs_array(self, waveform_polarizations, interferometer, parameters):
+        """
+        Compute the snrs for a stack of waveforms
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            A dictionary of waveform polarizations and the corresponding
+            (n_samples, n_frequencies) arrays
+        interferometer: bilby.gw.detector.Interferometer
+            The bilby interferometer object
+        parameters: dict
+            A dictionary of parameter arrays, each of length n_samples
+
+        """
+        signal = interferometer.get_detector_response_array(
+            waveform_polarizations, parameters)
+        mask = interferometer.frequency_mask
+        data = interferometer.frequency_domain_strain
+        psd = interferometer.power_spectral_density_array
+        duration = self.waveform_generator.duration
+
+        d_inner_h = 4 / duration * np.sum(
+            np.conj(signal[:, mask]) * data[mask] / psd[mask], axis=-1)
+        optimal_snr_squared = 4 / duration * np.sum(
+            np.conj(signal[:, mask]) * signal[:, mask] / psd[mask], axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            complex_matched_filter_snr = d_inner_h / (optimal_snr_squared**0.5)
+
+        if self.time_marginalization:
+            d_inner_h_squared_tc_array =\
+                4 / duration * np.fft.fft(
+                    signal[:, 0:-1] * data.conjugate()[0:-1] / psd[0:-1],
+                    axis=-1)
+        else:
+            d_inner_h_squared_tc_array = None
+
+        return self._CalculatedSNRs(
+            d_inner_h=d_inner_h, optimal_snr_squared=optimal_snr_squared,
+            complex_matched_filter_snr=complex_matched_filter_snr,
+            d_inner_h_squared_tc_array=d_inner_h_squared_tc_array)
+
+    def _parameters_table_to_dict(self, parameters_table, keys=None):
+        """ Convert a table of parameters to a dictionary of parameter arrays
+
+        Any parameter in `self.parameters` not given in the table is broadcast
+        to the length of the table.
+
+        Parameters
+        ----------
+        parameters_table: pandas.DataFrame, dict, array_like
+            The table of parameters
+        keys: list, optional
+            The parameter names of the columns, required if `parameters_table`
+            is an array
+
+        Returns
+        -------
+        parameters: dict
+            Dictionary of parameter arrays
+        n_samples: int
+            The number of rows in the table
+        """
+        if isinstance(parameters_table, pd.DataFrame):
+            table = {key: parameters_table[key].values for key in parameters_table}
+        elif isinstance(parameters_table, dict):
+            table = {key: np.atleast_1d(parameters_table[key]) for key in parameters_table}
+        else:
+            parameters_table = np.atleast_2d(parameters_table)
+            if keys is None:
+                raise ValueError(
+                    "The parameter keys must be given when passing an array "
+                    "of parameters.")
+            elif len(keys) != parameters_table.shape[1]:
+                raise ValueError(
+                    "Number of keys ({}) does not match the number of columns "
+                    "({}).".format(len(keys), parameters_table.shape[1]))
+            table = {key: parameters_table[:, ii] for ii, key in enumerate(keys)}
+        n_samples = len(next(iter(table.values())))
+        parameters = {key: np.full(n_samples, self.parameters[key])
+                      for key in self.parameters if key not in table}
+        parameters.update(table)
+        return parameters, n_samples
+
+    def _waveform_polarizations_array(self, parameters, n_samples):
+        """ Generate the waveform for each sample and stack them
+
+        Parameters
+        ----------
+        parameters: dict
+            A dictionary of parameter arrays, each of length n_samples
+        n_samples: int
+            The number of samples
+
+        Returns
+        -------
+        waveform_polarizations: dict
+            The (n_samples, n_frequencies) array for each mode, rows for
+            which waveform generation failed are zero.
+        valid: array_like
+            Boolean array, False where waveform generation failed.
+        """
+        waveform_polarizations = dict()
+        valid = np.ones(n_samples, dtype=bool)
+        for ii in range(n_samples):
+            sample = {key: parameters[key][ii] for key in parameters}
+            polarizations = self.waveform_generator.frequency_domain_strain(sample)
+            if polarizations is None:
+                valid[ii] = False
+                continue
+            for mode in polarizations:
+                if mode not in waveform_polarizations:
+                    waveform_polarizations[mode] = np.zeros(
+                        (n_samples, len(polarizations[mode])), dtype=np.complex128)
+                waveform_polarizations[mode][ii] = polarizations[mode]
+        return waveform_polarizations, valid
+
+    def log_likelihood_ratio_batch(self, parameters_table, keys=None):
+        """ Compute the log likelihood ratio for many sets of parameters
+
+        The waveforms are generated one at a time, the detector responses,
+        time shifts, calibration factors and inner products are then computed
+        for all the samples at once as two-dimensional array operations.
+
+        Parameters
+        ----------
+        parameters_table: pandas.DataFrame, dict, array_like
+            The parameters to evaluate the likelihood at, either a DataFrame,
+            a dictionary of arrays, or an (N, ndim) array. Any parameters not
+            given are taken from `self.parameters`.
+        keys: list, optional
+            The parameter names of the columns of `parameters_table`, required
+            if this is an array.
+
+        Returns
+        -------
+        array_like: The log likelihood ratio for each of the N samples
+        """
+        parameters, n_samples = self._parameters_table_to_dict(
+            parameters_table=parameters_table, keys=keys)
+
+        waveform_polarizations, valid = self._waveform_polarizations_array(
+            parameters, n_samples)
+
+        log_l = np.full(n_samples, np.nan_to_num(-np.inf))
+        if not any(valid):
+            return log_l
+
+        if self.time_marginalization and self.jitter_time:
+            parameters['geocent_time'] = (
+                parameters['geocent_time'] + parameters['time_jitter'])
+
+        d_inner_h = 0.
+        optimal_snr_squared = 0.
+        d_inner_h_tc_array = 0.
+        for interferometer in self.interferometers:
+            per_detector_snr = self.calculate_snrs_array(
+                waveform_polarizations=waveform_polarizations,
+                interferometer=interferometer, parameters=parameters)
+
+            d_inner_h += per_detector_snr.d_inner_h
+            optimal_snr_squared += np.real(per_detector_snr.optimal_snr_squared)
+
+            if self.time_marginalization:
+                d_inner_h_tc_array += per_detector_snr.d_inner_h_squared_tc_array
+
+        if self.time_marginalization:
+            if self.distance_marginalization:
+                log_l_tc_array = self._distance_marginalized_likelihood_array(
+                    d_inner_h=d_inner_h_tc_array, h_inner_h=optimal_snr_squared,
+                    luminosity_distance=parameters['luminosity_distance'])
+            elif self.phase_marginalization:
+                log_l_tc_array = self.phase_marginalized_likelihood(
+                    d_inner_h=d_inner_h_tc_array,
+                    h_inner_h=optimal_snr_squared[:, np.newaxis])
+            else:
+                log_l_tc_array = (np.real(d_inner_h_tc_array) -
+                                  optimal_snr_squared[:, np.newaxis] / 2)
+            times = self._times
+            if self.jitter_time:
+                times = self._times + parameters['time_jitter'][:, np.newaxis]
+            time_prior_array = self.priors['geocent_time'].prob(times) * self._delta_tc
+            new_log_l = logsumexp(log_l_tc_array, b=time_prior_array, axis=-1)
+
+        elif self.distance_marginalization:
+            new_log_l = self._distance_marginalized_likelihood_array(
+                d_inner_h=d_inner_h, h_inner_h=optimal_snr_squared,
+                luminosity_distance=parameters['luminosity_distance'])
+
+        elif self.phase_marginalization:
+            new_log_l = self.phase_marginalized_likelihood(
+                d_inner_h=d_inner_h, h_inner_h=optimal_snr_squared)
+
+        else:
+            new_log_l = np.real(d_inner_h) - optimal_snr_squared / 2
+
+        log_l[valid] = np.real(new_log_l)[valid]
+        return log_l
+
+    def _log_likelihood_ratio_batch_loop(self, parameters_table, keys=None):
+        """ Compute the log likelihood ratio for many sets of parameters by
+        looping over `log_likelihood_ratio`
+
+        This is used by subclasses which do not evaluate the waveform on the
+        full frequency array, `self.parameters` is restored afterwards.
+        """
+        parameters, n_samples = self._parameters_table_to_dict(
+            parameters_table=parameters_table, keys=keys)
+        original_parameters = self.parameters
+        log_l = np.zeros(n_samples)
+        try:
+            for ii in range(n_samples):
+                self.parameters = {key: parameters[key][ii] for key in parameters}
+                log_l[ii] = self.log_likelihood_ratio()
+        finally:
+            self.parameters = original_parameters
+        return log_l
+
+    def _generate_posterior_sample_batch_loop(self, parameters_table, keys=None,
+                                              rng=None):
+        """ Reconstruct the marginalized parameters for many samples by
+        looping over `generate_posterior_sample_from_marginalized_likelihood`
+
+        This is used by subclasses which do not evaluate the waveform on the
+        full frequency array, `self.parameters` is restored afterwards.
+        """
+        parameters, n_samples = self._parameters_table_to_dict(
+            parameters_table=parameters_table, keys=keys)
+        rng = get_random_generator(rng)
+        original_parameters = self.parameters
+        new_parameters = {key: list() for key in parameters}
+        try:
+            for ii in range(n_samples):
+                self.parameters = {key: parameters[key][ii] for key in parameters}
+                new_sample = self.generate_posterior_sample_from_marginalized_likelihood(
+                    rng=rng)
+                for key in new_parameters:
+                    new_parameters[key].append(new_sample[key])
+        finally:
+            self.parameters = original_parameters
+        return {key: np.array(new_parameters[key]) for key in new_parameters}
+
+    def log_likelihood_batch(self, parameters_table, keys=None):
+        """ Compute the log likelihood for many sets of parameters
+
+        See `log_likelihood_ratio_batch` for details.
+        """
+        return (self.log_likelihood_ratio_batch(parameters_table, keys=keys) +
+                self.noise_log_likelihood())
+
+    def generate_posterior_sample_from_marginalized_likelihood(self, rng=None):
         """
         Reconstruct the distance posterior from a run which used a likelihood
         which explicitly marginalised over time/distance/phase.
 
         See Eq. (C29-C32) of https://arxiv.org/abs/1809.02293
 
+        Parameters
+        ----------
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
+
         Return
         ------
         sample: dict
@@ -315,22 +581,221 @@ class GravitationalWaveTransient(Likelihood):
                     self.parameters))
         else:
             return self.parameters
+        rng = get_random_generator(rng)
         if self.time_marginalization:
             new_time = self.generate_time_sample_from_marginalized_likelihood(
-                signal_polarizations=signal_polarizations)
+                signal_polarizations=signal_polarizations, rng=rng)
             self.parameters['geocent_time'] = new_time
         if self.distance_marginalization:
             new_distance = self.generate_distance_sample_from_marginalized_likelihood(
-                signal_polarizations=signal_polarizations)
+                signal_polarizations=signal_polarizations, rng=rng)
             self.parameters['luminosity_distance'] = new_distance
         if self.phase_marginalization:
             new_phase = self.generate_phase_sample_from_marginalized_likelihood(
-                signal_polarizations=signal_polarizations)
+                signal_polarizations=signal_polarizations, rng=rng)
             self.parameters['phase'] = new_phase
         return self.parameters.copy()
 
+    def generate_posterior_sample_from_marginalized_likelihood_batch(
+            self, parameters_table, keys=None, rng=None):
+        """
+        Reconstruct the marginalized parameters for many samples at once.
+
+        This is the vectorized equivalent of
+        `generate_posterior_sample_from_marginalized_likelihood`, the
+        conditional posteriors for time, distance and phase are computed for
+        all the samples as two-dimensional arrays and sampled by inverse
+        transform sampling.
+
+        Parameters
+        ----------
+        parameters_table: pandas.DataFrame, dict, array_like
+            The samples, see `log_likelihood_ratio_batch`.
+        keys: list, optional
+            The parameter names of the columns of `parameters_table`, required
+            if this is an array.
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
+
+        Returns
+        -------
+        dict: The parameter arrays with new samples of the marginalized
+            parameters. Samples for which waveform generation fails are not
+            changed.
+        """
+        parameters, n_samples = self._parameters_table_to_dict(
+            parameters_table=parameters_table, keys=keys)
+        if not any([self.phase_marginalization, self.distance_marginalization,
+                    self.time_marginalization]):
+            return parameters
+
+        rng = get_random_generator(rng)
+        waveform_polarizations, valid = self._waveform_polarizations_array(
+            parameters, n_samples)
+        if not all(valid):
+            logger.debug(
+                "Waveform generation failed for {} samples, not "
+                "reconstructing these samples.".format(sum(~valid)))
+        waveform_polarizations = {
+            mode: waveform_polarizations[mode][valid]
+            for mode in waveform_polarizations}
+        valid_parameters = {
+            key: np.array(parameters[key][valid]) for key in parameters}
+
+        if self.time_marginalization:
+            valid_parameters['geocent_time'] = self._generate_time_samples_array(
+                waveform_polarizations, valid_parameters, rng=rng)
+        if self.distance_marginalization:
+            new_distance = self._generate_distance_samples_array(
+                waveform_polarizations, valid_parameters, rng=rng)
+            for mode in waveform_polarizations:
+                waveform_polarizations[mode] *= (
+                    self._ref_dist / new_distance)[:, np.newaxis]
+            valid_parameters['luminosity_distance'] = new_distance
+        if self.phase_marginalization:
+            valid_parameters['phase'] = self._generate_phase_samples_array(
+                waveform_polarizations, valid_parameters, rng=rng)
+
+        for key in ['geocent_time', 'luminosity_distance', 'phase']:
+            parameters[key] = np.array(parameters[key], dtype=float)
+            parameters[key][valid] = valid_parameters[key]
+        return parameters
+
+    def _inner_products_array(self, waveform_polarizations, parameters):
+        """ The summed <d|h> and <h|h> over detectors for a stack of
+        waveforms """
+        d_inner_h = 0.
+        h_inner_h = 0.
+        duration = self.waveform_generator.duration
+        for ifo in self.interferometers:
+            mask = ifo.frequency_mask
+            signal = ifo.get_detector_response_array(
+                waveform_polarizations, parameters)[:, mask]
+            psd = ifo.power_spectral_density_array[mask]
+            d_inner_h = d_inner_h + 4 / duration * np.sum(
+                np.conj(signal) * ifo.frequency_domain_strain[mask] / psd,
+                axis=-1)
+            h_inner_h = h_inner_h + 4 / duration * np.sum(
+                np.abs(signal) ** 2 / psd, axis=-1)
+        return d_inner_h, h_inner_h
+
+    def _generate_time_samples_array(self, waveform_polarizations, parameters,
+                                     rng=None):
+        """ Vectorized `generate_time_sample_from_marginalized_likelihood`
+
+        The time series of the inner products are upsampled to 16kHz, the
+        samples are therefore processed in blocks so that each of the
+        intermediate arrays uses at most `_TIME_RECONSTRUCTION_MEMORY` bytes.
+        """
+        n_samples = len(parameters['geocent_time'])
+        n_time_steps = int(self.waveform_generator.duration * 16384)
+        block_size = max(1, _TIME_RECONSTRUCTION_MEMORY // (
+            n_time_steps * np.dtype(complex).itemsize))
+        new_time = np.empty(n_samples)
+        for start in range(0, n_samples, block_size):
+            block = slice(start, start + block_size)
+            new_time[block] = self._generate_time_samples_block(
+                {mode: waveform_polarizations[mode][block]
+                 for mode in waveform_polarizations},
+                {key: np.asarray(parameters[key])[block]
+                 for key in parameters}, rng=rng)
+        return new_time
+
+    def _generate_time_samples_block(self, waveform_polarizations, parameters,
+                                     rng=None):
+        """ Draw the times for a block of samples, see
+        `_generate_time_samples_array` """
+        geocent_time = np.array(parameters['geocent_time'], dtype=float)
+        if self.jitter_time:
+            geocent_time = geocent_time + parameters['time_jitter']
+        response_parameters = parameters.copy()
+        response_parameters['geocent_time'] = geocent_time
+        n_samples = len(geocent_time)
+        duration = self.waveform_generator.duration
+        start_time = self.waveform_generator.start_time
+
+        n_time_steps = int(duration * 16384)
+        d_inner_h = np.zeros((n_samples, n_time_steps), dtype=complex)
+        h_inner_h = np.zeros(n_samples)
+        for ifo in self.interferometers:
+            signal = ifo.get_detector_response_array(
+                waveform_polarizations, response_parameters)
+            d_inner_h += 4 / duration * np.fft.fft(
+                signal * np.conj(ifo.frequency_domain_strain) /
+                ifo.power_spectral_density_array, n=n_time_steps, axis=-1)
+            mask = ifo.frequency_mask
+            h_inner_h += 4 / duration * np.sum(
+                np.abs(signal[:, mask]) ** 2 /
+                ifo.power_spectral_density_array[mask], axis=-1)
+
+        if self.distance_marginalization:
+            time_log_like = self._distance_marginalized_likelihood_array(
+                d_inner_h, h_inner_h, parameters['luminosity_distance'])
+        elif self.phase_marginalization:
+            time_log_like = (self._bessel_function_interped(abs(d_inner_h)) -
+                             h_inner_h[:, np.newaxis] / 2)
+        else:
+            time_log_like = d_inner_h.real - h_inner_h[:, np.newaxis] / 2
+
+        times = (
+            (geocent_time - start_time)[:, np.newaxis] +
+            np.arange(n_time_steps) / 16384) % duration + start_time
+        time_post = (
+            np.exp(time_log_like - np.max(time_log_like, axis=-1, keepdims=True)) *
+            self.priors['geocent_time'].prob(times))
+        keep = time_post > np.max(time_post, axis=-1, keepdims=True) / 1000
+        if np.any(np.sum(keep, axis=-1) < 2):
+            raise MarginalizedLikelihoodReconstructionError(
+                "Time posterior reconstruction failed, at least two samples "
+                "are required."
+            )
+        order = np.argsort(times, axis=-1)
+        return _sample_from_retained_points(
+            np.take_along_axis(times, order, axis=-1),
+            np.take_along_axis(time_post, order, axis=-1),
+            np.take_along_axis(keep, order, axis=-1), rng=rng)
+
+    def _generate_distance_samples_array(self, waveform_polarizations,
+                                         parameters, rng=None):
+        """ Vectorized `generate_distance_sample_from_marginalized_likelihood` """
+        d_inner_h, h_inner_h = self._inner_products_array(
+            waveform_polarizations, parameters)
+        scale = (np.asarray(parameters['luminosity_distance'])[:, np.newaxis] /
+                 self._distance_array)
+        d_inner_h_dist = d_inner_h[:, np.newaxis] * scale
+        h_inner_h_dist = h_inner_h[:, np.newaxis] * scale ** 2
+
+        if self.phase_marginalization:
+            distance_log_like = (
+                self._bessel_function_interped(abs(d_inner_h_dist)) -
+                h_inner_h_dist.real / 2)
+        else:
+            distance_log_like = (d_inner_h_dist.real - h_inner_h_dist.real / 2)
+
+        distance_post = (
+            np.exp(distance_log_like -
+                   np.max(distance_log_like, axis=-1, keepdims=True)) *
+            self.distance_prior_array)
+        return _sample_from_tabulated_distributions(
+            self._distance_array, distance_post, rng=rng)
+
+    def _generate_phase_samples_array(self, waveform_polarizations, parameters,
+                                      rng=None):
+        """ Vectorized `generate_phase_sample_from_marginalized_likelihood` """
+        d_inner_h, h_inner_h = self._inner_products_array(
+            waveform_polarizations, parameters)
+        phases = np.linspace(0, 2 * np.pi, 101)
+        phasor = np.exp(-2j * phases)
+        phase_log_post = (
+            np.real(d_inner_h[:, np.newaxis] * phasor) -
+            h_inner_h[:, np.newaxis] / 2)
+        phase_post = np.exp(
+            phase_log_post - np.max(phase_log_post, axis=-1, keepdims=True))
+        return _sample_from_tabulated_distributions(phases, phase_post, rng=rng)
+
     def generate_time_sample_from_marginalized_likelihood(
-            self, signal_polarizations=None):
+            self, signal_polarizations=None, rng=None):
         """
         Generate a single sample from the posterior distribution for coalescence
         time when using a likelihood which explicitly marginalises over time.
@@ -343,6 +808,9 @@ class GravitationalWaveTransient(Likelihood):
         ----------
         signal_polarizations: dict, optional
             Polarizations modes of the template.
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
@@ -356,10 +824,10 @@ class GravitationalWaveTransient(Likelihood):
                 self.waveform_generator.frequency_domain_strain(self.parameters)
 
         n_time_steps = int(self.waveform_generator.duration * 16384)
-        d_inner_h = np.zeros(n_time_steps, dtype=np.complex)
+        d_inner_h = np.zeros(n_time_steps, dtype=complex)
         psd = np.ones(n_time_steps)
-        signal_long = np.zeros(n_time_steps, dtype=np.complex)
-        data = np.zeros(n_time_steps, dtype=np.complex)
+        signal_long = np.zeros(n_time_steps, dtype=complex)
+        data = np.zeros(n_time_steps, dtype=complex)
         h_inner_h = np.zeros(1)
         for ifo in self.interferometers:
             ifo_length = len(ifo.frequency_domain_strain)
@@ -368,7 +836,8 @@ class GravitationalWaveTransient(Likelihood):
             signal_long[:ifo_length] = signal
             data[:ifo_length] = np.conj(ifo.frequency_domain_strain)
             psd[:ifo_length] = ifo.power_spectral_density_array
-            d_inner_h += np.fft.fft(signal_long * data / psd)
+            d_inner_h += 4 / self.waveform_generator.duration * np.fft.fft(
+                signal_long * data / psd)
             h_inner_h += ifo.optimal_snr_squared(signal=signal).real
 
         if self.distance_marginalization:
@@ -396,7 +865,7 @@ class GravitationalWaveTransient(Likelihood):
         times = times[keep]
 
         if len(times) > 1:
-            new_time = Interped(times, time_post).sample()
+            new_time = Interped(times, time_post).sample(rng=rng)
             return new_time
         else:
             raise MarginalizedLikelihoodReconstructionError(
@@ -405,7 +874,7 @@ class GravitationalWaveTransient(Likelihood):
             )
 
     def generate_distance_sample_from_marginalized_likelihood(
-            self, signal_polarizations=None):
+            self, signal_polarizations=None, rng=None):
         """
         Generate a single sample from the posterior distribution for luminosity
         distance when using a likelihood which explicitly marginalises over
@@ -419,6 +888,9 @@ class GravitationalWaveTransient(Likelihood):
             Polarizations modes of the template.
             Note: These are rescaled in place after the distance sample is
                   generated to allow further parameter reconstruction to occur.
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
@@ -456,13 +928,13 @@ class GravitationalWaveTransient(Likelihood):
                          self.distance_prior_array)
 
         new_distance = Interped(
-            self._distance_array, distance_post).sample()
+            self._distance_array, distance_post).sample(rng=rng)
 
         self._rescale_signal(signal_polarizations, new_distance)
         return new_distance
 
     def generate_phase_sample_from_marginalized_likelihood(
-            self, signal_polarizations=None):
+            self, signal_polarizations=None, rng=None):
         """
         Generate a single sample from the posterior distribution for phase when
         using a likelihood which explicitly marginalises over phase.
@@ -473,6 +945,9 @@ class GravitationalWaveTransient(Likelihood):
         ----------
         signal_polarizations: dict, optional
             Polarizations modes of the template.
+        rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+            Source of random numbers, see `bilby.core.utils.get_random_generator`.
+            By default the global numpy random state is used.
 
         Returns
         -------
@@ -499,7 +974,7 @@ class GravitationalWaveTransient(Likelihood):
         phasor = np.exp(-2j * phases)
         phase_log_post = d_inner_h * phasor - h_inner_h / 2
         phase_post = np.exp(phase_log_post.real - max(phase_log_post.real))
-        new_phase = Interped(phases, phase_post).sample()
+        new_phase = Interped(phases, phase_post).sample(rng=rng)
         return new_phase
 
     def distance_marginalized_likelihood(self, d_inner_h, h_inner_h):
@@ -512,6 +987,25 @@ class GravitationalWaveTransient(Likelihood):
         return self._interp_dist_margd_loglikelihood(
             d_inner_h_ref, h_inner_h_ref)
 
+    def _distance_marginalized_likelihood_array(self, d_inner_h, h_inner_h,
+                                                luminosity_distance):
+        """ Distance marginalized likelihood for a stack of samples
+
+        The first axis of `d_inner_h` runs over samples, a second axis, if
+        present, runs over coalescence times.
+        """
+        scale = luminosity_distance / self._ref_dist
+        d_inner_h_ref = (d_inner_h.T * scale).T
+        h_inner_h_ref = np.real(h_inner_h) * scale ** 2
+        if self.phase_marginalization:
+            d_inner_h_ref = np.abs(d_inner_h_ref)
+        else:
+            d_inner_h_ref = np.real(d_inner_h_ref)
+        return np.array([
+            self._interp_dist_margd_loglikelihood(d_ref, h_ref)
+            for d_ref, h_ref in zip(d_inner_h_ref, h_inner_h_ref)
+        ]).reshape(d_inner_h_ref.shape)
+
     def phase_marginalized_likelihood(self, d_inner_h, h_inner_h):
         d_inner_h = self._bessel_function_interped(abs(d_inner_h))
         return d_inner_h - h_inner_h / 2
@@ -846,13 +1340,22 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         The lookup table is stored after construction in either the
         provided string or a default location:
         '.distance_marginalization_lookup_dmin{}_dmax{}_n{}.npz'
+    weights_cache_directory: str, optional
+        If given, the ROQ weights are cached in this directory, keyed by a
+        hash of the data, power spectral densities, basis and time samples.
+        If matching weights already exist they are loaded as read-only
+        memory maps rather than being rebuilt, so that many analyses can
+        share the same weights.
+    weight_threads: int, optional
+        The number of threads used to build the time-shifted linear weights.
 
     """
     def __init__(self, interferometers, waveform_generator, priors,
                  weights=None, linear_matrix=None, quadratic_matrix=None,
                  roq_params=None, roq_params_check=True, roq_scale_factor=1,
                  distance_marginalization=False, phase_marginalization=False,
-                 distance_marginalization_lookup_table=None):
+                 distance_marginalization_lookup_table=None,
+                 weights_cache_directory=None, weight_threads=1):
         super(ROQGravitationalWaveTransient, self).__init__(
             interferometers=interferometers,
             waveform_generator=waveform_generator, priors=priors,
@@ -864,6 +1367,7 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         self.roq_params_check = roq_params_check
         self.roq_scale_factor = roq_scale_factor
+        self.weight_threads = weight_threads
         if isinstance(roq_params, np.ndarray) or roq_params is None:
             self.roq_params = roq_params
         elif isinstance(roq_params, str):
@@ -877,16 +1381,31 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
             self.weights = self.load_weights(weights)
         else:
             self.weights = dict()
-            if isinstance(linear_matrix, str):
-                logger.info(
-                    "Loading linear matrix from {}".format(linear_matrix))
-                linear_matrix = np.load(linear_matrix).T
-            if isinstance(quadratic_matrix, str):
-                logger.info(
-                    "Loading quadratic_matrix from {}".format(quadratic_matrix))
-                quadratic_matrix = np.load(quadratic_matrix).T
-            self._set_weights(linear_matrix=linear_matrix,
-                              quadratic_matrix=quadratic_matrix)
+            if weights_cache_directory is not None:
+                cached_weights_filename = os.path.join(
+                    weights_cache_directory, "roq_weights_{}.npy".format(
+                        self._get_weights_cache_key(
+                            linear_matrix=linear_matrix,
+                            quadratic_matrix=quadratic_matrix)))
+                if os.path.isdir(cached_weights_filename):
+                    self.weights = self.load_weights(
+                        cached_weights_filename, format='npy')
+                    if self.roq_params is not None:
+                        for ifo in self.interferometers:
+                            self.perform_roq_params_check(ifo)
+            if len(self.weights) == 0:
+                if isinstance(linear_matrix, str):
+                    logger.info(
+                        "Loading linear matrix from {}".format(linear_matrix))
+                    linear_matrix = np.load(linear_matrix).T
+                if isinstance(quadratic_matrix, str):
+                    logger.info(
+                        "Loading quadratic_matrix from {}".format(quadratic_matrix))
+                    quadratic_matrix = np.load(quadratic_matrix).T
+                self._set_weights(linear_matrix=linear_matrix,
+                                  quadratic_matrix=quadratic_matrix)
+                if weights_cache_directory is not None:
+                    self.save_weights(cached_weights_filename, format='npy')
         self.frequency_nodes_linear =\
             waveform_generator.waveform_arguments['frequency_nodes_linear']
         self.frequency_nodes_quadratic = \
@@ -903,12 +1422,12 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         """
 
-        f_plus = interferometer.antenna_response(
-            self.parameters['ra'], self.parameters['dec'],
-            self.parameters['geocent_time'], self.parameters['psi'], 'plus')
-        f_cross = interferometer.antenna_response(
+        antenna_response = interferometer.antenna_response_multiple_modes(
             self.parameters['ra'], self.parameters['dec'],
-            self.parameters['geocent_time'], self.parameters['psi'], 'cross')
+            self.parameters['geocent_time'], self.parameters['psi'],
+            ['plus', 'cross'])
+        f_plus = antenna_response['plus']
+        f_cross = antenna_response['cross']
 
         dt = interferometer.time_delay_from_geocenter(
             self.parameters['ra'], self.parameters['dec'],
@@ -959,6 +1478,39 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
             complex_matched_filter_snr=complex_matched_filter_snr,
             d_inner_h_squared_tc_array=d_inner_h_squared_tc_array)
 
+    def log_likelihood_ratio_batch(self, parameters_table, keys=None):
+        """ Compute the log likelihood ratio for many sets of parameters
+
+        The ROQ likelihood is evaluated at the frequency nodes only, so this
+        loops over the samples rather than building the full frequency
+        domain detector responses.
+
+        Parameters
+        ----------
+        parameters_table: pandas.DataFrame, dict, array_like
+            The parameters to evaluate the likelihood at, either a DataFrame,
+            a dictionary of arrays, or an (N, ndim) array. Any parameters not
+            given are taken from `self.parameters`.
+        keys: list, optional
+            The parameter names of the columns of `parameters_table`, required
+            if this is an array.
+
+        Returns
+        -------
+        array_like: The log likelihood ratio for each of the N samples
+        """
+        return self._log_likelihood_ratio_batch_loop(
+            parameters_table=parameters_table, keys=keys)
+
+    def generate_posterior_sample_from_marginalized_likelihood_batch(
+            self, parameters_table, keys=None, rng=None):
+        """
+        Reconstruct the marginalized parameters for many samples, this
+        loops over `generate_posterior_sample_from_marginalized_likelihood`.
+        """
+        return self._generate_posterior_sample_batch_loop(
+            parameters_table=parameters_table, keys=keys, rng=rng)
+
     @staticmethod
     def _closest_time_indices(time, samples):
         """
@@ -1062,14 +1614,7 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         """
 
-        time_space = self._get_time_resolution()
-        # Maximum delay time to geocentre + 5 steps
-        earth_light_crossing_time = radius_of_earth / speed_of_light + 5 * time_space
-        delta_times = np.arange(
-            self.priors['geocent_time'].minimum - earth_light_crossing_time,
-            self.priors['geocent_time'].maximum + earth_light_crossing_time,
-            time_space)
-        time_samples = delta_times - self.interferometers.start_time
+        time_samples = self._get_time_samples()
         self.weights['time_samples'] = time_samples
         logger.info("Using {} ROQ time samples".format(len(time_samples)))
 
@@ -1103,34 +1648,17 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                     ifo.name, len(overlap_frequencies),
                     min(overlap_frequencies), max(overlap_frequencies)))
 
-            logger.debug("Preallocate array")
-            tc_shifted_data = np.zeros((
-                len(self.weights['time_samples']), len(overlap_frequencies)),
-                dtype=complex)
-
-            logger.debug("Calculate shifted data")
+            logger.debug("Calculate time-shifted weights")
             data = ifo.frequency_domain_strain[ifo.frequency_mask][ifo_idxs]
             prefactor = (
                 data /
                 ifo.power_spectral_density_array[ifo.frequency_mask][ifo_idxs]
             )
-            for j in range(len(self.weights['time_samples'])):
-                tc_shifted_data[j] = prefactor * np.exp(
-                    2j * np.pi * overlap_frequencies * time_samples[j])
-
-            # to not kill all computers this minimises the memory usage of the
-            # required inner products
-            max_block_gigabytes = 4
-            max_elements = int((max_block_gigabytes * 2 ** 30) / 8)
-
-            logger.debug("Apply dot product")
-            self.weights[ifo.name + '_linear'] = blockwise_dot_product(
-                tc_shifted_data,
-                linear_matrix[roq_idxs],
-                max_elements) * 4 / ifo.strain_data.duration
-
-            del tc_shifted_data, overlap_frequencies
-            gc.collect()
+            self.weights[ifo.name + '_linear'] = build_roq_time_shifted_weights(
+                data=prefactor, frequencies=overlap_frequencies,
+                time_samples=time_samples, basis=linear_matrix[roq_idxs],
+                deltaF=1 / ifo.strain_data.duration,
+                n_threads=self.weight_threads)
 
             self.weights[ifo.name + '_quadratic'] = build_roq_weights(
                 1 /
@@ -1140,7 +1668,73 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
             logger.info("Finished building weights for {}".format(ifo.name))
 
+    def _get_time_samples(self):
+        """ The times, relative to the start of the data, at which the linear
+        ROQ weights are computed """
+        time_space = self._get_time_resolution()
+        # Maximum delay time to geocentre + 5 steps
+        earth_light_crossing_time = radius_of_earth / speed_of_light + 5 * time_space
+        delta_times = np.arange(
+            self.priors['geocent_time'].minimum - earth_light_crossing_time,
+            self.priors['geocent_time'].maximum + earth_light_crossing_time,
+            time_space)
+        return delta_times - self.interferometers.start_time
+
+    def _get_weights_cache_key(self, linear_matrix, quadratic_matrix):
+        """ Hash the quantities which determine the ROQ weights
+
+        Bases given as file names are identified by the path, size and
+        modification time of the file, so that they need not be loaded when
+        the weights are already cached.
+
+        Parameters
+        ----------
+        linear_matrix, quadratic_matrix: str, array_like
+            The linear and quadratic basis, or the files containing them
+
+        Returns
+        -------
+        str: The hexadecimal digest
+        """
+        hasher = hashlib.sha1()
+
+        def update(value):
+            if isinstance(value, np.ndarray):
+                hasher.update(str((value.shape, value.dtype)).encode())
+                hasher.update(np.ascontiguousarray(value).data)
+            else:
+                hasher.update(repr(value).encode())
+
+        for matrix in [linear_matrix, quadratic_matrix]:
+            if isinstance(matrix, str):
+                stat = os.stat(matrix)
+                update((os.path.abspath(matrix), stat.st_size, stat.st_mtime))
+            else:
+                update(np.asarray(matrix))
+        for ifo in self.interferometers:
+            mask = ifo.frequency_mask
+            update(ifo.name)
+            update(ifo.frequency_array[mask])
+            update(ifo.frequency_domain_strain[mask])
+            update(ifo.power_spectral_density_array[mask])
+            update(ifo.strain_data.duration)
+        update(self._get_time_samples())
+        update(self.roq_params)
+        update(self.roq_scale_factor)
+        return hasher.hexdigest()
+
     def save_weights(self, filename, format='npz'):
+        """ Save the ROQ weights
+
+        Parameters
+        ----------
+        filename: str
+            The file to write to, the format is appended if not present
+        format: str, optional
+            One of 'npz', 'json' or 'npy'. With 'npy' each weight is written
+            as an uncompressed array in a directory, these can be loaded as
+            memory maps.
+        """
         if format not in filename:
             filename += "." + format
         logger.info("Saving ROQ weights to {}".format(filename))
@@ -1149,12 +1743,40 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 json.dump(self.weights, file, indent=2, cls=BilbyJsonEncoder)
         elif format == 'npz':
             np.savez(filename, **self.weights)
+        elif format == 'npy':
+            # write to a temporary directory and move it into place so that
+            # other processes never read partially written weights
+            temporary_directory = "{}.{}.tmp".format(filename, os.getpid())
+            os.makedirs(temporary_directory)
+            for key in self.weights:
+                np.save(os.path.join(temporary_directory, key + ".npy"),
+                        self.weights[key])
+            try:
+                os.rename(temporary_directory, filename)
+            except OSError:
+                logger.debug("ROQ weights {} already exist".format(filename))
+                shutil.rmtree(temporary_directory)
 
     @staticmethod
     def load_weights(filename, format=None):
+        """ Load ROQ weights
+
+        Parameters
+        ----------
+        filename: str
+            The file to read from
+        format: str, optional
+            One of 'npz', 'json' or 'npy', by default this is inferred from
+            the file extension. Weights in 'npy' format are loaded as
+            read-only memory maps.
+
+        Returns
+        -------
+        dict: The ROQ weights
+        """
         if format is None:
             format = filename.split(".")[-1]
-        if format not in ["json", "npz"]:
+        if format not in ["json", "npz", "npy"]:
             raise IOError("Format {} not recongized.".format(format))
         logger.info("Loading ROQ weights from {}".format(filename))
         if format == "json":
@@ -1163,6 +1785,11 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         elif format == "npz":
             # Wrap in dict to load data into memory
             weights = dict(np.load(filename))
+        elif format == "npy":
+            weights = {
+                name[:-len(".npy")]: np.load(
+                    os.path.join(filename, name), mmap_mode='r')
+                for name in os.listdir(filename) if name.endswith(".npy")}
         return weights
 
     def _get_time_resolution(self):
@@ -1232,6 +1859,525 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 signal[kind][mode] *= self._ref_dist / new_distance
 
 
+class RelativeBinningGravitationalWaveTransient(GravitationalWaveTransient):
+    """A relative binning likelihood object
+
+    This uses the method described in Zackay, Dai & Venumadhav (2018),
+    arxiv.org/abs/1806.08792. The ratio of the template to a fiducial
+    waveform, close to the maximum likelihood, is approximated as linear in
+    frequency over a set of frequency bins, so that the inner products can be
+    computed from summary data precomputed for the fiducial waveform.
+
+    To avoid evaluating the waveform on the full frequency array use either
+    `bilby.gw.source.lal_binary_black_hole_relative_binning` or
+    `bilby.gw.source.lal_binary_neutron_star_relative_binning` as the
+    frequency domain source model, for other source models the waveform is
+    evaluated on the full frequency array and downsampled.
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters
+    fiducial_parameters: dict
+        The parameters of the fiducial waveform, these should be close to
+        the maximum likelihood parameters and must contain all the parameters
+        required to compute the detector response.
+    priors: dict, bilby.prior.PriorDict, optional
+        If given, used in the distance, phase and time marginalization.
+    time_marginalization: bool, optional
+        If true, marginalize over time in the likelihood, see
+        `GravitationalWaveTransient`. The inner products as a function of
+        time are computed from summary data for the times allowed by the
+        prior, see `_time_summary_data`.
+    distance_marginalization: bool, optional
+        If true, marginalize over distance in the likelihood, see
+        `GravitationalWaveTransient`.
+    phase_marginalization: bool, optional
+        If true, marginalize over phase in the likelihood, see
+        `GravitationalWaveTransient`.
+    distance_marginalization_lookup_table: (dict, str), optional
+        See `GravitationalWaveTransient`.
+    jitter_time: bool, optional
+        See `GravitationalWaveTransient`.
+    epsilon: float, optional
+        The maximum phase difference (in radians) allowed across a bin between
+        the template and the fiducial waveform, smaller values give more bins
+        and a more accurate likelihood. Default is 0.5.
+
+    """
+
+    gamma = np.array([-5 / 3, -2 / 3, 1, 5 / 3, 7 / 3])
+    chi = 1
+
+    def __init__(self, interferometers, waveform_generator,
+                 fiducial_parameters, priors=None,
+                 time_marginalization=False, distance_marginalization=False,
+                 phase_marginalization=False,
+                 distance_marginalization_lookup_table=None,
+                 jitter_time=True, epsilon=0.5):
+        super(RelativeBinningGravitationalWaveTransient, self).__init__(
+            interferometers=interferometers,
+            waveform_generator=waveform_generator, priors=priors,
+            time_marginalization=time_marginalization,
+            distance_marginalization=distance_marginalization,
+            phase_marginalization=phase_marginalization,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table,
+            jitter_time=jitter_time)
+        self.fiducial_parameters = dict(fiducial_parameters)
+        self.epsilon = epsilon
+        self.binned_waveform = (
+            waveform_generator.frequency_domain_source_model in
+            [lal_binary_black_hole_relative_binning,
+             lal_binary_neutron_star_relative_binning])
+        self.setup_bins()
+        if self.binned_waveform:
+            self.waveform_generator.waveform_arguments['frequency_bin_edges'] =\
+                self.bin_frequencies
+        self.set_fiducial_waveforms()
+        self.compute_summary_data()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\tfiducial_parameters={}, ' \
+                                         'epsilon={},\n\ttime_marginalization={}, distance_marginalization={}, ' \
+                                         'phase_marginalization={}, priors={})'\
+            .format(self.interferometers, self.waveform_generator, self.fiducial_parameters, self.epsilon,
+                    self.time_marginalization, self.distance_marginalization, self.phase_marginalization,
+                    self.priors)
+
+    def setup_bins(self):
+        """ Choose the frequency bins such that the phase of any waveform in
+        the prior changes by less than `epsilon` relative to the fiducial
+        waveform across each bin, see Eq. (10-11) of
+        arxiv.org/abs/1806.08792.
+        """
+        frequency_array = self.interferometers.frequency_array
+        minimum_frequency = min(
+            [ifo.minimum_frequency for ifo in self.interferometers])
+        maximum_frequency = max(
+            [ifo.maximum_frequency for ifo in self.interferometers])
+        in_band = ((frequency_array >= minimum_frequency) &
+                   (frequency_array <= maximum_frequency))
+        indices = np.arange(len(frequency_array))[in_band]
+        frequencies = frequency_array[in_band]
+
+        gamma = self.gamma[:, np.newaxis]
+        f_min = frequencies[0]
+        f_max = frequencies[-1]
+        d_alpha = self.chi * 2 * np.pi / np.abs(
+            f_min ** gamma * np.heaviside(-gamma, 1) -
+            f_max ** gamma * np.heaviside(gamma, 1))
+        d_phi = np.sum(np.sign(gamma) * d_alpha * frequencies ** gamma, axis=0)
+        d_phi -= d_phi[0]
+        number_of_bins = int(d_phi[-1] // self.epsilon)
+        edges = np.searchsorted(
+            d_phi, self.epsilon * np.arange(number_of_bins + 1))
+        edges = np.unique(np.append(
+            np.minimum(edges, len(frequencies) - 1), len(frequencies) - 1))
+
+        self.bin_indices = indices[edges]
+        self.bin_frequencies = frequency_array[self.bin_indices]
+        self.bin_widths = np.diff(self.bin_frequencies)
+        self.bin_centers = (
+            self.bin_frequencies[1:] + self.bin_frequencies[:-1]) / 2
+        self.number_of_bins = len(self.bin_widths)
+        logger.info(
+            "Using {} bins for the relative binning likelihood".format(
+                self.number_of_bins))
+
+    def set_fiducial_waveforms(self):
+        """ Compute the fiducial waveform in each detector on the full
+        frequency array and at the bin edges """
+        if self.binned_waveform:
+            self.waveform_generator.waveform_arguments['fiducial'] = True
+        polarizations = self.waveform_generator.frequency_domain_strain(
+            self.fiducial_parameters)
+        if polarizations is None:
+            raise ValueError(
+                "Failed to generate the fiducial waveform for parameters "
+                "{}".format(self.fiducial_parameters))
+        polarizations = copy.deepcopy(polarizations)
+        if self.binned_waveform:
+            self.waveform_generator.waveform_arguments['fiducial'] = False
+            binned_polarizations = copy.deepcopy(
+                self.waveform_generator.frequency_domain_strain(
+                    self.fiducial_parameters))
+        else:
+            binned_polarizations = self._polarizations_at_bin_edges(
+                polarizations)
+
+        self.per_detector_fiducial_waveforms = dict()
+        self.per_detector_fiducial_waveform_points = dict()
+        for interferometer in self.interferometers:
+            self.per_detector_fiducial_waveforms[interferometer.name] =\
+                interferometer.get_detector_response(
+                    polarizations, self.fiducial_parameters)
+            self.per_detector_fiducial_waveform_points[interferometer.name] =\
+                interferometer.get_detector_response(
+                    binned_polarizations, self.fiducial_parameters,
+                    frequencies=self.bin_frequencies)
+
+    def compute_summary_data(self):
+        """ Compute the summary data for each detector, see Eq. (7) of
+        arxiv.org/abs/1806.08792.
+
+        The zeroth and first order coefficients of the linear expansion of
+        the ratio about the bin centers are stored in `self.summary_data`.
+        """
+        duration = self.waveform_generator.duration
+        start = self.bin_indices[0]
+        stop = self.bin_indices[-1] + 1
+        segments = self.bin_indices[:-1] - start
+        frequencies = self.interferometers.frequency_array[start:stop]
+        offsets = frequencies - np.repeat(
+            self.bin_centers, np.diff(np.append(segments, stop - start)))
+
+        self.summary_data = dict()
+        for interferometer in self.interferometers:
+            mask = interferometer.frequency_mask[start:stop]
+            psd = interferometer.power_spectral_density_array[start:stop]
+            weights = np.zeros(len(frequencies))
+            weights[mask] = 4 / duration / psd[mask]
+            data = interferometer.frequency_domain_strain[start:stop]
+            fiducial = self.per_detector_fiducial_waveforms[
+                interferometer.name][start:stop]
+
+            data_term = np.conj(fiducial) * data * weights
+            signal_term = np.abs(fiducial) ** 2 * weights
+            self.summary_data[interferometer.name] = dict(
+                a0=np.add.reduceat(data_term, segments),
+                a1=np.add.reduceat(data_term * offsets, segments),
+                b0=np.add.reduceat(signal_term, segments),
+                b1=np.add.reduceat(signal_term * offsets, segments))
+        self._time_summary_cache = dict()
+
+    def _time_summary_data(self, interferometer, shift):
+        """ Summary data for the inner products as a function of time
+
+        The time series of the inner product is
+        `fft(h * conj(d) / psd)[k] = sum_j A_j r_j exp(-2 pi i j (k + shift) / M)`,
+        where `A_j` is the fiducial waveform times the conjugate data over the
+        PSD and `r_j` is the ratio of the template to the fiducial waveform,
+        without the time shift by `shift` samples. The ratio is linear in
+        each bin, so this is
+        `sum_b S0[k, b] r0[b] + S1[k, b] r1[b]` where `S0` and `S1` are
+        the sums over each bin for the times `k` where the prior is nonzero.
+        These only depend on `shift`, which is constant while sampling with
+        a time marginalized likelihood, they are computed once and stored.
+
+        Parameters
+        ----------
+        interferometer: bilby.gw.detector.Interferometer
+            The bilby interferometer object
+        shift: int
+            The integer number of time samples between the template and the
+            fiducial waveform
+
+        Returns
+        -------
+        indices: array_like
+            The indices of the time series the summary data is computed for
+        s0, s1: array_like
+            The (len(indices), number_of_bins) summary data
+        """
+        key = (interferometer.name, shift)
+        if key in self._time_summary_cache:
+            return self._time_summary_cache[key]
+
+        n_times = len(self._times)
+        allowed = self.priors['geocent_time'].prob(self._times) > 0
+        # Include the neighbouring times which can be reached by the jitter
+        allowed[1:] |= allowed[:-1].copy()
+        allowed[:-1] |= allowed[1:].copy()
+        allowed[0] = True
+        indices = np.arange(n_times)[allowed]
+
+        duration = self.waveform_generator.duration
+        frequency_indices = np.arange(
+            self.bin_indices[0], min(self.bin_indices[-1] + 1, n_times))
+        fiducial = self.per_detector_fiducial_waveforms[interferometer.name]
+        weights = (
+            4 / duration * fiducial[frequency_indices] *
+            np.conj(interferometer.frequency_domain_strain[frequency_indices]) /
+            interferometer.power_spectral_density_array[frequency_indices])
+        offsets = (self.interferometers.frequency_array[frequency_indices] -
+                   np.repeat(self.bin_centers, np.diff(self.bin_indices))[
+                       :len(frequency_indices)])
+        shifted_indices = (indices + shift) % n_times
+
+        s0 = np.zeros((len(indices), self.number_of_bins), dtype=complex)
+        s1 = np.zeros((len(indices), self.number_of_bins), dtype=complex)
+        bin_starts = self.bin_indices[:-1] - frequency_indices[0]
+        bin_stops = np.append(bin_starts[1:], len(frequency_indices))
+        for ii, (start, stop) in enumerate(zip(bin_starts, bin_stops)):
+            phase = np.outer(shifted_indices, frequency_indices[start:stop]) % n_times
+            rotation = np.exp(-2j * np.pi * phase / n_times)
+            s0[:, ii] = rotation @ weights[start:stop]
+            s1[:, ii] = rotation @ (weights[start:stop] * offsets[start:stop])
+
+        if len(self._time_summary_cache) >= 2 * len(self.interferometers):
+            self._time_summary_cache = dict()
+        self._time_summary_cache[key] = (indices, s0, s1)
+        return indices, s0, s1
+
+    def _polarizations_at_bin_edges(self, waveform_polarizations):
+        frequency_array = self.waveform_generator.frequency_array
+        binned = dict()
+        for mode in waveform_polarizations:
+            if len(waveform_polarizations[mode]) == len(frequency_array):
+                binned[mode] = waveform_polarizations[mode][self.bin_indices]
+            else:
+                binned[mode] = waveform_polarizations[mode]
+        return binned
+
+    def compute_waveform_ratio(self, waveform_polarizations, interferometer,
+                               parameters):
+        """ Compute the ratio of the template to the fiducial waveform at the
+        bin edges
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            The waveform polarizations, either at the bin edges or on the
+            full frequency array.
+        interferometer: bilby.gw.detector.Interferometer
+            The bilby interferometer object
+        parameters: dict
+            The parameters to compute the detector response for
+
+        Returns
+        -------
+        array_like: The ratio at each of the bin edges
+        """
+        signal = interferometer.get_detector_response(
+            self._polarizations_at_bin_edges(waveform_polarizations),
+            parameters, frequencies=self.bin_frequencies)
+        fiducial = self.per_detector_fiducial_waveform_points[interferometer.name]
+        ratio = np.zeros(len(signal), dtype=np.complex128)
+        nonzero = fiducial != 0
+        ratio[nonzero] = signal[nonzero] / fiducial[nonzero]
+        return ratio
+
+    def calculate_snrs(self, waveform_polarizations, interferometer):
+        """
+        Compute the snrs using the relative binning summary data
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            A dictionary of waveform polarizations and the corresponding
+            array, either at the bin edges or on the full frequency array
+        interferometer: bilby.gw.detector.Interferometer
+            The bilby interferometer object
+
+        """
+        if self.time_marginalization:
+            parameters = self.parameters.copy()
+            parameters['geocent_time'] = self.fiducial_parameters['geocent_time']
+        else:
+            parameters = self.parameters
+        ratio = self.compute_waveform_ratio(
+            waveform_polarizations, interferometer, parameters)
+        r0 = (ratio[1:] + ratio[:-1]) / 2
+        r1 = np.diff(ratio) / self.bin_widths
+
+        summary = self.summary_data[interferometer.name]
+        optimal_snr_squared = np.sum(
+            summary['b0'] * np.abs(r0) ** 2 +
+            2 * summary['b1'] * np.real(r0 * np.conj(r1)))
+
+        if self.time_marginalization:
+            # Split the time shift into a whole number of samples of the
+            # time series and a remainder applied to the ratio
+            n_times = len(self._times)
+            time_shift = (self.parameters['geocent_time'] -
+                          self.fiducial_parameters['geocent_time'])
+            shift = int(np.round(
+                time_shift * n_times / self.waveform_generator.duration))
+            residual = (time_shift -
+                        shift * self.waveform_generator.duration / n_times)
+            shifted_ratio = ratio * np.exp(
+                -2j * np.pi * self.bin_frequencies * residual)
+            indices, s0, s1 = self._time_summary_data(
+                interferometer, shift % n_times)
+            d_inner_h_squared_tc_array = np.zeros(n_times, dtype=complex)
+            d_inner_h_squared_tc_array[indices] = (
+                s0 @ ((shifted_ratio[1:] + shifted_ratio[:-1]) / 2) +
+                s1 @ (np.diff(shifted_ratio) / self.bin_widths))
+            d_inner_h = np.conj(d_inner_h_squared_tc_array[0])
+        else:
+            d_inner_h = np.sum(
+                summary['a0'] * np.conj(r0) + summary['a1'] * np.conj(r1))
+            d_inner_h_squared_tc_array = None
+
+        complex_matched_filter_snr = d_inner_h / (optimal_snr_squared**0.5)
+
+        return self._CalculatedSNRs(
+            d_inner_h=d_inner_h, optimal_snr_squared=optimal_snr_squared,
+            complex_matched_filter_snr=complex_matched_filter_snr,
+            d_inner_h_squared_tc_array=d_inner_h_squared_tc_array)
+
+    def log_likelihood_ratio_batch(self, parameters_table, keys=None):
+        """ Compute the log likelihood ratio for many sets of parameters
+
+        The relative binning likelihood only uses the waveform at the bin
+        edges, so this loops over the samples rather than building the full
+        frequency domain detector responses.
+
+        Parameters
+        ----------
+        parameters_table: pandas.DataFrame, dict, array_like
+            The parameters to evaluate the likelihood at, either a DataFrame,
+            a dictionary of arrays, or an (N, ndim) array. Any parameters not
+            given are taken from `self.parameters`.
+        keys: list, optional
+            The parameter names of the columns of `parameters_table`, required
+            if this is an array.
+
+        Returns
+        -------
+        array_like: The log likelihood ratio for each of the N samples
+        """
+        return self._log_likelihood_ratio_batch_loop(
+            parameters_table=parameters_table, keys=keys)
+
+    def generate_posterior_sample_from_marginalized_likelihood_batch(
+            self, parameters_table, keys=None, rng=None):
+        """
+        Reconstruct the marginalized parameters for many samples, this
+        loops over `generate_posterior_sample_from_marginalized_likelihood`.
+        """
+        return self._generate_posterior_sample_batch_loop(
+            parameters_table=parameters_table, keys=keys, rng=rng)
+
+    def generate_posterior_sample_from_marginalized_likelihood(self, rng=None):
+        """
+        Reconstruct the marginalized parameters, see
+        `GravitationalWaveTransient.generate_posterior_sample_from_marginalized_likelihood`.
+
+        The waveform is evaluated on the full frequency array for the
+        reconstruction.
+        """
+        if not self.binned_waveform:
+            return super(RelativeBinningGravitationalWaveTransient,
+                         self).generate_posterior_sample_from_marginalized_likelihood(
+                rng=rng)
+        self.waveform_generator.waveform_arguments['fiducial'] = True
+        try:
+            return super(RelativeBinningGravitationalWaveTransient,
+                         self).generate_posterior_sample_from_marginalized_likelihood(
+                rng=rng)
+        finally:
+            self.waveform_generator.waveform_arguments['fiducial'] = False
+
+
+def _sample_from_tabulated_distributions(xx, yy, rng=None):
+    """ Draw one sample from each of a set of tabulated distributions
+
+    For evenly spaced `xx` this is equivalent to drawing a sample from
+    `Interped(xx, yy)` for each row, using inverse transform sampling of the
+    trapezoidal cumulative distribution.
+
+    Parameters
+    ----------
+    xx: array_like
+        The sorted points at which the densities are tabulated, either one
+        dimensional and shared by all rows, or with the same shape as `yy`.
+    yy: array_like
+        The (n_samples, n_points) unnormalized densities
+    rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        Source of random numbers, see `bilby.core.utils.get_random_generator`.
+
+    Returns
+    -------
+    array_like: One sample for each row of `yy`
+    """
+    yy = np.atleast_2d(yy)
+    xx = np.broadcast_to(xx, yy.shape)
+    n_samples, n_points = yy.shape
+    interval_mass = (yy[:, 1:] + yy[:, :-1]) / 2 * np.diff(xx, axis=-1)
+    cumulative = np.cumsum(interval_mass, axis=-1)
+    if np.any(cumulative[:, -1] <= 0):
+        raise MarginalizedLikelihoodReconstructionError(
+            "Cannot sample from a distribution with zero probability.")
+    uu = get_random_generator(rng).uniform(0, 1, n_samples) * cumulative[:, -1]
+    idxs = np.minimum(
+        np.sum(cumulative < uu[:, np.newaxis], axis=-1), n_points - 2)
+    rows = np.arange(n_samples)
+    lower = cumulative[rows, idxs] - interval_mass[rows, idxs]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(
+            interval_mass[rows, idxs] > 0,
+            (uu - lower) / interval_mass[rows, idxs], 0)
+    return xx[rows, idxs] + fraction * (xx[rows, idxs + 1] - xx[rows, idxs])
+
+
+def _sample_from_retained_points(xx, yy, keep, rng=None):
+    """ Draw one sample from each row of a set of partially retained tables
+
+    This is equivalent to drawing a sample from
+    `Interped(xx[ii, keep[ii]], yy[ii, keep[ii]])` for each row: the retained
+    points are linearly interpolated across the gaps onto an evenly spaced
+    grid with the same number of points, which is then sampled with
+    `_sample_from_tabulated_distributions`.
+
+    Parameters
+    ----------
+    xx: array_like
+        The (n_samples, n_points) positions, increasing along each row
+    yy: array_like
+        The (n_samples, n_points) unnormalized densities
+    keep: array_like
+        Boolean (n_samples, n_points) array of the points to use, at least
+        two per row
+    rng: numpy.random.Generator, int, numpy.random.SeedSequence, optional
+        Source of random numbers, see `bilby.core.utils.get_random_generator`.
+
+    Returns
+    -------
+    array_like: One sample for each row of `yy`
+    """
+    n_samples = len(yy)
+    n_keep = np.sum(keep, axis=-1)
+    width = np.max(n_keep)
+    rows = np.arange(n_samples)[:, np.newaxis]
+    columns = np.arange(width)
+
+    # Pack the retained points to the start of each row, the padding repeats
+    # the last retained position with zero density
+    kept_rows = np.nonzero(keep)[0]
+    kept_columns = (np.cumsum(keep, axis=-1) - 1)[keep]
+    packed_x = np.empty((n_samples, width))
+    packed_y = np.zeros((n_samples, width))
+    packed_x[kept_rows, kept_columns] = xx[keep]
+    packed_y[kept_rows, kept_columns] = yy[keep]
+    lower = packed_x[:, 0].copy()
+    span = packed_x[rows[:, 0], n_keep - 1] - lower
+    padding = columns >= n_keep[:, np.newaxis]
+    packed_x -= lower[:, np.newaxis]
+    packed_x[padding] = np.broadcast_to(span[:, np.newaxis], padding.shape)[padding]
+
+    # The evenly spaced grid of each row and the linear interpolation of the
+    # retained points onto it, offsetting the rows allows a single search
+    grid = np.minimum(
+        columns * (span / (n_keep - 1))[:, np.newaxis], span[:, np.newaxis])
+    offset = rows * (np.max(span) + 1)
+    idxs = np.searchsorted(
+        (packed_x + offset).flatten(), (grid + offset).flatten(),
+        side='right').reshape(grid.shape) - rows * width - 1
+    idxs = np.clip(idxs, 0, (n_keep - 2)[:, np.newaxis])
+    x_low = packed_x[rows, idxs]
+    x_high = packed_x[rows, idxs + 1]
+    y_low = packed_y[rows, idxs]
+    y_high = packed_y[rows, idxs + 1]
+    grid_y = y_low + (grid - x_low) / (x_high - x_low) * (y_high - y_low)
+    grid_y[padding] = 0
+    return lower + _sample_from_tabulated_distributions(grid, grid_y, rng=rng)
+
+
 def get_binary_black_hole_likelihood(interferometers):
     """ A rapper to quickly set up a likelihood for BBH parameter estimation
 
@@ -13,7 +13,7 @@ from .conversion import (
     generate_tidal_parameters, fill_from_fixed_priors,
     chirp_mass_and_mass_ratio_to_total_mass,
     total_mass_and_mass_ratio_to_component_masses)
-from .cosmology import get_cosmology
+from .cosmology import get_cosmology, distance_to_redshift
 
 try:
     from astropy import cosmology as cosmo, units
@@ -144,15 +144,17 @@ class Cosmological(Interped):
             if minimum == 0:
                 self._minimum['redshift'] = 0
             else:
-                self._minimum['redshift'] = cosmo.z_at_value(
-                    cosmology.luminosity_distance, minimum * self.unit)
+                self._minimum['redshift'] = distance_to_redshift(
+                    (minimum * self.unit).to(units.Mpc).value,
+                    distance_type='luminosity_distance', cosmology=cosmology)
             self._minimum['comoving_distance'] = self._minimum['redshift']
         elif self.name == 'comoving_distance':
             if minimum == 0:
                 self._minimum['redshift'] = 0
             else:
-                self._minimum['redshift'] = cosmo.z_at_value(
-                    cosmology.comoving_distance, minimum * self.unit)
+                self._minimum['redshift'] = distance_to_redshift(
+                    (minimum * self.unit).to(units.Mpc).value,
+                    distance_type='comoving_distance', cosmology=cosmology)
             self._minimum['luminosity_distance'] = self._minimum['redshift']
         try:
             self._update_instance()
@@ -173,12 +175,14 @@ class Cosmological(Interped):
             self._maximum['comoving_distance'] = \
                 cosmology.comoving_distance(maximum).value
         elif self.name == 'luminosity_distance':
-            self._maximum['redshift'] = cosmo.z_at_value(
-                cosmology.luminosity_distance, maximum * self.unit)
+            self._maximum['redshift'] = distance_to_redshift(
+                (maximum * self.unit).to(units.Mpc).value,
+                distance_type='luminosity_distance', cosmology=cosmology)
             self._maximum['comoving_distance'] = self._maximum['redshift']
         elif self.name == 'comoving_distance':
-            self._maximum['redshift'] = cosmo.z_at_value(
-                cosmology.comoving_distance, maximum * self.unit)
+            self._maximum['redshift'] = distance_to_redshift(
+                (maximum * self.unit).to(units.Mpc).value,
+                distance_type='comoving_distance', cosmology=cosmology)
             self._maximum['luminosity_distance'] = self._maximum['redshift']
         try:
             self._update_instance()
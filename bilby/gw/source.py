@@ -181,6 +181,133 @@ def lal_binary_neutron_star(
         phi_jl=phi_jl, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
 
 
+def lal_binary_black_hole_relative_binning(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, **kwargs):
+    """ A Binary Black Hole waveform model for the relative binning likelihood
+
+    This is the same as `lal_binary_black_hole`, except that if the
+    `frequency_bin_edges` keyword argument is passed and `fiducial` is False
+    the waveform is only evaluated at the bin edges. These arguments are set
+    by `bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient`.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    a_1: float
+        Dimensionless primary spin magnitude
+    tilt_1: float
+        Primary tilt angle
+    phi_12: float
+        Azimuthal angle between the two component spins
+    a_2: float
+        Dimensionless secondary spin magnitude
+    tilt_2: float
+        Secondary tilt angle
+    phi_jl: float
+        Azimuthal angle between the total binary angular momentum and the
+        orbital angular momentum
+    theta_jn: float
+        Angle between the total binary angular momentum and the line of sight
+    phase: float
+        The phase at coalescence
+    kwargs: dict
+        Optional keyword arguments, see `lal_binary_black_hole`.
+        Additional supported arguments:
+            frequency_bin_edges
+            fiducial
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    waveform_kwargs = dict(
+        waveform_approximant='IMRPhenomPv2', reference_frequency=50.0,
+        minimum_frequency=20.0, maximum_frequency=frequency_array[-1],
+        catch_waveform_errors=False, pn_spin_order=-1, pn_tidal_order=-1,
+        pn_phase_order=-1, pn_amplitude_order=0, fiducial=True,
+        frequency_bin_edges=None)
+    waveform_kwargs.update(kwargs)
+    return _base_relative_binning_waveform(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_12=phi_12,
+        phi_jl=phi_jl, **waveform_kwargs)
+
+
+def lal_binary_neutron_star_relative_binning(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, lambda_1, lambda_2,
+        **kwargs):
+    """ A Binary Neutron Star waveform model for the relative binning likelihood
+
+    This is the same as `lal_binary_neutron_star`, except that if the
+    `frequency_bin_edges` keyword argument is passed and `fiducial` is False
+    the waveform is only evaluated at the bin edges. These arguments are set
+    by `bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient`.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    a_1: float
+        Dimensionless primary spin magnitude
+    tilt_1: float
+        Primary tilt angle
+    phi_12: float
+        Azimuthal angle between the two component spins
+    a_2: float
+        Dimensionless secondary spin magnitude
+    tilt_2: float
+        Secondary tilt angle
+    phi_jl: float
+        Azimuthal angle between the total binary angular momentum and the
+        orbital angular momentum
+    theta_jn: float
+        Orbital inclination
+    phase: float
+        The phase at coalescence
+    lambda_1: float
+        Dimensionless tidal deformability of mass_1
+    lambda_2: float
+        Dimensionless tidal deformability of mass_2
+    kwargs: dict
+        Optional keyword arguments, see `lal_binary_neutron_star`.
+        Additional supported arguments:
+            frequency_bin_edges
+            fiducial
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    waveform_kwargs = dict(
+        waveform_approximant='IMRPhenomPv2_NRTidal', reference_frequency=50.0,
+        minimum_frequency=20.0, maximum_frequency=frequency_array[-1],
+        catch_waveform_errors=False, pn_spin_order=-1, pn_tidal_order=-1,
+        pn_phase_order=-1, pn_amplitude_order=0, fiducial=True,
+        frequency_bin_edges=None)
+    waveform_kwargs.update(kwargs)
+    return _base_relative_binning_waveform(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_12=phi_12,
+        phi_jl=phi_jl, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
+
+
 def lal_eccentric_binary_black_hole_no_spins(
         frequency_array, mass_1, mass_2, eccentricity, luminosity_distance,
         theta_jn, phase, **kwargs):
@@ -394,6 +521,67 @@ def _base_lal_cbc_fd_waveform(
     return dict(plus=h_plus, cross=h_cross)
 
 
+def _base_relative_binning_waveform(
+        frequency_array, mass_1, mass_2, luminosity_distance, theta_jn, phase,
+        a_1=0.0, a_2=0.0, tilt_1=0.0, tilt_2=0.0, phi_12=0.0, phi_jl=0.0,
+        lambda_1=0.0, lambda_2=0.0, **waveform_kwargs):
+    """ Generate a cbc waveform model either on the full frequency array or
+    at the relative binning bin edges using lalsimulation
+
+    See `_base_lal_cbc_fd_waveform` for the parameters, if
+    `frequency_bin_edges` is given in the `waveform_kwargs` and `fiducial` is
+    False, the waveform is evaluated using
+    `lalsimulation.SimInspiralChooseFDWaveformSequence` at those
+    frequencies.
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    fiducial = waveform_kwargs.pop('fiducial')
+    frequency_bin_edges = waveform_kwargs.pop('frequency_bin_edges')
+    if fiducial or frequency_bin_edges is None:
+        return _base_lal_cbc_fd_waveform(
+            frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+            luminosity_distance=luminosity_distance, theta_jn=theta_jn,
+            phase=phase, a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2,
+            phi_12=phi_12, phi_jl=phi_jl, lambda_1=lambda_1,
+            lambda_2=lambda_2, **waveform_kwargs)
+
+    reference_frequency = waveform_kwargs['reference_frequency']
+    approximant = lalsim_GetApproximantFromString(
+        waveform_kwargs['waveform_approximant'])
+
+    luminosity_distance = luminosity_distance * 1e6 * utils.parsec
+    mass_1 = mass_1 * utils.solar_mass
+    mass_2 = mass_2 * utils.solar_mass
+
+    waveform_dictionary = lal.CreateDict()
+    lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
+        waveform_dictionary, lambda_1)
+    lalsim_SimInspiralWaveformParamsInsertTidalLambda2(
+        waveform_dictionary, lambda_2)
+
+    iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z = bilby_to_lalsimulation_spins(
+        theta_jn=theta_jn, phi_jl=phi_jl, tilt_1=tilt_1, tilt_2=tilt_2,
+        phi_12=phi_12, a_1=a_1, a_2=a_2, mass_1=mass_1, mass_2=mass_2,
+        reference_frequency=reference_frequency, phase=phase)
+
+    try:
+        h_plus, h_cross = lalsim_SimInspiralChooseFDWaveformSequence(
+            phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y,
+            spin_2z, reference_frequency, luminosity_distance, iota,
+            waveform_dictionary, approximant, frequency_bin_edges)
+    except Exception as e:
+        if not waveform_kwargs['catch_waveform_errors']:
+            raise
+        logger.warning("Evaluating the waveform failed with error: {}\n".format(e) +
+                       "Likelihood will be set to -inf.")
+        return None
+
+    return dict(plus=h_plus.data.data, cross=h_cross.data.data)
+
+
 def roq(
         frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
         phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, **waveform_arguments):
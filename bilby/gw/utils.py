@@ -1,6 +1,7 @@
 from __future__ import division
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from math import fmod
 
 import numpy as np
@@ -65,6 +66,87 @@ def psd_from_freq_series(freq_data, df):
     return np.power(asd_from_freq_series(freq_data, df), 2)
 
 
+# Rate of change of the Greenwich mean sidereal time in rad/s
+sidereal_rate = 2 * np.pi * 1.00273790935 / 86400
+
+# Whether the most recent sidereal time and wave-frame are reused between
+# calls, see `enable_antenna_pattern_cache`.
+_use_antenna_pattern_cache = False
+
+# Maximum offset in seconds from a previous call for which the Greenwich mean
+# sidereal time is extrapolated rather than recomputed with lal, when the
+# cache is enabled.
+gmst_reuse_window = 1e-6
+
+# The most recent evaluations are stored as a single (key, value) tuple so
+# that they are replaced atomically
+_gmst_cache = dict(last=(None, None))
+_polarization_tensor_cache = dict(last=(None, None))
+
+
+def enable_antenna_pattern_cache(reuse_window=1e-6):
+    """
+    Reuse the sidereal time and polarization tensors between calls
+
+    When enabled, the most recent wave-frame and the polarization tensors
+    computed from it are stored, so that repeated calls for the same source,
+    e.g., for each mode and each interferometer in a network, do not repeat
+    the calculation. The Greenwich mean sidereal time is extrapolated from
+    the previous call to `lal.GreenwichMeanSiderealTime` for times within
+    `reuse_window` seconds of it.
+
+    Parameters
+    -------
+    reuse_window: float
+        Maximum time offset in seconds for which the sidereal time is
+        extrapolated rather than recomputed.
+
+    """
+    global _use_antenna_pattern_cache, gmst_reuse_window
+    _use_antenna_pattern_cache = True
+    gmst_reuse_window = reuse_window
+
+
+def disable_antenna_pattern_cache():
+    """ Stop reusing the sidereal time and polarization tensors between calls
+    and clear the stored values, see `enable_antenna_pattern_cache` """
+    global _use_antenna_pattern_cache
+    _use_antenna_pattern_cache = False
+    _gmst_cache['last'] = (None, None)
+    _polarization_tensor_cache['last'] = (None, None)
+
+
+def greenwich_mean_sidereal_time(time):
+    """
+    Calculate the Greenwich mean sidereal time for a GPS time
+
+    If `enable_antenna_pattern_cache` has been called, the value of the last
+    call to `lal.GreenwichMeanSiderealTime` is stored, for times within
+    `gmst_reuse_window` seconds of that time the result is extrapolated
+    linearly using the sidereal rotation rate of the Earth.
+
+    Parameters
+    -------
+    time: float
+        geocentric GPS time
+
+    Returns
+    -------
+    float: The Greenwich mean sidereal time in radians modulo 2 pi
+
+    """
+    time = float(time)
+    if not _use_antenna_pattern_cache:
+        return fmod(lal.GreenwichMeanSiderealTime(time), 2 * np.pi)
+    cached_time, cached_gmst = _gmst_cache['last']
+    if cached_time is not None and abs(time - cached_time) < gmst_reuse_window:
+        gmst = cached_gmst + sidereal_rate * (time - cached_time)
+    else:
+        gmst = lal.GreenwichMeanSiderealTime(time)
+        _gmst_cache['last'] = (time, gmst)
+    return fmod(gmst, 2 * np.pi)
+
+
 def time_delay_geocentric(detector1, detector2, ra, dec, time):
     """
     Calculate time delay between two detectors in geocentric coordinates based on XLALArrivaTimeDiff in TimeDelay.c
@@ -88,7 +170,7 @@ def time_delay_geocentric(detector1, detector2, ra, dec, time):
     float: Time delay between the two detectors in the geocentric frame
 
     """
-    gmst = fmod(lal.GreenwichMeanSiderealTime(time), 2 * np.pi)
+    gmst = greenwich_mean_sidereal_time(time)
     theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
     omega = np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)])
     delta_d = detector2 - detector1
@@ -121,28 +203,196 @@ def get_polarization_tensor(ra, dec, time, psi, mode):
     array_like: A 3x3 representation of the polarization_tensor for the specified mode.
 
     """
-    gmst = fmod(lal.GreenwichMeanSiderealTime(time), 2 * np.pi)
-    theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
-    u = np.array([np.cos(phi) * np.cos(theta), np.cos(theta) * np.sin(phi), -np.sin(theta)])
-    v = np.array([-np.sin(phi), np.cos(phi), 0])
+    gmst = greenwich_mean_sidereal_time(time)
+    wave_frame = _get_wave_frame(ra, dec, gmst, psi)
+    mode = mode.lower()
+    if mode not in wave_frame['tensors']:
+        wave_frame['tensors'][mode] = _polarization_tensor_from_wave_frame(
+            wave_frame['m'], wave_frame['n'], mode)
+    return wave_frame['tensors'][mode].copy()
+
+
+def _get_wave_frame(ra, dec, gmst, psi):
+    """
+    Get the wave-frame basis vectors for a sky location and polarisation
+
+    If `enable_antenna_pattern_cache` has been called, the most recent
+    wave-frame is returned again for the same arguments, together with the
+    polarization tensors already computed from it. The returned dictionary
+    is shared, callers must not modify the arrays in it.
+
+    Parameters
+    -------
+    ra: float
+        right ascension in radians
+    dec: float
+        declination in radians
+    gmst: float
+        Greenwich mean sidereal time in radians
+    psi: float
+        binary polarisation angle counter-clockwise about the direction of propagation
+
+    Returns
+    -------
+    dict: The basis vectors `m` and `n` and a dictionary of polarization
+        tensors computed from them.
+
+    """
+    key = (ra, dec, gmst, psi)
+    cached_key, wave_frame = _polarization_tensor_cache['last']
+    if not _use_antenna_pattern_cache or key != cached_key:
+        theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
+        u = np.array([np.cos(phi) * np.cos(theta), np.cos(theta) * np.sin(phi), -np.sin(theta)])
+        v = np.array([-np.sin(phi), np.cos(phi), 0])
+        m = -u * np.sin(psi) - v * np.cos(psi)
+        n = -u * np.cos(psi) + v * np.sin(psi)
+        wave_frame = dict(m=m, n=n, tensors=dict())
+        if _use_antenna_pattern_cache:
+            _polarization_tensor_cache['last'] = (key, wave_frame)
+    return wave_frame
+
+
+def _polarization_tensor_from_wave_frame(m, n, mode):
+    if mode == 'plus':
+        return np.einsum('i,j->ij', m, m) - np.einsum('i,j->ij', n, n)
+    elif mode == 'cross':
+        return np.einsum('i,j->ij', m, n) + np.einsum('i,j->ij', n, m)
+    elif mode == 'breathing':
+        return np.einsum('i,j->ij', m, m) + np.einsum('i,j->ij', n, n)
+
+    # Calculating omega here to avoid calculation when model in [plus, cross, breathing]
+    omega = np.cross(m, n)
+    if mode == 'longitudinal':
+        return np.einsum('i,j->ij', omega, omega)
+    elif mode == 'x':
+        return np.einsum('i,j->ij', m, omega) + np.einsum('i,j->ij', omega, m)
+    elif mode == 'y':
+        return np.einsum('i,j->ij', n, omega) + np.einsum('i,j->ij', omega, n)
+    else:
+        raise ValueError("{} not a polarization mode!".format(mode))
+
+
+def get_polarization_tensor_multiple_modes(ra, dec, time, psi, modes):
+    """
+    Calculate the polarization tensors for several modes at once
+
+    This shares the wave-frame and sidereal time between all the modes, see
+    `get_polarization_tensor`.
+
+    Parameters
+    -------
+    ra: float
+        right ascension in radians
+    dec: float
+        declination in radians
+    time: float
+        geocentric GPS time
+    psi: float
+        binary polarisation angle counter-clockwise about the direction of propagation
+    modes: list
+        polarisation modes
+
+    Returns
+    -------
+    list: 3x3 representations of the polarization tensors for the specified modes.
+
+    """
+    return [get_polarization_tensor(ra, dec, time, psi, mode) for mode in modes]
+
+
+def greenwich_mean_sidereal_time_array(time):
+    """
+    Calculate the Greenwich mean sidereal time for an array of GPS times
+
+    Parameters
+    -------
+    time: array_like
+        geocentric GPS times
+
+    Returns
+    -------
+    array_like: The Greenwich mean sidereal times in radians modulo 2 pi
+
+    """
+    return np.array([greenwich_mean_sidereal_time(tt) for tt in np.atleast_1d(time)])
+
+
+def time_delay_geocentric_array(detector1, detector2, ra, dec, time):
+    """
+    Calculate the time delay between two detectors for arrays of sky
+    positions and times. This is the vectorized equivalent of
+    `time_delay_geocentric`.
+
+    Parameters
+    -------
+    detector1: array_like
+        Cartesian coordinate vector for the first detector in the geocentric frame
+    detector2: array_like
+        Cartesian coordinate vector for the second detector in the geocentric frame
+    ra: array_like
+        Right ascensions of the source in radians
+    dec: array_like
+        Declinations of the source in radians
+    time: array_like
+        GPS times in the geocentric frame
+
+    Returns
+    -------
+    array_like: Time delays between the two detectors in the geocentric frame
+
+    """
+    gmst = greenwich_mean_sidereal_time_array(time)
+    theta, phi = ra_dec_to_theta_phi(np.atleast_1d(ra), np.atleast_1d(dec), gmst)
+    omega = np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)])
+    delta_d = detector2 - detector1
+    return np.dot(delta_d, omega) / speed_of_light
+
+
+def get_polarization_tensor_array(ra, dec, time, psi, mode):
+    """
+    Calculate the polarization tensors for arrays of sky locations and times.
+    This is the vectorized equivalent of `get_polarization_tensor`.
+
+    Parameters
+    -------
+    ra: array_like
+        right ascensions in radians
+    dec: array_like
+        declinations in radians
+    time: array_like
+        geocentric GPS times
+    psi: array_like
+        binary polarisation angles counter-clockwise about the direction of propagation
+    mode: str
+        polarisation mode
+
+    Returns
+    -------
+    array_like: An (N, 3, 3) array of polarization tensors for the specified mode.
+
+    """
+    gmst = greenwich_mean_sidereal_time_array(time)
+    theta, phi = ra_dec_to_theta_phi(np.atleast_1d(ra), np.atleast_1d(dec), gmst)
+    psi = np.atleast_1d(psi)[:, np.newaxis]
+    u = np.array([np.cos(phi) * np.cos(theta), np.cos(theta) * np.sin(phi), -np.sin(theta)]).T
+    v = np.array([-np.sin(phi), np.cos(phi), np.zeros_like(phi)]).T
     m = -u * np.sin(psi) - v * np.cos(psi)
     n = -u * np.cos(psi) + v * np.sin(psi)
 
     if mode.lower() == 'plus':
-        return np.einsum('i,j->ij', m, m) - np.einsum('i,j->ij', n, n)
+        return np.einsum('ni,nj->nij', m, m) - np.einsum('ni,nj->nij', n, n)
     elif mode.lower() == 'cross':
-        return np.einsum('i,j->ij', m, n) + np.einsum('i,j->ij', n, m)
+        return np.einsum('ni,nj->nij', m, n) + np.einsum('ni,nj->nij', n, m)
     elif mode.lower() == 'breathing':
-        return np.einsum('i,j->ij', m, m) + np.einsum('i,j->ij', n, n)
+        return np.einsum('ni,nj->nij', m, m) + np.einsum('ni,nj->nij', n, n)
 
-    # Calculating omega here to avoid calculation when model in [plus, cross, breathing]
     omega = np.cross(m, n)
     if mode.lower() == 'longitudinal':
-        return np.einsum('i,j->ij', omega, omega)
+        return np.einsum('ni,nj->nij', omega, omega)
     elif mode.lower() == 'x':
-        return np.einsum('i,j->ij', m, omega) + np.einsum('i,j->ij', omega, m)
+        return np.einsum('ni,nj->nij', m, omega) + np.einsum('ni,nj->nij', omega, m)
     elif mode.lower() == 'y':
-        return np.einsum('i,j->ij', n, omega) + np.einsum('i,j->ij', omega, n)
+        return np.einsum('ni,nj->nij', n, omega) + np.einsum('ni,nj->nij', omega, n)
     else:
         raise ValueError("{} not a polarization mode!".format(mode))
 
@@ -589,6 +839,65 @@ def build_roq_weights(data, basis, deltaF):
     return weights
 
 
+def build_roq_time_shifted_weights(
+        data, frequencies, time_samples, basis, deltaF,
+        max_elements=int(2 ** 22), n_threads=1):
+    """
+    Compute the linear roq weights for a grid of time shifts
+
+    The time-shifted data are built in chunks of time samples, each chunk is
+    immediately multiplied by the basis so the full (time x frequency)
+    matrix is never stored. Chunks are distributed over a pool of threads.
+
+    Parameters
+    ----------
+    data: array-like
+        The whitened data, i.e., the data divided by the power spectral
+        density, at `frequencies`.
+    frequencies: array-like
+        The frequencies of the data and basis
+    time_samples: array-like
+        The time shifts at which to compute the weights
+    basis: array-like
+        The (frequency x basis element) reduced basis, this is complex
+        conjugated.
+    deltaF: float
+        Integration element df
+    max_elements: int
+        Maximum number of elements of the time-shifted data in each chunk,
+        the peak memory usage is set by `max_elements * n_threads`.
+    n_threads: int
+        The number of threads to use
+
+    Return
+    ------
+    weights: array-like
+        The (time x basis element) weights
+    """
+    time_samples = np.asarray(time_samples)
+    conjugate_basis = np.conjugate(basis)
+    n_times = len(time_samples)
+    weights = np.empty((n_times, conjugate_basis.shape[1]),
+                       dtype=np.result_type(data, conjugate_basis, complex))
+    chunk_size = max(1, max_elements // len(frequencies))
+    phase_factor = 2j * np.pi * frequencies
+
+    def build_chunk(start):
+        chunk = slice(start, min(start + chunk_size, n_times))
+        shifted_data = data * np.exp(
+            np.outer(time_samples[chunk], phase_factor))
+        weights[chunk] = np.dot(shifted_data, conjugate_basis) * deltaF * 4.
+
+    starts = range(0, n_times, chunk_size)
+    if n_threads > 1:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(build_chunk, starts))
+    else:
+        for start in starts:
+            build_chunk(start)
+    return weights
+
+
 def blockwise_dot_product(matrix_a, matrix_b, max_elements=int(2 ** 27),
                           out=None):
     """
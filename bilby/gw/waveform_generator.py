@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import numpy as np
 
 from ..core import utils
@@ -16,7 +18,7 @@ class WaveformGenerator(object):
     def __init__(self, duration=None, sampling_frequency=None, start_time=0, frequency_domain_source_model=None,
                  time_domain_source_model=None, parameters=None,
                  parameter_conversion=None,
-                 waveform_arguments=None):
+                 waveform_arguments=None, cache_size=1, cache_memory=None):
         """ A waveform generator
 
     Parameters
@@ -48,6 +50,13 @@ class WaveformGenerator(object):
         Note: the arguments of frequency_domain_source_model (except the first,
         which is the frequencies at which to compute the strain) will be added to
         the WaveformGenerator object and initialised to `None`.
+    cache_size: int, optional
+        The maximum number of waveforms to cache, the least recently used
+        waveform is discarded first. Default is 1, i.e., only the most
+        recent waveform is cached.
+    cache_memory: int, optional
+        The maximum memory in bytes used by the cached waveforms. If None,
+        the cache is only limited by `cache_size`.
 
         """
         self._times_and_frequencies = CoupledTimeAndFrequencySeries(duration=duration,
@@ -66,7 +75,9 @@ class WaveformGenerator(object):
             self.waveform_arguments = dict()
         if isinstance(parameters, dict):
             self.parameters = parameters
-        self._cache = dict(parameters=None, waveform=None, model=None)
+        self.cache_size = cache_size
+        self.cache_memory = cache_memory
+        self.clear_cache()
 
     def __repr__(self):
         if self.frequency_domain_source_model is not None:
@@ -152,9 +163,12 @@ class WaveformGenerator(object):
                           transformed_model_data_points, parameters):
         if parameters is not None:
             self.parameters = parameters
-        if self.parameters == self._cache['parameters'] and self._cache['model'] == model and \
-                self._cache['transformed_model'] == transformed_model:
-            return self._cache['waveform']
+        key = self._cache_key(model, transformed_model)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]['waveform']
+        self.cache_misses += 1
         if model is not None:
             model_strain = self._strain_from_model(model_data_points, model)
         elif transformed_model is not None:
@@ -162,12 +176,53 @@ class WaveformGenerator(object):
                                                                transformation_function)
         else:
             raise RuntimeError("No source model given")
-        self._cache['waveform'] = model_strain
-        self._cache['parameters'] = self.parameters.copy()
-        self._cache['model'] = model
-        self._cache['transformed_model'] = transformed_model
+        self._add_to_cache(key, model_strain)
         return model_strain
 
+    def clear_cache(self):
+        """ Remove all waveforms from the cache and reset the hit and miss
+        counters """
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def cache_info(self):
+        """ A dictionary of the cache hits, misses, current size and memory
+        usage in bytes """
+        return dict(hits=self.cache_hits, misses=self.cache_misses,
+                    size=len(self._cache), maxsize=self.cache_size,
+                    memory=self._cache_bytes, maxmemory=self.cache_memory)
+
+    def _cache_key(self, model, transformed_model):
+        """ A hashable key identifying the current parameters and models
+
+        Arrays are identified by their id, the parameters stored alongside
+        the cached waveform keep these arrays alive, so ids cannot be reused
+        while the entry is cached.
+        """
+        parameters = tuple(sorted(
+            (key, _hashable(value)) for key, value in self.parameters.items()))
+        return (model, transformed_model, self.duration,
+                self.sampling_frequency, self.start_time, parameters)
+
+    def _add_to_cache(self, key, waveform):
+        if self.cache_size < 1:
+            return
+        nbytes = _waveform_nbytes(waveform)
+        if self.cache_memory is not None and nbytes > self.cache_memory:
+            return
+        self._cache[key] = dict(
+            waveform=waveform, parameters=self.parameters.copy(),
+            nbytes=nbytes)
+        self._cache_bytes += nbytes
+        while len(self._cache) > self.cache_size or (
+                self.cache_memory is not None and
+                self._cache_bytes > self.cache_memory):
+            _, entry = self._cache.popitem(last=False)
+            self._cache_bytes -= entry['nbytes']
+
     def _strain_from_model(self, model_data_points, model):
         return model(model_data_points, **self.parameters)
 
@@ -239,5 +294,27 @@ class WaveformGenerator(object):
         return set(utils.infer_parameters_from_function(model))
 
 
+def _hashable(value):
+    """ Convert a parameter value to a hashable object for the cache key """
+    if isinstance(value, np.ndarray):
+        return ('ndarray', id(value))
+    elif isinstance(value, dict):
+        return tuple(sorted((key, _hashable(val)) for key, val in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_hashable(val) for val in value)
+    try:
+        hash(value)
+    except TypeError:
+        return ('object', id(value))
+    return value
+
+
+def _waveform_nbytes(waveform):
+    """ The memory used by the arrays in a (possibly nested) waveform """
+    if isinstance(waveform, dict):
+        return sum(_waveform_nbytes(value) for value in waveform.values())
+    return getattr(waveform, 'nbytes', 0)
+
+
 def _default_parameter_conversion(parmeters):
     return parmeters, list()
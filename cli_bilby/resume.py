@@ -11,7 +11,8 @@ def setup_command_line_args():
     parser = argparse.ArgumentParser(
         description=__doc__)
     parser.add_argument(
-        "resume_files", nargs='+', help="List of resume files")
+        "resume_files", nargs='+',
+        help="List of resume files or dynesty checkpoint directories")
     parser.add_argument(
         "-f", '--format', default="json", help="Output format, defaults to json",
         choices=["json", "hdf5", "dat"])
@@ -20,7 +21,12 @@ def setup_command_line_args():
 
 
 def check_file(resume_file):
-    """ Verify the file exists and is a resume file """
+    """ Verify the file exists and is a resume file or checkpoint directory """
+    if os.path.isdir(resume_file):
+        if not os.path.isfile(os.path.join(resume_file, "live_state.pickle")):
+            raise ValueError(
+                "Directory {} is not a checkpoint directory".format(resume_file))
+        return
     if "resume.pickle" not in resume_file:
         raise ValueError("File {} is not a resume file".format(resume_file))
     if os.path.isfile(resume_file) is False:
@@ -29,7 +35,10 @@ def check_file(resume_file):
 
 def get_outdir_and_label(resume_file):
     """ Infer the appropriate outdir and label from the resume file name """
+    resume_file = os.path.normpath(resume_file)
     label = os.path.basename(resume_file).replace("_resume.pickle", "")
+    if label.endswith("_resume"):
+        label = label[:-len("_resume")]
     outdir = os.path.dirname(resume_file)
     return outdir, label
 
@@ -65,9 +74,30 @@ def read_in_pickle_file(resume_file):
     return df
 
 
+def read_in_checkpoint_directory(directory):
+    """ Read in a dynesty checkpoint directory
+
+    Parameters
+    ----------
+    directory: str
+        Input checkpoint directory path, `{outdir}/{label}_resume`
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        A data frame of the posterior
+
+    """
+    data = bilby.core.sampler.dynesty.read_dynesty_checkpoint(
+        directory, posterior=True)
+    if data is None or "posterior" not in data:
+        raise ValueError("Checkpoint has no posterior, unable to convert")
+    return pd.DataFrame(data["posterior"], columns=data["search_parameter_keys"])
+
+
 def convert_df_to_posterior_samples(df, resume_file):
-    filename = resume_file.replace("pickle", "dat")
-    filename = filename.replace("resume", "preresult")
+    outdir, label = get_outdir_and_label(resume_file)
+    filename = os.path.join(outdir, "{}_preresult.dat".format(label))
     df.to_csv(filename, index=False, header=True, sep=' ')
 
 
@@ -85,7 +115,10 @@ def convert_df_to_preresult(df, format, resume_file):
 def convert_resume(resume_file, args):
     check_file(resume_file)
     print("Converting file {} to {}".format(resume_file, args.format))
-    df = read_in_pickle_file(resume_file)
+    if os.path.isdir(resume_file):
+        df = read_in_checkpoint_directory(resume_file)
+    else:
+        df = read_in_pickle_file(resume_file)
     if args.format == "dat":
         convert_df_to_posterior_samples(df, resume_file)
     elif args.format in ["json", "hdf5"]:
@@ -50,6 +50,16 @@ class TestCubicSpline(unittest.TestCase):
                                                        **self.parameters)
         assert np.alltrue(cal_factor.real == np.ones_like(frequency_array))
 
+    def test_calibration_factor_array(self):
+        frequency_array = np.linspace(20, 1024, 1000)
+        parameters = {key: np.random.normal(0, 0.1, 3) for key in self.parameters}
+        cal_factor = self.model.get_calibration_factor(frequency_array,
+                                                       **parameters)
+        self.assertEqual(cal_factor.shape, (3, len(frequency_array)))
+        single = self.model.get_calibration_factor(
+            frequency_array, **{key: parameters[key][1] for key in parameters})
+        self.assertTrue(np.allclose(cal_factor[1], single))
+
     def test_repr(self):
         expected = 'CubicSpline(prefix=\'{}\', minimum_frequency={}, maximum_frequency={}, n_points={})'\
             .format(self.prefix, self.minimum_frequency, self.maximum_frequency, self.n_points)
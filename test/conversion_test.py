@@ -3,6 +3,7 @@ import unittest
 import mock
 
 import numpy as np
+import pandas as pd
 
 import bilby
 from bilby.gw import conversion
@@ -295,6 +296,71 @@ class TestGenerateAllParameters(unittest.TestCase):
             self.assertIn(key, new_parameters)
 
 
+class TestParallelPostProcessing(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.parameters = dict(
+            mass_1=36., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.5, tilt_2=1.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=2000., theta_jn=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        interferometers = bilby.gw.detector.InterferometerList(['H1'])
+        interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=512, duration=4,
+            start_time=self.parameters['geocent_time'] - 3)
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=4, sampling_frequency=512,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        priors = bilby.gw.prior.BBHPriorDict()
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=interferometers,
+            waveform_generator=waveform_generator, priors=priors,
+            phase_marginalization=True)
+        self.samples = pd.DataFrame(
+            {key: self.parameters[key] * np.ones(150) for key in self.parameters})
+        self.samples['mass_1'] += np.linspace(0, 1, 150)
+
+    def tearDown(self):
+        del self.parameters
+        del self.likelihood
+        del self.samples
+
+    def test_compute_snrs_parallel_matches_serial(self):
+        serial = self.samples.copy()
+        conversion.compute_snrs(serial, self.likelihood)
+        parallel = self.samples.copy()
+        conversion.compute_snrs(parallel, self.likelihood, npool=2)
+        for key in ['H1_optimal_snr', 'H1_matched_filter_snr']:
+            self.assertTrue(np.allclose(serial[key], parallel[key]))
+
+    def test_reconstruction_independent_of_npool(self):
+        outputs = list()
+        for npool in [1, 2, 3]:
+            np.random.seed(10)
+            outputs.append(
+                conversion.generate_posterior_samples_from_marginalized_likelihood(
+                    self.samples.copy(), self.likelihood, npool=npool))
+        for output in outputs[1:]:
+            self.assertTrue(np.array_equal(outputs[0]['phase'], output['phase']))
+        self.assertEqual(len(np.unique(outputs[0]['phase'])), len(self.samples))
+
+    def test_compute_snrs_does_not_use_random_state(self):
+        state = np.random.get_state()
+        conversion.compute_snrs(self.samples.copy(), self.likelihood)
+        self.assertTrue(np.array_equal(state[1], np.random.get_state()[1]))
+        self.assertEqual(state[2], np.random.get_state()[2])
+
+    def test_reconstruction_does_not_reseed_random_state(self):
+        np.random.seed(10)
+        np.random.randint(2 ** 31 - 1)
+        expected = np.random.uniform(0, 1, 5)
+        np.random.seed(10)
+        conversion.generate_posterior_samples_from_marginalized_likelihood(
+            self.samples.copy(), self.likelihood)
+        self.assertTrue(np.array_equal(expected, np.random.uniform(0, 1, 5)))
+
+
 class TestDistanceTransformations(unittest.TestCase):
 
     def setUp(self):
@@ -315,6 +381,63 @@ class TestDistanceTransformations(unittest.TestCase):
         dl = conversion.luminosity_distance_to_comoving_distance(dc, cosmology='WMAP9')
         self.assertAlmostEqual(max(abs(dl - self.distances)), 0, 4)
 
+    def test_luminosity_redshift_default_cosmology(self):
+        z = conversion.luminosity_distance_to_redshift(self.distances)
+        dl = conversion.redshift_to_luminosity_distance(z)
+        self.assertAlmostEqual(max(abs(dl - self.distances)), 0, 4)
+
+    def test_luminosity_redshift_matches_z_at_value(self):
+        from astropy import units
+        from astropy.cosmology import z_at_value
+        cosmology = bilby.gw.cosmology.get_cosmology()
+        distances = np.array([0, 10, 1e3, 1e5])
+        expected = [0] + [
+            float(z_at_value(cosmology.luminosity_distance, distance * units.Mpc))
+            for distance in distances[1:]]
+        z = conversion.luminosity_distance_to_redshift(distances)
+        self.assertTrue(np.allclose(z, expected, rtol=1e-6, atol=0))
+
+    def test_redshift_scalar_input(self):
+        z = conversion.comoving_distance_to_redshift(100.)
+        self.assertEqual(np.ndim(z), 0)
+
+
+class TestTransformPrecessingSpins(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(10)
+        n_samples = 100
+        self.arguments = dict(
+            theta_jn=np.random.uniform(0, np.pi, n_samples),
+            phi_jl=np.random.uniform(0, 2 * np.pi, n_samples),
+            tilt_1=np.random.uniform(0, np.pi, n_samples),
+            tilt_2=np.random.uniform(0, np.pi, n_samples),
+            phi_12=np.random.uniform(0, 2 * np.pi, n_samples),
+            a_1=np.random.uniform(0, 0.99, n_samples),
+            a_2=np.random.uniform(0, 0.99, n_samples),
+            mass_1=np.random.uniform(5, 100, n_samples) * bilby.core.utils.solar_mass,
+            mass_2=np.random.uniform(5, 100, n_samples) * bilby.core.utils.solar_mass,
+            reference_frequency=20 * np.ones(n_samples),
+            phase=np.random.uniform(0, 2 * np.pi, n_samples))
+        self.arguments['a_1'][:5] = 0
+        self.arguments['tilt_2'][5:10] = np.pi
+
+    def test_matches_lalsimulation(self):
+        transformed = np.array(
+            conversion.transform_precessing_spins(**self.arguments))
+        expected = np.array([
+            bilby.gw.utils.lalsim_SimInspiralTransformPrecessingNewInitialConditions(
+                *arguments) for arguments in zip(*self.arguments.values())]).T
+        self.assertLess(np.max(abs(transformed - expected)), 1e-10)
+
+    def test_bilby_to_lalsimulation_spins_scalar_matches_array(self):
+        transformed = np.array(
+            conversion.bilby_to_lalsimulation_spins(**self.arguments))
+        single = np.array(conversion.bilby_to_lalsimulation_spins(
+            **{key: self.arguments[key][0] for key in self.arguments}))
+        self.assertEqual(transformed.shape, (7, 100))
+        self.assertLess(np.max(abs(transformed[:, 0] - single)), 1e-10)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -319,6 +319,14 @@ class TestInterferometer(unittest.TestCase):
             m.return_value = np.ones((3, 3))
             self.assertAlmostEqual(self.ifo.antenna_response(234, 52, 54, 76, 'plus'), self.ifo.detector_tensor.sum())
 
+    def test_antenna_response_multiple_modes(self):
+        response = self.ifo.antenna_response_multiple_modes(
+            1.2, 0.3, 1126259642.413, 0.5, ['plus', 'cross'])
+        for mode in ['plus', 'cross']:
+            self.assertEqual(
+                response[mode],
+                self.ifo.antenna_response(1.2, 0.3, 1126259642.413, 0.5, mode))
+
     def test_get_detector_response_default_behaviour(self):
         self.ifo.antenna_response = MagicMock(return_value=1)
         self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
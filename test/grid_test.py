@@ -29,6 +29,13 @@ class MultiGaussian(bilby.Likelihood):
         return self.pdf.logpdf(x)
 
 
+class BatchMultiGaussian(MultiGaussian):
+
+    def log_likelihood_batch(self, parameters):
+        x = np.array([parameters["x{0}".format(i)] for i in range(self.dim)])
+        return self.pdf.logpdf(x.T)
+
+
 class TestGrid(unittest.TestCase):
 
     def setUp(self):
@@ -188,6 +195,53 @@ class TestGrid(unittest.TestCase):
         assert np.array_equal(grid.sample_points['x0'], x0s)
         assert np.array_equal(grid.sample_points['x1'], x1s)
 
+    def test_batch_likelihood(self):
+        grid = bilby.core.grid.Grid(
+            priors=self.priors, grid_size=self.grid_size, chunk_size=333,
+            likelihood=BatchMultiGaussian(self.mus, self.cov))
+        self.assertTrue(np.allclose(grid.ln_likelihood, self.grid.ln_likelihood))
+
+    def test_multiprocessing(self):
+        grid = bilby.core.grid.Grid(
+            priors=self.priors, grid_size=self.grid_size, chunk_size=1000,
+            likelihood=self.likelihood, npool=2)
+        self.assertTrue(np.array_equal(grid.ln_likelihood, self.grid.ln_likelihood))
+
+    def test_memory_mapped_likelihood(self):
+        filename = os.path.join('outdir', 'ln_likelihood.npy')
+        grid = bilby.core.grid.Grid(
+            priors=self.priors, grid_size=self.grid_size,
+            likelihood=self.likelihood, ln_likelihood_file=filename)
+        self.assertIsInstance(grid.ln_likelihood, np.memmap)
+        self.assertTrue(np.array_equal(np.load(filename), self.grid.ln_likelihood))
+        self.assertEqual(grid.ln_evidence, self.grid.ln_evidence)
+
+    def test_checkpoint_and_resume(self):
+        class InterruptedGaussian(MultiGaussian):
+            n_calls = 0
+
+            def log_likelihood(self):
+                self.n_calls += 1
+                if self.n_calls > 5000:
+                    raise KeyboardInterrupt
+                return super(InterruptedGaussian, self).log_likelihood()
+
+        kwargs = dict(priors=self.priors, grid_size=self.grid_size,
+                      label='checkpoint', outdir='outdir', chunk_size=1000,
+                      checkpoint=True, check_point_delta_t=0)
+        with self.assertRaises(KeyboardInterrupt):
+            bilby.core.grid.Grid(
+                likelihood=InterruptedGaussian(self.mus, self.cov), **kwargs)
+        completed = np.load(os.path.join(
+            'outdir', 'checkpoint_grid_checkpoint', 'completed.npy'))
+        self.assertEqual(np.sum(completed), 5000)
+
+        likelihood = InterruptedGaussian(self.mus, self.cov)
+        grid = bilby.core.grid.Grid(likelihood=likelihood, **kwargs)
+        self.assertEqual(likelihood.n_calls, self.grid_size ** 2 - 5000)
+        self.assertEqual(len(grid.chunk_times), 10)
+        self.assertTrue(np.array_equal(grid.ln_likelihood, self.grid.ln_likelihood))
+
     def test_save_and_load(self):
         filename = os.path.join('outdir', 'test_output.json')
 
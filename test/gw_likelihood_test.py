@@ -1,8 +1,10 @@
 from __future__ import division, absolute_import
 import unittest
 import os
+import shutil
 
 import numpy as np
+import pandas as pd
 import bilby
 from bilby.gw.likelihood import BilbyROQParamsRangeError
 
@@ -131,6 +133,36 @@ class TestGWTransient(unittest.TestCase):
         self.assertEqual(self.likelihood.log_likelihood_ratio(),
                          np.nan_to_num(-np.inf))
 
+    def test_log_likelihood_ratio_batch(self):
+        """Test the batch log likelihood ratio matches the single evaluation"""
+        samples = pd.DataFrame([self.parameters] * 3)
+        samples['mass_1'] = [30., 31., 32.]
+        samples['ra'] = [1.375, 1.5, 2.]
+        expected = list()
+        for ii in range(len(samples)):
+            self.likelihood.parameters.update(samples.iloc[ii].to_dict())
+            expected.append(self.likelihood.log_likelihood_ratio())
+        self.assertTrue(np.allclose(
+            expected, self.likelihood.log_likelihood_ratio_batch(samples)))
+
+    def test_log_likelihood_ratio_batch_from_array(self):
+        keys = ['mass_1', 'ra']
+        samples = np.array([[30., 1.375], [32., 2.]])
+        from_array = self.likelihood.log_likelihood_ratio_batch(samples, keys=keys)
+        from_dict = self.likelihood.log_likelihood_ratio_batch(
+            dict(mass_1=samples[:, 0], ra=samples[:, 1]))
+        self.assertTrue(np.array_equal(from_array, from_dict))
+
+    def test_log_likelihood_ratio_batch_array_requires_keys(self):
+        with self.assertRaises(ValueError):
+            self.likelihood.log_likelihood_ratio_batch(np.ones((2, 2)))
+
+    def test_log_likelihood_ratio_batch_waveform_is_none(self):
+        self.likelihood.waveform_generator.frequency_domain_strain = \
+            lambda x: None
+        log_l = self.likelihood.log_likelihood_ratio_batch(dict(mass_1=[30., 31.]))
+        self.assertTrue(np.all(log_l == np.nan_to_num(-np.inf)))
+
     def test_repr(self):
         expected = 'GravitationalWaveTransient(interferometers={},\n\twaveform_generator={},\n\t' \
                    'time_marginalization={}, distance_marginalization={}, phase_marginalization={}, ' \
@@ -530,6 +562,278 @@ class TestTimePhaseMarginalization(unittest.TestCase):
                                self.time_phase.log_likelihood_ratio(),
                                delta=0.5)
 
+    def test_log_likelihood_ratio_batch(self):
+        """
+        Test the batch evaluation matches the single evaluation when
+        marginalising over time and phase.
+        """
+        self.time_phase.parameters = self.parameters.copy()
+        samples = dict(mass_1=[30., 31.], time_jitter=[0., 1e-4])
+        expected = list()
+        for ii in range(2):
+            self.time_phase.parameters.update(
+                {key: samples[key][ii] for key in samples})
+            expected.append(self.time_phase.log_likelihood_ratio())
+        self.assertTrue(np.allclose(
+            expected, self.time_phase.log_likelihood_ratio_batch(samples)))
+
+    def test_generate_posterior_sample_batch(self):
+        """
+        Test the batch reconstruction draws times and phases from within the
+        prior and leaves the other parameters unchanged.
+        """
+        samples = pd.DataFrame(dict(
+            mass_1=[30., 31., 32.], time_jitter=[0., 1e-4, -1e-4]))
+        self.time_phase.parameters = self.parameters.copy()
+        self.time_phase.parameters.update(dict(
+            geocent_time=float(self.interferometers.start_time), phase=0.))
+        new_samples = \
+            self.time_phase.generate_posterior_sample_from_marginalized_likelihood_batch(
+                samples)
+        time_prior = self.time_phase.priors['geocent_time']
+        self.assertTrue(np.array_equal(new_samples['mass_1'], samples['mass_1']))
+        self.assertTrue(all(new_samples['geocent_time'] >= time_prior.minimum))
+        self.assertTrue(all(new_samples['geocent_time'] <= time_prior.maximum))
+        self.assertTrue(all(new_samples['phase'] >= 0))
+        self.assertTrue(all(new_samples['phase'] <= 2 * np.pi))
+        self.assertTrue(all(new_samples['luminosity_distance'] == 4000.))
+
+    def test_generate_posterior_sample_batch_matches_single(self):
+        """
+        Test the batch reconstruction of time, distance and phase draws from
+        the same distributions as the single sample reconstruction.
+        """
+        from scipy.stats import ks_2samp
+        likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            time_marginalization=True, distance_marginalization=True,
+            phase_marginalization=True, priors=self.time_phase.priors.copy())
+        n_samples = 200
+        parameters = self.parameters.copy()
+        parameters['time_jitter'] = 0.
+
+        np.random.seed(500)
+        single = list()
+        for _ in range(n_samples):
+            likelihood.parameters = parameters.copy()
+            single.append(
+                likelihood.generate_posterior_sample_from_marginalized_likelihood())
+        single = pd.DataFrame(single)
+
+        np.random.seed(500)
+        batch = likelihood.generate_posterior_sample_from_marginalized_likelihood_batch(
+            pd.DataFrame({key: [parameters[key]] * n_samples
+                          for key in parameters}))
+        for key in ['geocent_time', 'luminosity_distance', 'phase']:
+            self.assertGreater(ks_2samp(single[key], batch[key]).pvalue, 0.01)
+
+
+class TestSampleFromTabulatedDistributions(unittest.TestCase):
+
+    def test_matches_linear_distribution(self):
+        np.random.seed(500)
+        xx = np.linspace(0, 1, 11)
+        samples = bilby.gw.likelihood._sample_from_tabulated_distributions(
+            xx, np.tile(xx, (100000, 1)))
+        self.assertAlmostEqual(np.mean(samples), 2 / 3, 2)
+        self.assertTrue(all((samples >= 0) & (samples <= 1)))
+
+    def test_retained_points_match_interped(self):
+        xx = np.tile(np.linspace(0, 1, 21), (2, 1))
+        yy = np.tile(np.linspace(0, 1, 21) ** 2, (2, 1))
+        keep = np.ones(xx.shape, dtype=bool)
+        keep[0, 5:10] = False
+        keep[1, :3] = False
+        np.random.seed(500)
+        samples = bilby.gw.likelihood._sample_from_retained_points(
+            xx, yy, keep)
+        np.random.seed(500)
+        expected = [
+            bilby.core.prior.Interped(xx[ii, keep[ii]], yy[ii, keep[ii]]).sample()
+            for ii in range(2)]
+        self.assertTrue(np.allclose(expected, samples))
+
+    def test_zero_probability_raises(self):
+        with self.assertRaises(
+                bilby.core.likelihood.MarginalizedLikelihoodReconstructionError):
+            bilby.gw.likelihood._sample_from_tabulated_distributions(
+                np.linspace(0, 1, 11), np.zeros((2, 11)))
+
+
+class TestRelativeBinningLikelihood(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 2048
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., theta_jn=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        waveform_arguments = dict(
+            waveform_approximant='IMRPhenomPv2', reference_frequency=50.)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - 3)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+            waveform_arguments=waveform_arguments)
+        self.interferometers.inject_signal(
+            waveform_generator=self.waveform_generator,
+            parameters=self.parameters)
+        self.relative_binning_waveform_generator = \
+            bilby.gw.waveform_generator.WaveformGenerator(
+                duration=self.duration,
+                sampling_frequency=self.sampling_frequency,
+                frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_relative_binning,
+                waveform_arguments=waveform_arguments.copy())
+
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = bilby.prior.Uniform(
+            minimum=self.parameters['geocent_time'] - 0.1,
+            maximum=self.parameters['geocent_time'] + 0.1)
+
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.prior.copy()
+        )
+        self.relative_binning = \
+            bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.relative_binning_waveform_generator,
+                fiducial_parameters=self.parameters, priors=self.prior.copy(),
+                epsilon=0.05)
+
+    def tearDown(self):
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.relative_binning_waveform_generator
+        del self.prior
+        del self.likelihood
+        del self.relative_binning
+
+    def test_bins_span_frequency_band(self):
+        frequencies = self.relative_binning.bin_frequencies
+        self.assertEqual(frequencies[0], 20)
+        self.assertEqual(frequencies[-1], 1024)
+        self.assertEqual(len(frequencies), self.relative_binning.number_of_bins + 1)
+        self.assertTrue(all(np.diff(frequencies) > 0))
+
+    def test_fewer_bins_with_larger_epsilon(self):
+        likelihood = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.relative_binning_waveform_generator,
+            fiducial_parameters=self.parameters, epsilon=0.5)
+        self.assertLess(likelihood.number_of_bins,
+                        self.relative_binning.number_of_bins)
+
+    def test_matches_full_likelihood(self):
+        for mass_1 in [30.95, 31, 31.05]:
+            parameters = self.parameters.copy()
+            parameters['mass_1'] = mass_1
+            self.likelihood.parameters = parameters.copy()
+            self.relative_binning.parameters = parameters.copy()
+            self.assertAlmostEqual(
+                self.likelihood.log_likelihood_ratio(),
+                self.relative_binning.log_likelihood_ratio(), 1)
+
+    def test_matches_full_likelihood_full_resolution_model(self):
+        relative_binning = \
+            bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator,
+                fiducial_parameters=self.parameters, epsilon=0.05)
+        self.assertFalse(relative_binning.binned_waveform)
+        parameters = self.parameters.copy()
+        parameters['mass_1'] = 31.05
+        self.likelihood.parameters = parameters.copy()
+        relative_binning.parameters = parameters.copy()
+        self.assertAlmostEqual(
+            self.likelihood.log_likelihood_ratio(),
+            relative_binning.log_likelihood_ratio(), 1)
+
+    def test_time_phase_marginalization_matches_full_likelihood(self):
+        likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.prior.copy(), time_marginalization=True,
+            phase_marginalization=True)
+        relative_binning = \
+            bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.relative_binning_waveform_generator,
+                fiducial_parameters=self.parameters, priors=self.prior.copy(),
+                time_marginalization=True, phase_marginalization=True,
+                epsilon=0.05)
+        parameters = self.parameters.copy()
+        parameters['mass_1'] = 31.05
+        parameters['time_jitter'] = 0.
+        parameters.update({
+            key: value for key, value in relative_binning.priors.items()
+            if isinstance(value, float)})
+        likelihood.parameters = parameters.copy()
+        relative_binning.parameters = parameters.copy()
+        self.assertAlmostEqual(
+            likelihood.log_likelihood_ratio(),
+            relative_binning.log_likelihood_ratio(), 1)
+
+    def test_time_marginalized_inner_products_match_full_resolution(self):
+        relative_binning = \
+            bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.relative_binning_waveform_generator,
+                fiducial_parameters=self.parameters, priors=self.prior.copy(),
+                time_marginalization=True, epsilon=0.05)
+        parameters = self.parameters.copy()
+        parameters['mass_1'] = 31.05
+        parameters['geocent_time'] += 0.0123
+        interferometer = relative_binning.interferometers[0]
+        polarizations = self.relative_binning_waveform_generator.\
+            frequency_domain_strain(parameters)
+        relative_binning.parameters = parameters.copy()
+        snrs = relative_binning.calculate_snrs(polarizations, interferometer)
+
+        ratio = relative_binning.compute_waveform_ratio(
+            polarizations, interferometer,
+            dict(parameters, geocent_time=self.parameters['geocent_time']))
+        frequencies = interferometer.frequency_array
+        full_ratio = (
+            np.interp(frequencies, relative_binning.bin_frequencies,
+                      ratio.real, left=0, right=0) +
+            1j * np.interp(frequencies, relative_binning.bin_frequencies,
+                           ratio.imag, left=0, right=0))
+        signal = (
+            relative_binning.per_detector_fiducial_waveforms[interferometer.name] *
+            full_ratio * np.exp(-2j * np.pi * frequencies * 0.0123))
+        expected = 4 / self.duration * np.fft.fft(
+            signal[:-1] * interferometer.frequency_domain_strain.conj()[:-1] /
+            interferometer.power_spectral_density_array[:-1])
+        in_prior = self.prior['geocent_time'].prob(relative_binning._times) > 0
+        self.assertTrue(np.allclose(
+            snrs.d_inner_h_squared_tc_array[in_prior], expected[in_prior],
+            atol=1e-2))
+        self.assertAlmostEqual(
+            snrs.d_inner_h, interferometer.inner_product(signal), 2)
+
+    def test_log_likelihood_ratio_batch(self):
+        mass_1 = np.array([30.95, 31.05])
+        self.relative_binning.parameters = self.parameters.copy()
+        expected = list()
+        for value in mass_1:
+            self.relative_binning.parameters['mass_1'] = value
+            expected.append(self.relative_binning.log_likelihood_ratio())
+        self.relative_binning.parameters = self.parameters.copy()
+        self.assertTrue(np.allclose(
+            expected,
+            self.relative_binning.log_likelihood_ratio_batch(
+                pd.DataFrame(dict(mass_1=mass_1)))))
+        self.assertEqual(self.relative_binning.parameters['mass_1'], 31.)
+
 
 class TestROQLikelihood(unittest.TestCase):
 
@@ -742,6 +1046,76 @@ class TestROQLikelihood(unittest.TestCase):
                 priors=self.priors)
 
 
+class TestROQWeightsCache(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 2048
+        self.cache_directory = "roq_weights_cache"
+        self.ifos = bilby.gw.detector.InterferometerList(['H1'])
+        self.ifos.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration)
+        n_frequencies = sum(self.ifos[0].frequency_mask)
+        self.linear_matrix = (
+            np.random.normal(size=(n_frequencies, 5)) +
+            1j * np.random.normal(size=(n_frequencies, 5)))
+        self.quadratic_matrix = np.random.normal(size=(n_frequencies, 3))
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors['geocent_time'] = bilby.core.prior.Uniform(1.19, 1.21)
+        self.roq_wfg = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.roq,
+            waveform_arguments=dict(
+                frequency_nodes_linear=np.arange(5),
+                frequency_nodes_quadratic=np.arange(3),
+                reference_frequency=20., minimum_frequency=20.,
+                approximant='IMRPhenomPv2'))
+
+    def tearDown(self):
+        if os.path.isdir(self.cache_directory):
+            shutil.rmtree(self.cache_directory)
+        del self.ifos
+        del self.linear_matrix
+        del self.quadratic_matrix
+        del self.priors
+        del self.roq_wfg
+
+    def get_likelihood(self, **kwargs):
+        return bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=self.roq_wfg,
+            linear_matrix=self.linear_matrix,
+            quadratic_matrix=self.quadratic_matrix, priors=self.priors,
+            **kwargs)
+
+    def test_cached_weights_match(self):
+        expected = self.get_likelihood().weights
+        self.get_likelihood(weights_cache_directory=self.cache_directory)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
+        weights = self.get_likelihood(
+            weights_cache_directory=self.cache_directory).weights
+        self.assertEqual(sorted(expected.keys()), sorted(weights.keys()))
+        for key in expected:
+            self.assertIsInstance(weights[key], np.memmap)
+            self.assertTrue(np.array_equal(expected[key], weights[key]))
+
+    def test_cache_key_changes_with_data(self):
+        self.get_likelihood(weights_cache_directory=self.cache_directory)
+        self.ifos.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration)
+        self.get_likelihood(weights_cache_directory=self.cache_directory)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 2)
+
+    def test_save_and_load_npy(self):
+        likelihood = self.get_likelihood()
+        filename = os.path.join(self.cache_directory, "weights")
+        os.makedirs(self.cache_directory)
+        likelihood.save_weights(filename, format='npy')
+        weights = likelihood.load_weights(filename + ".npy")
+        for key in likelihood.weights:
+            self.assertTrue(np.array_equal(likelihood.weights[key], weights[key]))
+
+
 class TestRescaledROQLikelihood(unittest.TestCase):
 
     def test_rescaling(self):
@@ -64,6 +64,44 @@ class TestGWUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             gwutils.get_polarization_tensor(ra, dec, time, psi, 'not-a-mode')
 
+    def test_get_polarization_tensor_multiple_modes(self):
+        ra = 1
+        dec = 2.0
+        time = 10
+        psi = 0.1
+        modes = ['plus', 'cross', 'breathing', 'longitudinal', 'x', 'y']
+        tensors = gwutils.get_polarization_tensor_multiple_modes(
+            ra, dec, time, psi, modes)
+        for mode, tensor in zip(modes, tensors):
+            self.assertTrue(np.array_equal(
+                tensor, gwutils.get_polarization_tensor(ra, dec, time, psi, mode)))
+
+    def test_greenwich_mean_sidereal_time(self):
+        time = 1126259642.413
+        for offset in [0, 1e-6, 0.1, 0.5, 10]:
+            self.assertAlmostEqual(
+                gwutils.greenwich_mean_sidereal_time(time + offset),
+                np.fmod(lal.GreenwichMeanSiderealTime(time + offset), 2 * np.pi),
+                9)
+
+    def test_antenna_pattern_cache(self):
+        ra, dec, time, psi = 1, 0.5, 1126259642.413, 0.1
+        expected = gwutils.get_polarization_tensor(ra, dec, time, psi, 'plus')
+        gwutils.enable_antenna_pattern_cache()
+        try:
+            for offset in [0, 1e-7, 0.5]:
+                self.assertAlmostEqual(
+                    gwutils.greenwich_mean_sidereal_time(time + offset),
+                    np.fmod(lal.GreenwichMeanSiderealTime(time + offset),
+                            2 * np.pi), 12)
+            tensor = gwutils.get_polarization_tensor(ra, dec, time, psi, 'plus')
+            self.assertTrue(np.allclose(expected, tensor))
+            tensor[:] = 0
+            self.assertTrue(np.allclose(expected, gwutils.get_polarization_tensor(
+                ra, dec, time, psi, 'plus')))
+        finally:
+            gwutils.disable_antenna_pattern_cache()
+
     def test_inner_product(self):
         aa = np.array([1, 2, 3])
         bb = np.array([5, 6, 7])
@@ -186,5 +224,20 @@ class TestGWUtils(unittest.TestCase):
                 45., 0.1, 10, 0.01, 10, 1000, 20, None, 1.5)
 
 
+    def test_build_roq_time_shifted_weights(self):
+        data = np.random.normal(size=100) + 1j * np.random.normal(size=100)
+        frequencies = np.linspace(20, 100, 100)
+        time_samples = np.linspace(0, 0.1, 37)
+        basis = np.random.normal(size=(100, 6)) + 1j * np.random.normal(size=(100, 6))
+        expected = np.array([
+            gwutils.build_roq_weights(
+                data * np.exp(2j * np.pi * frequencies * time), basis, 0.25)
+            for time in time_samples])
+        for n_threads in [1, 3]:
+            weights = gwutils.build_roq_time_shifted_weights(
+                data, frequencies, time_samples, basis, 0.25,
+                max_elements=500, n_threads=n_threads)
+            self.assertTrue(np.allclose(expected, weights))
+
 if __name__ == '__main__':
     unittest.main()
@@ -281,6 +281,24 @@ class TestPriorClasses(unittest.TestCase):
             many_samples = prior.sample(1000)
             self.assertTrue(all((many_samples >= prior.minimum) & (many_samples <= prior.maximum)))
 
+    def test_sampling_with_generator(self):
+        """Test that sampling with a seeded generator is reproducible."""
+        for prior in self.priors:
+            if bilby.core.prior.JointPrior in prior.__class__.__mro__:
+                continue
+            samples = prior.sample(100, rng=np.random.default_rng(3))
+            self.assertTrue(np.array_equal(samples, prior.sample(100, rng=np.random.default_rng(3))))
+            self.assertTrue(all((samples >= prior.minimum) & (samples <= prior.maximum)))
+
+    def test_direct_sampling_distribution(self):
+        """Test that priors sampled without the inverse CDF follow their CDF."""
+        rng = np.random.default_rng(5)
+        for prior in [bilby.core.prior.Gaussian(mu=1, sigma=2),
+                      bilby.core.prior.Gamma(k=3, theta=2),
+                      bilby.core.prior.Beta(alpha=2, beta=5, minimum=1, maximum=3)]:
+            samples = prior.sample(10000, rng=rng)
+            self.assertGreater(ss.kstest(samples, prior.cdf).pvalue, 1e-3)
+
     def test_probability_above_domain(self):
         """Test that the prior probability is non-negative in domain of validity and zero outside."""
         for prior in self.priors:
@@ -455,6 +473,20 @@ class TestPriorClasses(unittest.TestCase):
         self.assertTrue(np.allclose(np.diag(mvg.covs[0]), np.square(sigma)))
         self.assertTrue(np.allclose(np.diag(np.fliplr(mvg.covs[0])), 2.*np.ones(2)))
 
+    def test_multivariate_gaussian_batch_rescale(self):
+        """Test that rescaling many points at once matches rescaling them one at a time"""
+        mvg = bilby.core.prior.MultivariateGaussianDist(
+            ['a', 'b'], nmodes=2, mus=[[0., 0.], [5., 5.]],
+            covs=[np.array([[1., 0.5], [0.5, 1.]]), np.array([[2., -0.5], [-0.5, 1.]])],
+            weights=[1., 3.])
+        values = np.random.uniform(0, 1, (100, 2))
+        modes = np.random.randint(0, 2, 100)
+        expected = np.array([mvg.rescale(value, mode=mode) for value, mode in zip(values, modes)])
+        self.assertTrue(np.allclose(expected, mvg.rescale(values, mode=modes)))
+        np.random.seed(5)
+        samples = mvg.rescale(np.full((10000, 2), 0.5))
+        self.assertAlmostEqual(np.mean(samples[:, 0] > 2.5), 0.75, 1)
+
     def test_fermidirac_fail(self):
         with self.assertRaises(ValueError):
             bilby.core.prior.FermiDirac(name='test', unit='unit', sigma=1.)
@@ -846,6 +878,16 @@ class TestPriorDict(unittest.TestCase):
         for key in samples1:
             self.assertTrue(np.array_equal(samples1[key], samples2[key]))
 
+    def test_sample_with_generator(self):
+        samples1 = self.prior_set_from_dict.sample(size=7, rng=np.random.default_rng(42))
+        samples2 = self.prior_set_from_dict.sample(size=7, rng=42)
+        for key in samples1:
+            self.assertTrue(np.array_equal(samples1[key], samples2[key]))
+        streams = [np.random.default_rng(seed) for seed in np.random.SeedSequence(42).spawn(2)]
+        self.assertFalse(np.array_equal(
+            self.prior_set_from_dict.sample(size=7, rng=streams[0])['mass'],
+            self.prior_set_from_dict.sample(size=7, rng=streams[1])['mass']))
+
     def test_prob(self):
         samples = self.prior_set_from_dict.sample_subset(keys=['mass', 'speed'])
         expected = self.first_prior.prob(samples['mass']) * self.second_prior.prob(samples['speed'])
@@ -864,11 +906,123 @@ class TestPriorDict(unittest.TestCase):
         self.assertListEqual(sorted(expected), sorted(self.prior_set_from_dict.rescale(
             keys=self.prior_set_from_dict.keys(), theta=theta)))
 
+    def test_ln_prob_array(self):
+        samples = self.prior_set_from_dict.sample_subset(keys=['mass', 'speed'], size=10)
+        samples['speed'][0] = 3
+        array = np.array([samples['mass'], samples['speed']]).T
+        expected = self.prior_set_from_dict.ln_prob(samples, axis=0)
+        self.assertTrue(np.array_equal(
+            expected, self.prior_set_from_dict.ln_prob_array(array, keys=['mass', 'speed'])))
+        self.assertEqual(-np.inf, expected[0])
+
+    def test_ln_prob_array_structured(self):
+        samples = self.prior_set_from_dict.sample_subset(keys=['mass', 'speed'], size=10)
+        array = np.array(list(zip(samples['mass'], samples['speed'])),
+                         dtype=[('mass', float), ('speed', float)])
+        self.assertTrue(np.array_equal(
+            self.prior_set_from_dict.ln_prob(samples, axis=0),
+            self.prior_set_from_dict.ln_prob_array(array)))
+
+    def test_ln_prob_array_with_constraints(self):
+        priors = bilby.core.prior.PriorDict(dict(
+            x=bilby.core.prior.Uniform(0, 1), y=bilby.core.prior.Uniform(0, 1),
+            z=bilby.core.prior.Constraint(0, 1)))
+        priors.conversion_function = lambda sample: dict(z=sample['x'] + sample['y'], **sample)
+        array = np.array([[0.2, 0.3], [0.7, 0.6], [1.5, 0.1]])
+        self.assertTrue(np.array_equal(
+            [0, -np.inf, -np.inf], priors.ln_prob_array(array, keys=['x', 'y'])))
+
+    def test_sample_subset_constrained(self):
+        priors = bilby.core.prior.PriorDict(dict(
+            x=bilby.core.prior.Uniform(0, 1), y=bilby.core.prior.Uniform(0, 1),
+            z=bilby.core.prior.Constraint(0, 0.2)))
+        priors.conversion_function = lambda sample: dict(z=sample['x'] * sample['y'], **sample)
+        samples = priors.sample_subset_constrained(keys=['x', 'y', 'z'], size=(10, 100))
+        self.assertEqual(['x', 'y'], sorted(samples.keys()))
+        self.assertEqual((10, 100), samples['x'].shape)
+        self.assertTrue(np.all(samples['x'] * samples['y'] < 0.2))
+        statistics = priors.constraint_sampling_statistics
+        self.assertGreaterEqual(statistics['n_accepted'], 1000)
+        self.assertAlmostEqual(
+            statistics['acceptance_fraction'], statistics['n_accepted'] / statistics['n_draws'])
+
+    def test_ln_prob_array_no_keys(self):
+        with self.assertRaises(ValueError):
+            self.prior_set_from_dict.ln_prob_array(np.zeros((10, 2)))
+
+    def test_compile_rescale(self):
+        keys = [key for key in self.prior_set_from_file
+                if not isinstance(self.prior_set_from_file[key], bilby.core.prior.Constraint)]
+        transform = self.prior_set_from_file.compile_rescale(keys)
+        theta = np.random.uniform(0, 1, (10, len(keys)))
+        expected = np.array([self.prior_set_from_file.rescale(keys, point) for point in theta])
+        self.assertTrue(np.allclose(expected, transform(theta)))
+        self.assertTrue(np.allclose(expected[0], transform(theta[0])))
+
+    def test_compile_rescale_joint_prior(self):
+        dist = bilby.core.prior.MultivariateGaussianDist(
+            names=['a', 'b'], mus=[[1, 2]], covs=[np.array([[2., 0.5], [0.5, 1.]])])
+        priors = bilby.core.prior.PriorDict(dict(
+            a=bilby.core.prior.MultivariateGaussian(dist=dist, name='a'),
+            c=bilby.core.prior.Uniform(minimum=0, maximum=1),
+            b=bilby.core.prior.MultivariateGaussian(dist=dist, name='b')))
+        transform = priors.compile_rescale(['b', 'c', 'a'])
+        theta = np.random.uniform(0, 1, (10, 3))
+        rescaled = transform(theta)
+        self.assertTrue(np.allclose(rescaled[:, [2, 0]], dist.rescale(theta[:, [2, 0]])))
+        self.assertTrue(np.allclose(rescaled[:, 1], theta[:, 1]))
+        self.assertTrue(np.allclose(rescaled[0], transform(theta[0])))
+        self.assertTrue(all(value is None for value in dist.rescale_parameters.values()))
+
+    def test_compile_rescale_invalid_unit_cube(self):
+        transform = self.prior_set_from_dict.compile_rescale(['mass', 'speed'])
+        with self.assertRaises(ValueError):
+            transform([0.5, 1.5])
+
     def test_redundancy(self):
         for key in self.prior_set_from_dict.keys():
             self.assertFalse(self.prior_set_from_dict.test_redundancy(key=key))
 
 
+class TestInterped(unittest.TestCase):
+
+    def setUp(self):
+        self.xx = np.linspace(0, 10, 1000)
+        self.yy = np.exp(-(self.xx - 5) ** 2)
+        self.prior = bilby.core.prior.Interped(xx=self.xx, yy=self.yy)
+
+    def tearDown(self):
+        del self.prior
+
+    def test_normalised(self):
+        self.assertAlmostEqual(1, np.trapz(self.prior.yy, self.prior.xx))
+        self.assertEqual(1, self.prior.YY[-1])
+
+    def test_rescale_inverts_cdf(self):
+        vals = np.linspace(1, 9, 100)
+        self.assertTrue(np.allclose(vals, self.prior.rescale(self.prior.cdf(vals))))
+
+    def test_changing_bounds_updates_distribution(self):
+        self.prior.minimum = 5
+        self.assertEqual(5, self.prior.xx[0])
+        self.assertEqual(0, self.prior.prob(4.9))
+        self.assertTrue(np.all(self.prior.sample(100) >= 5))
+        self.assertAlmostEqual(1, np.trapz(self.prior.yy, self.prior.xx))
+
+    def test_from_arrays(self):
+        priors = bilby.core.prior.Interped.from_arrays(
+            self.xx, [self.yy, self.yy ** 2], name='test')
+        self.assertEqual(2, len(priors))
+        self.assertEqual(self.prior, priors[0])
+        self.assertEqual('test', priors[1].name)
+        self.assertTrue(np.allclose(
+            self.yy ** 2 / np.trapz(self.yy ** 2, self.xx), priors[1].yy))
+
+    def test_inverse_cdf_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.prior.inverse_cumulative_distribution(1.5)
+
+
 class TestLoadPrior(unittest.TestCase):
     def test_load_prior_with_float(self):
         filename = os.path.join(os.path.dirname(os.path.realpath(__file__)),
@@ -884,6 +1038,28 @@ class TestLoadPrior(unittest.TestCase):
         prior = bilby.core.prior.PriorDict(filename)
         self.assertTrue(isinstance(prior['logA'], bilby.core.prior.Uniform))
 
+    def test_load_prior_cached(self):
+        filename = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                'prior_files/prior_with_floats.prior')
+        prior = bilby.core.prior.PriorDict(filename)
+        prior_again = bilby.core.prior.PriorDict(filename)
+        self.assertDictEqual(dict(prior), dict(prior_again))
+        self.assertIsNot(prior['mass_1'], prior_again['mass_1'])
+        prior['mass_1'].minimum = 7
+        self.assertNotEqual(7, bilby.core.prior.PriorDict(filename)['mass_1'].minimum)
+
+    def test_load_prior_modified_file(self):
+        filename = 'test_modified.prior'
+        with open(filename, 'w') as ff:
+            ff.write("a = Uniform(minimum=0, maximum=1)\n")
+        self.assertEqual(1, bilby.core.prior.PriorDict(filename)['a'].maximum)
+        with open(filename, 'w') as ff:
+            ff.write("a = Uniform(minimum=0, maximum=2, latex_label='$a,b$')\n")
+        prior = bilby.core.prior.PriorDict(filename)
+        os.remove(filename)
+        self.assertEqual(2, prior['a'].maximum)
+        self.assertEqual('$a,b$', prior['a'].latex_label)
+
 
 class TestFillPrior(unittest.TestCase):
 
@@ -1105,6 +1281,35 @@ class TestConditionalPriorDict(unittest.TestCase):
     def test_conditional_keys_setting_items(self):
         self.assertListEqual(['var_1', 'var_2', 'var_3'], self.conditional_priors_manually_set_items.conditional_keys)
 
+    def test_sorted_keys_updated_after_mutation(self):
+        del self.conditional_priors['var_1']
+        self.assertListEqual(['var_0'], self.conditional_priors.sorted_keys)
+        self.assertFalse(self.conditional_priors._resolved)
+        self.conditional_priors['var_1'] = self.prior_1
+        self.assertListEqual(['var_0', 'var_1', 'var_2', 'var_3'], self.conditional_priors.sorted_keys)
+        self.assertTrue(self.conditional_priors._resolved)
+
+    def test_cyclic_conditions_unresolved(self):
+        def condition_func_a(reference_parameters, b):
+            return reference_parameters
+
+        def condition_func_b(reference_parameters, a):
+            return reference_parameters
+
+        priors = bilby.core.prior.ConditionalPriorDict(dict(
+            a=bilby.core.prior.ConditionalUniform(condition_func=condition_func_a, minimum=0, maximum=1),
+            b=bilby.core.prior.ConditionalUniform(condition_func=condition_func_b, minimum=0, maximum=1),
+            c=bilby.core.prior.Uniform(minimum=0, maximum=1)))
+        self.assertFalse(priors._resolved)
+        self.assertListEqual(['c'], priors.sorted_keys)
+        self.assertListEqual(['c'], list(priors.sample_subset(keys=['c'])))
+
+    def test_sample_subset_sorted(self):
+        with mock.patch("numpy.random.uniform") as m:
+            m.return_value = 0.5
+            samples = self.conditional_priors.sample_subset(keys=['var_1', 'var_0'])
+        self.assertListEqual(['var_0', 'var_1'], list(samples))
+
     def test_prob(self):
         self.assertEqual(1, self.conditional_priors.prob(sample=self.test_sample))
 
@@ -1175,6 +1380,19 @@ class TestConditionalPriorDict(unittest.TestCase):
                                               theta=ref_variables)
         self.assertListEqual(ref_variables, res)
 
+    def test_compile_rescale(self):
+        def condition_func(reference_parameters, var_0):
+            return dict(minimum=reference_parameters['minimum'], maximum=var_0)
+
+        self.conditional_priors['var_1'] = bilby.core.prior.ConditionalUniform(
+            condition_func=condition_func, minimum=0, maximum=1)
+        keys = list(self.test_sample.keys())
+        transform = self.conditional_priors.compile_rescale(keys)
+        theta = np.random.uniform(0, 1, (10, len(keys)))
+        expected = np.array([self.conditional_priors.rescale(keys, point) for point in theta])
+        self.assertTrue(np.allclose(expected, transform(theta)))
+        self.assertTrue(np.allclose(expected[0], transform(theta[0])))
+
     def test_rescale_illegal_conditions(self):
         del self.conditional_priors['var_0']
         with self.assertRaises(bilby.core.prior.IllegalConditionsException):
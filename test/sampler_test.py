@@ -7,6 +7,7 @@ import numpy as np
 import os
 import shutil
 import copy
+import time
 
 
 class TestSampler(unittest.TestCase):
@@ -67,6 +68,17 @@ class TestSampler(unittest.TestCase):
         self.assertEqual(self.sampler.priors['a'].peak,
                          prior.DeltaFunction(peak=0).peak)
 
+    def test_prior_transform_frozen_during_run(self):
+        self.sampler.priors['c'] = prior.Uniform(0, 1)
+        self.assertEqual(0.5, self.sampler.prior_transform([0.5])[0])
+        self.sampler.priors['c'].maximum = 10
+        self.assertEqual(5, self.sampler.prior_transform([0.5])[0])
+        self.sampler.compile_prior_transform()
+        self.sampler.priors['c'].maximum = 2
+        self.assertEqual(5, self.sampler.prior_transform([0.5])[0])
+        self.sampler.release_prior_transform()
+        self.assertEqual(1, self.sampler.prior_transform([0.5])[0])
+
     def test_log_prior(self):
         self.assertEqual(self.sampler.log_prior({1}), 0.0)
 
@@ -129,6 +141,11 @@ class TestCPNest(unittest.TestCase):
             self.assertDictEqual(expected, self.sampler.kwargs)
 
 
+def _get_worker_random_state(_):
+    time.sleep(0.05)
+    return tuple(np.random.get_state()[1][:4])
+
+
 class TestDynesty(unittest.TestCase):
 
     def setUp(self):
@@ -156,7 +173,7 @@ class TestDynesty(unittest.TestCase):
                         facc=0.2, slices=5, dlogz=0.1, maxiter=None, maxcall=None,
                         logl_max=np.inf, add_live=True, print_progress=True, save_bounds=False,
                         walks=100, update_interval=600, print_func='func', n_effective=None,
-                        maxmcmc=5000, nact=5)
+                        maxmcmc=5000, nact=5, npool=1, rwalk_chains=1)
         self.sampler.kwargs['print_func'] = 'func'  # set this manually as this is not testable otherwise
         # DictEqual can't handle lists so we check these separately
         self.assertEqual([], self.sampler.kwargs['periodic'])
@@ -178,7 +195,7 @@ class TestDynesty(unittest.TestCase):
                         facc=0.2, slices=5, dlogz=0.1, maxiter=None, maxcall=None,
                         logl_max=np.inf, add_live=True, print_progress=True, save_bounds=False,
                         walks=100, update_interval=600, print_func='func', n_effective=None,
-                        maxmcmc=5000, nact=5)
+                        maxmcmc=5000, nact=5, npool=1, rwalk_chains=1)
 
         for equiv in bilby.core.sampler.base_sampler.NestedSampler.npoints_equiv_kwargs:
             new_kwargs = self.sampler.kwargs.copy()
@@ -203,6 +220,107 @@ class TestDynesty(unittest.TestCase):
         self.assertEqual([1, 3], self.sampler.kwargs["reflective"])
         self.assertEqual(self.sampler._reflective, self.sampler.kwargs["reflective"])
 
+    def test_npool_not_passed_to_dynesty(self):
+        self.sampler.kwargs['npool'] = 4
+        self.assertNotIn('npool', self.sampler.sampler_init_kwargs)
+
+    def test_setup_pool_skipped_for_single_process(self):
+        self.sampler._setup_pool()
+        self.assertIsNone(self.sampler.pool)
+
+    def test_setup_pool_worker_seeds_reproducible(self):
+        self.sampler.kwargs['npool'] = 2
+        states = list()
+        for _ in range(2):
+            np.random.seed(10)
+            self.sampler._setup_pool()
+            states.append(set(self.sampler.pool.map(
+                _get_worker_random_state, range(8), chunksize=1)))
+            self.sampler._close_pool()
+        self.assertEqual(2, len(states[0]))
+        self.assertEqual(states[0], states[1])
+
+    def test_sample_rwalk_bilby_batch(self):
+        kwargs = dict(walks=10, maxmcmc=100, nact=2, nonbounded=None,
+                      periodic=None, reflective=None)
+        args = [(np.full(2, 0.5), -0.1, np.identity(2), 0.1, lambda u: u,
+                 lambda v: -np.sum((v - 0.5) ** 2), kwargs) for _ in range(4)]
+        results = bilby.core.sampler.dynesty.sample_rwalk_bilby_batch(args)
+        self.assertEqual(4, len(results))
+        for u, v, logl, ncall, blob in results:
+            np.testing.assert_array_equal(u, v)
+            self.assertAlmostEqual(-np.sum((u - 0.5) ** 2), logl)
+            self.assertGreaterEqual(logl, -0.1)
+            self.assertEqual(blob['accept'] + blob['reject'], ncall)
+
+    def _mock_dynesty_sampler(self, n_dead):
+        sampler = MagicMock()
+        for _, attribute in bilby.core.sampler.dynesty._CHECKPOINT_DEAD_POINT_KEYS:
+            setattr(sampler, attribute, list())
+        self._add_dead_points(sampler, n_dead)
+        sampler.ncall = 10
+        sampler.it = n_dead + 1
+        sampler.nlive = 5
+        sampler.added_live = False
+        sampler.live_u = np.random.uniform(0, 1, (5, 2))
+        sampler.live_v = sampler.live_u
+        sampler.live_logl = np.zeros(5)
+        sampler.live_bound = np.zeros(5, dtype=int)
+        sampler.live_it = np.zeros(5, dtype=int)
+        return sampler
+
+    @staticmethod
+    def _add_dead_points(sampler, n_dead):
+        start = len(sampler.saved_logl)
+        for _, attribute in bilby.core.sampler.dynesty._CHECKPOINT_DEAD_POINT_KEYS:
+            if attribute in ['saved_u', 'saved_v']:
+                new = [np.random.uniform(0, 1, 2) for _ in range(n_dead)]
+            elif attribute == 'saved_logl':
+                new = list(np.arange(start, start + n_dead, dtype=float))
+            else:
+                new = list(np.zeros(n_dead))
+            getattr(sampler, attribute).extend(new)
+
+    def test_checkpoint_appends_dead_points(self):
+        self.sampler.check_point_plot = False
+        self.sampler.sampler = self._mock_dynesty_sampler(3)
+        self.sampler.write_current_state()
+        sampler = self.sampler.sampler
+        self._add_dead_points(sampler, 2)
+        self.sampler.write_current_state()
+        saved = bilby.core.sampler.dynesty.read_dynesty_checkpoint(
+            self.sampler.checkpoint_directory, posterior=True)
+        self.assertEqual(2, saved['n_segments'])
+        for key, _ in bilby.core.sampler.dynesty._CHECKPOINT_DEAD_POINT_KEYS:
+            self.assertEqual(5, len(saved[key]))
+        np.testing.assert_array_equal(np.arange(5.), saved['sample_likelihoods'])
+        np.testing.assert_array_equal(
+            np.array(sampler.saved_u), saved['unit_cube_samples'])
+        self.assertEqual((5, 2), saved['posterior'].shape)
+
+        self.sampler.sampler = self._mock_dynesty_sampler(0)
+        self.sampler._checkpoint_segments = 0
+        self.sampler._checkpoint_dead_points = 0
+        self.assertTrue(self.sampler.read_saved_state())
+        self.assertEqual(list(np.arange(5.)), self.sampler.sampler.saved_logl)
+        self.assertEqual(5, self.sampler._checkpoint_dead_points)
+        self.sampler._remove_checkpoint()
+        self.assertFalse(self.sampler.read_saved_state())
+
+    def test_convert_resume_reads_checkpoint_directory(self):
+        import argparse
+        from cli_bilby.resume import convert_resume
+        self.sampler.check_point_plot = False
+        self.sampler.sampler = self._mock_dynesty_sampler(4)
+        self.sampler.write_current_state()
+        convert_resume(self.sampler.checkpoint_directory,
+                       argparse.Namespace(format='dat'))
+        posterior = np.genfromtxt(
+            'outdir/label_preresult.dat', names=True, delimiter=' ')
+        self.assertEqual(('a', 'b'), posterior.dtype.names)
+        self.assertEqual(4, len(posterior))
+        self.sampler._remove_checkpoint()
+
 
 class TestEmcee(unittest.TestCase):
 
@@ -223,15 +341,16 @@ class TestEmcee(unittest.TestCase):
         expected = dict(nwalkers=500, a=2, args=[], kwargs={},
                         postargs=None, pool=None, live_dangerously=False,
                         runtime_sortingfn=None, lnprob0=None, rstate0=None,
-                        blobs0=None, iterations=100, thin=1, storechain=True, mh_proposal=None
-                        )
+                        blobs0=None, iterations=100, thin=1, storechain=True, mh_proposal=None,
+                        vectorize=None)
         self.assertDictEqual(expected, self.sampler.kwargs)
 
     def test_translate_kwargs(self):
         expected = dict(nwalkers=100, a=2, args=[], kwargs={},
                         postargs=None, pool=None, live_dangerously=False,
                         runtime_sortingfn=None, lnprob0=None, rstate0=None,
-                        blobs0=None, iterations=100, thin=1, storechain=True, mh_proposal=None)
+                        blobs0=None, iterations=100, thin=1, storechain=True, mh_proposal=None,
+                        vectorize=None)
         for equiv in bilby.core.sampler.base_sampler.MCMCSampler.nwalkers_equiv_kwargs:
             new_kwargs = self.sampler.kwargs.copy()
             del new_kwargs['nwalkers']
@@ -239,6 +358,99 @@ class TestEmcee(unittest.TestCase):
             self.sampler.kwargs = new_kwargs
             self.assertDictEqual(expected, self.sampler.kwargs)
 
+    def test_vectorize_with_batch_likelihood(self):
+        init_kwargs = self.sampler.sampler_init_kwargs
+        self.assertTrue(init_kwargs['vectorize'])
+        self.assertEqual(self.sampler.lnpostfn_ensemble, init_kwargs['log_prob_fn'])
+
+    def test_no_vectorize_with_pool(self):
+        self.sampler.kwargs['pool'] = MagicMock()
+        init_kwargs = self.sampler.sampler_init_kwargs
+        self.assertFalse(init_kwargs['vectorize'])
+        self.assertEqual(self.sampler.lnpostfn, init_kwargs['log_prob_fn'])
+
+    def test_no_vectorize_without_batch_likelihood(self):
+        sampler = bilby.core.sampler.Emcee(
+            bilby.core.likelihood.Likelihood(dict()), self.priors, outdir='outdir',
+            label='label', skip_import_verification=True)
+        init_kwargs = sampler.sampler_init_kwargs
+        self.assertFalse(init_kwargs['vectorize'])
+        self.assertEqual(sampler.lnpostfn, init_kwargs['log_prob_fn'])
+
+    def test_lnpostfn_ensemble_batch_likelihood(self):
+        priors = bilby.core.prior.PriorDict(dict(
+            a=bilby.core.prior.Uniform(0, 1), b=bilby.core.prior.Uniform(0, 1)))
+        likelihood = bilby.core.likelihood.Likelihood(dict(a=None, b=None))
+        likelihood.log_likelihood_batch = MagicMock(
+            side_effect=lambda theta, keys: -np.sum(theta ** 2, axis=1))
+        sampler = bilby.core.sampler.Emcee(
+            likelihood, priors, outdir='outdir', label='label',
+            skip_import_verification=True)
+        theta = np.array([[0.5, 0.5], [2, 0.5], [0.1, 0.2]])
+        results = sampler.lnpostfn_ensemble(theta)
+        self.assertEqual(1, likelihood.log_likelihood_batch.call_count)
+        np.testing.assert_array_equal(
+            theta[[0, 2]], likelihood.log_likelihood_batch.call_args[0][0])
+        self.assertEqual(-np.inf, results[1][0])
+        self.assertAlmostEqual(-0.5, results[0][1][0])
+        self.assertAlmostEqual(-0.05, results[2][0])
+
+
+class TestChainFile(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = 'outdir'
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(self.outdir)
+        self.filename = os.path.join(self.outdir, 'chain.npy')
+        self.chain_file = bilby.core.sampler.emcee.ChainFile(
+            self.filename, ['a', 'b'], flush_interval=2)
+        self.chain_file.initialize()
+        self.points = np.random.uniform(0, 1, (5, 3, 4))
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_append_and_read(self):
+        for points in self.points:
+            self.chain_file.append(points)
+        chain = self.chain_file.read()
+        self.assertEqual(15, len(chain))
+        self.assertEqual(list(range(3)) * 5, list(chain['walker']))
+        np.testing.assert_array_equal(
+            self.points[:, :, 0].flatten(), chain['a'])
+        np.testing.assert_array_equal(
+            self.points[:, :, 3].flatten(), chain['log_p'])
+        np.testing.assert_array_equal(chain, np.load(self.filename))
+
+    def test_flush_interval(self):
+        self.chain_file.append(self.points[0])
+        self.assertEqual(0, len(np.load(self.filename)))
+        self.chain_file.append(self.points[1])
+        self.assertEqual(6, len(np.load(self.filename)))
+
+    def test_open_discards_incomplete_iteration(self):
+        for points in self.points[:2]:
+            self.chain_file.append(points)
+        self.chain_file.append(self.points[2, :2])
+        self.chain_file.flush()
+        self.assertEqual(8, len(np.load(self.filename)))
+        chain_file = bilby.core.sampler.emcee.ChainFile(
+            self.filename, ['a', 'b'])
+        chain_file.open(nwalkers=3)
+        self.assertEqual(6, len(np.load(self.filename)))
+        self.assertEqual(6, chain_file.nrows)
+        chain_file.append(self.points[2])
+        np.testing.assert_array_equal(
+            self.points[:3, :, 1].flatten(), chain_file.read()['b'])
+
+    def test_open_mismatched_parameters(self):
+        self.chain_file.append(self.points[0])
+        self.chain_file.flush()
+        chain_file = bilby.core.sampler.emcee.ChainFile(
+            self.filename, ['a', 'c'])
+        chain_file.open(nwalkers=3)
+        self.assertEqual(0, chain_file.nrows)
+
 
 class TestKombine(unittest.TestCase):
 
@@ -405,6 +617,19 @@ class TestPTEmcee(unittest.TestCase):
             self.sampler.kwargs = new_kwargs
             self.assertDictEqual(expected, self.sampler.kwargs)
 
+    def test_ensemble_map_with_batch_likelihood(self):
+        self.assertIsInstance(self.sampler.sampler_init_kwargs['pool'],
+                              bilby.core.sampler.emcee.EnsembleMap)
+
+    def test_ensemble_map(self):
+        sampler = MagicMock()
+        sampler.log_prior_array = MagicMock(return_value=np.array([0, -np.inf, -1]))
+        sampler.log_likelihood_array = MagicMock(return_value=np.array([-2, -3]))
+        ensemble_map = bilby.core.sampler.emcee.EnsembleMap(sampler)
+        results = ensemble_map.map(None, np.zeros((3, 2)))
+        self.assertEqual([(-2, 0), (0, -np.inf), (-3, -1)], results)
+        self.assertEqual((2, 2), sampler.log_likelihood_array.call_args[0][0].shape)
+
 
 class TestPyMC3(unittest.TestCase):
 
@@ -498,6 +723,18 @@ class TestPymultinest(unittest.TestCase):
             self.assertDictEqual(expected, self.sampler.kwargs)
 
 
+class BatchGaussianLikelihood(bilby.likelihood.GaussianLikelihood):
+    n_batch_calls = 0
+
+    def log_likelihood_batch(self, parameters_table, keys=None):
+        self.n_batch_calls += 1
+        log_l = list()
+        for point in parameters_table:
+            self.parameters.update(dict(zip(keys, point)))
+            log_l.append(self.log_likelihood())
+        return np.array(log_l)
+
+
 class TestRunningSamplers(unittest.TestCase):
 
     def setUp(self):
@@ -533,6 +770,16 @@ class TestRunningSamplers(unittest.TestCase):
             likelihood=self.likelihood, priors=self.priors, sampler='dynesty',
             nlive=100, save=False)
 
+    def test_run_dynesty_npool(self):
+        _ = bilby.run_sampler(
+            likelihood=self.likelihood, priors=self.priors, sampler='dynesty',
+            nlive=100, save=False, npool=2)
+
+    def test_run_dynesty_rwalk_chains(self):
+        _ = bilby.run_sampler(
+            likelihood=self.likelihood, priors=self.priors, sampler='dynesty',
+            nlive=100, save=False, rwalk_chains=4)
+
     def test_run_dynamic_dynesty(self):
         _ = bilby.run_sampler(
             likelihood=self.likelihood, priors=self.priors, sampler='dynamic_dynesty',
@@ -543,6 +790,19 @@ class TestRunningSamplers(unittest.TestCase):
             likelihood=self.likelihood, priors=self.priors, sampler='emcee',
             iterations=1000, nwalkers=10, save=False)
 
+    def test_run_emcee_vectorized(self):
+        _ = bilby.run_sampler(
+            likelihood=self.likelihood, priors=self.priors, sampler='emcee',
+            iterations=1000, nwalkers=10, save=False, vectorize=True)
+
+    def test_run_emcee_batch_likelihood(self):
+        likelihood = BatchGaussianLikelihood(
+            self.x, self.y, self.model, self.sigma)
+        _ = bilby.run_sampler(
+            likelihood=likelihood, priors=self.priors, sampler='emcee',
+            iterations=1000, nwalkers=10, save=False)
+        self.assertGreater(likelihood.n_batch_calls, 0)
+
     def test_run_kombine(self):
         _ = bilby.run_sampler(
             likelihood=self.likelihood, priors=self.priors, sampler='kombine',
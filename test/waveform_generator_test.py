@@ -328,6 +328,65 @@ class TestFrequencyDomainStrainMethod(unittest.TestCase):
         self.assertFalse(np.array_equal(original_waveform['plus'], new_waveform['plus']))
 
 
+class TestWaveformCache(unittest.TestCase):
+
+    def setUp(self):
+        self.source_model = MagicMock(side_effect=dummy_func_dict_return_value)
+        self.waveform_generator = \
+            bilby.gw.waveform_generator.WaveformGenerator(duration=1, sampling_frequency=4096,
+                                                          frequency_domain_source_model=dummy_func_dict_return_value,
+                                                          cache_size=2)
+        self.waveform_generator.frequency_domain_source_model = self.source_model
+        self.simulation_parameters = dict(amplitude=1e-2, mu=100, sigma=1,
+                                          ra=1.375,
+                                          dec=-1.2108,
+                                          geocent_time=1126259642.413,
+                                          psi=2.659)
+
+    def tearDown(self):
+        del self.source_model
+        del self.waveform_generator
+        del self.simulation_parameters
+
+    def get_parameters(self, mu):
+        parameters = self.simulation_parameters.copy()
+        parameters['mu'] = mu
+        return parameters
+
+    def test_revisited_parameters_are_cached(self):
+        for mu in [100, 101, 100, 101]:
+            self.waveform_generator.frequency_domain_strain(self.get_parameters(mu))
+        self.assertEqual(self.source_model.call_count, 2)
+        info = self.waveform_generator.cache_info
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['size'], 2)
+
+    def test_least_recently_used_is_evicted(self):
+        for mu in [100, 101, 100, 102, 100, 101]:
+            self.waveform_generator.frequency_domain_strain(self.get_parameters(mu))
+        self.assertEqual(self.source_model.call_count, 4)
+
+    def test_memory_limit(self):
+        waveform = self.waveform_generator.frequency_domain_strain(self.get_parameters(100))
+        nbytes = waveform['plus'].nbytes + waveform['cross'].nbytes
+        self.waveform_generator.clear_cache()
+        self.waveform_generator.cache_memory = nbytes
+        for mu in [100, 101, 100]:
+            self.waveform_generator.frequency_domain_strain(self.get_parameters(mu))
+        self.assertEqual(self.waveform_generator.cache_info['size'], 1)
+        self.assertEqual(self.waveform_generator.cache_info['memory'], nbytes)
+        self.assertEqual(self.source_model.call_count, 4)
+
+    def test_array_waveform_arguments(self):
+        self.waveform_generator.waveform_arguments['nodes'] = np.arange(10)
+        self.waveform_generator.frequency_domain_strain(self.get_parameters(100))
+        self.waveform_generator.frequency_domain_strain(self.get_parameters(100))
+        self.assertEqual(self.source_model.call_count, 1)
+        self.waveform_generator.waveform_arguments['nodes'] = np.arange(10)
+        self.waveform_generator.frequency_domain_strain(self.get_parameters(100))
+        self.assertEqual(self.source_model.call_count, 2)
+
 class TestTimeDomainStrainMethod(unittest.TestCase):
 
     def setUp(self):